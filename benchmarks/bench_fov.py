@@ -0,0 +1,91 @@
+"""
+Compares the shadowcasting FOV in core/fov.py against the old 180-ray caster.
+
+Run from the repository root:
+    python benchmarks/bench_fov.py
+"""
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.fov import FOV
+from core.rng import GameRNG
+from world.map import GameMap
+from world.dungeon_generator import generate_dungeon
+
+
+class RaycastFOV(FOV):
+    """The previous FOV implementation (180 rays at 2 degree steps), kept for comparison."""
+
+    def compute_fov(self, origin_x, origin_y, radius=8, light_source_type='player', player_darkvision_radius=0):
+        if light_source_type == 'player' and player_darkvision_radius > radius:
+            radius = player_darkvision_radius
+        self._mark(origin_x, origin_y, light_source_type, False)
+        for angle in range(0, 360, 2):
+            self._cast_ray(origin_x, origin_y, angle, radius, light_source_type, player_darkvision_radius)
+
+    def _cast_ray(self, start_x, start_y, angle, max_distance, light_source_type, player_darkvision_radius=0):
+        rad = math.radians(angle)
+        dx = math.cos(rad)
+        dy = math.sin(rad)
+        for i in range(max_distance + 1):
+            x = int(start_x + dx * i)
+            y = int(start_y + dy * i)
+            if not (0 <= x < self.game_map.width and 0 <= y < self.game_map.height):
+                break
+            # Same precedence rules as FOV._mark: darkvision past 6 tiles, player light never downgraded
+            self._mark(x, y, light_source_type, light_source_type == 'player' and player_darkvision_radius > 0 and i > 6)
+            if self.game_map.tiles[y][x].block_sight:
+                break
+
+
+def build_map(seed, width=80, height=45):
+    game_map = GameMap(width, height)
+    rooms, _, _ = generate_dungeon(game_map, 3, max_rooms=12, rng=GameRNG(seed).mapgen)
+    origins = [room.center() for room in rooms]
+    return game_map, origins
+
+
+def time_fov(fov_class, game_map, origins, radius, repeats):
+    fov = fov_class(game_map)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for x, y in origins:
+            fov.clear_visible()
+            fov.compute_fov(x, y, radius=radius)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeats * len(origins))
+
+
+def visible_sets(fov_class, game_map, origin, radius):
+    fov = fov_class(game_map)
+    fov.compute_fov(origin[0], origin[1], radius=radius)
+    return set(fov.visible_sources)
+
+
+def main():
+    repeats = 50
+    game_map, origins = build_map(seed=1234)
+    print(f"Map {game_map.width}x{game_map.height}, {len(origins)} origins, {repeats} repeats")
+    print(f"{'radius':>6} {'raycast us':>11} {'shadow us':>10} {'speedup':>8} {'ray tiles':>10} {'shadow tiles':>13} {'ray-only':>9}")
+    for radius in (6, 8, 12):
+        ray_time = time_fov(RaycastFOV, game_map, origins, radius, repeats)
+        shadow_time = time_fov(FOV, game_map, origins, radius, repeats)
+
+        ray_tiles = shadow_tiles = ray_only = 0
+        for origin in origins:
+            ray_seen = visible_sets(RaycastFOV, game_map, origin, radius)
+            shadow_seen = visible_sets(FOV, game_map, origin, radius)
+            ray_tiles += len(ray_seen)
+            shadow_tiles += len(shadow_seen)
+            ray_only += len(ray_seen - shadow_seen)
+
+        print(f"{radius:>6} {ray_time * 1e6:>11.1f} {shadow_time * 1e6:>10.1f} {ray_time / shadow_time:>7.1f}x "
+              f"{ray_tiles:>10} {shadow_tiles:>13} {ray_only:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,344 @@
+"""
+Benchmark cases for benchmarks/run.py.
+
+Every case function yields Bench objects: named, parameterised callables that
+each do one unit of work, which run.py times.
+All randomness comes from fixed seeds, so every run times the same work.
+"""
+import contextlib
+import io
+import random
+
+import pygame
+
+import config
+from core.game import Game # Must come first (circular imports in the game modules)
+from core.dice import compile_dice
+from core.floating_text import FloatingTextManager
+from core.fov import FOV
+from core.level_store import LevelStore, StoredLevel
+from core.message_log import MessageBox
+from core.pathfinding import astar
+from core.rng import GameRNG
+from core.scheduler import TurnScheduler
+from core.timers import TimerWheel
+from entities.monster import Goblin
+from world.dungeon_generator import generate_dungeon
+from world.map import GameMap
+import graphics
+
+SEED = 1234
+
+# (width, height, max_rooms): the game's level size, then a larger stress map
+MAP_SIZES = [(80, 45, 12), (160, 90, 40)]
+ENTITY_COUNTS = [0, 20, 80]
+
+CASES = []
+
+
+def case(function):
+    """Registers a case function."""
+    CASES.append(function)
+    return function
+
+
+class Bench:
+    def __init__(self, name, params, function, number=1):
+        """
+        Args:
+            name (str): Case name, e.g. 'fov.compute_fov'.
+            params (dict): What this variant runs with (map size, entity count...).
+            function (callable): Does one unit of work per call.
+            number (int): Calls per timed sample (raise it for very fast functions).
+        """
+        self.name = name
+        self.params = params
+        self.function = function
+        self.number = number
+
+    @property
+    def id(self):
+        if not self.params:
+            return self.name
+        return self.name + '[' + ','.join(f"{key}={value}" for key, value in self.params.items()) + ']'
+
+
+# --- Shared setup ---
+def build_dungeon_map(width, height, max_rooms, seed=SEED):
+    game_map = GameMap(width, height)
+    rooms, _, _ = generate_dungeon(game_map, 3, max_rooms=max_rooms, rng=GameRNG(seed).mapgen)
+    return game_map, rooms
+
+
+def walkable_cells(game_map):
+    return [(x, y) for y in range(game_map.height) for x in range(game_map.width) if game_map.is_walkable(x, y)]
+
+
+def scatter_positions(game_map, count, exclude=(), seed=SEED):
+    """count distinct walkable cells picked with a fixed seed."""
+    cells = [cell for cell in walkable_cells(game_map) if cell not in exclude]
+    return random.Random(seed).sample(cells, min(count, len(cells)))
+
+
+_display_ready = False
+
+
+def init_display():
+    """Dummy-driver display, fonts and tileset, as main.py sets them up."""
+    global _display_ready
+    if not _display_ready:
+        pygame.init()
+        pygame.display.set_mode((config.BASE_SCREEN_WIDTH, config.BASE_SCREEN_HEIGHT))
+        graphics.load_tileset('assets/mithrim_tileset-2.png')
+        graphics.setup_tile_mapping()
+        _display_ready = True
+    return pygame.display.get_surface()
+
+
+def make_dungeon_game(screen=None, level=3, extra_monsters=0):
+    """A Game with a finished character standing on a generated level (headless if no screen)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = Game(screen, headless=screen is None, seed=SEED)
+        game.finalize_race_selection()
+        game.finalize_character_creation()
+        game.generate_level(level)
+        occupied = {(e.x, e.y) for e in game.entities}
+        for x, y in scatter_positions(game.game_map, extra_monsters, exclude=occupied):
+            monster = Goblin(x, y)
+            game.add_entity(monster)
+            game.scheduler.add(monster)
+    return game
+
+
+# --- Cases ---
+@case
+def fov_cases():
+    for width, height, max_rooms in MAP_SIZES:
+        game_map, rooms = build_dungeon_map(width, height, max_rooms)
+        origins = [room.center() for room in rooms]
+        for radius in (6, 12):
+            fov = FOV(game_map)
+
+            def run(fov=fov, origins=origins, radius=radius):
+                for x, y in origins:
+                    fov.clear_visible()
+                    fov.compute_fov(x, y, radius=radius)
+
+            yield Bench('fov.compute_fov', {'map': f"{width}x{height}", 'radius': radius, 'origins': len(origins)}, run)
+
+
+@case
+def astar_cases():
+    for width, height, max_rooms in MAP_SIZES:
+        game_map, rooms = build_dungeon_map(width, height, max_rooms)
+        centers = [room.center() for room in rooms]
+        # Every room to the next one round the list: short and long routes alike
+        pairs = list(zip(centers, centers[1:] + centers[:1]))
+        for count in ENTITY_COUNTS:
+            occupancy = bytearray(width * height)
+            for x, y in scatter_positions(game_map, count, exclude=centers):
+                occupancy[y * width + x] = 1
+
+            def run(game_map=game_map, pairs=pairs, occupancy=occupancy):
+                for start, end in pairs:
+                    astar(game_map, start, end, occupancy=occupancy)
+
+            yield Bench('pathfinding.astar', {'map': f"{width}x{height}", 'entities': count, 'paths': len(pairs)}, run)
+
+
+@case
+def dungeon_cases():
+    for width, height, max_rooms in MAP_SIZES:
+        def run(width=width, height=height, max_rooms=max_rooms):
+            build_dungeon_map(width, height, max_rooms)
+
+        yield Bench('dungeon_generator.generate_dungeon', {'map': f"{width}x{height}", 'max_rooms': max_rooms}, run)
+
+
+@case
+def level_store_cases():
+    game = make_dungeon_game()
+    level = StoredLevel(game.game_map, game.fov, [e for e in game.entities if e is not game.player],
+                        [e for e in game.scheduler if e is not game.player], game.stairs_positions,
+                        game.torch_light_sources, (game.player.x, game.player.y))
+    for hot_levels in (1, 0):
+        store = LevelStore(hot_levels=hot_levels)
+        store.external['player'] = game.player
+
+        def round_trip(store=store):
+            store.put(3, level)
+            store.take(3)
+
+        yield Bench('level_store.round_trip', {'storage': 'hot' if hot_levels else 'compressed'}, round_trip)
+
+
+@case
+def render_cases():
+    screen = init_display()
+    for count in ENTITY_COUNTS:
+        game = make_dungeon_game(screen, extra_monsters=count)
+        game.camera.x = game.camera.target_x = max(0.0, game.player.x - game.camera.viewport_width / 2.0)
+        game.camera.y = game.camera.target_y = max(0.0, game.player.y - game.camera.viewport_height / 2.0)
+        game.render_map_with_fov()
+
+        def idle(game=game):
+            game.render_map_with_fov()
+
+        def cold(game=game):
+            game.map_layer.invalidate()
+            game.render_map_with_fov()
+
+        yield Bench('game.render_map_with_fov', {'layer': 'idle', 'entities': count}, idle)
+        yield Bench('game.render_map_with_fov', {'layer': 'cold', 'entities': count}, cold)
+
+
+@case
+def draw_tile_cases():
+    init_display()
+    target = pygame.Surface((config.TILE_SIZE * 40, config.TILE_SIZE * 2))
+    chars = [char for char in graphics.TILE_MAPPING if len(char) == 1][:40]
+    for light in ('player', 'torch'):
+        tint = graphics.get_light_tint(light)
+
+        def run(tint=tint):
+            for i, char in enumerate(chars):
+                graphics.draw_tile(target, i * config.TILE_SIZE, 0, char, color_tint=tint)
+
+        yield Bench('graphics.draw_tile', {'light': light, 'tiles': len(chars)}, run)
+
+
+@case
+def message_cases():
+    init_display()
+    short = "The Goblin hits you for 3 damage."
+    long = ("You swing your longsword in a wide arc and the blade bites deep into the Orc's shoulder, "
+            "sending it staggering back against the damp stone wall of the corridor.")
+    for name, text in (('short', short), ('long', long)):
+        message_box = MessageBox(0, 0, 800, 160)
+
+        def run(message_box=message_box, text=text):
+            for _ in range(50):
+                message_box.add_message(text, (255, 255, 255))
+
+        yield Bench('message_log.add_message', {'text': name, 'messages': 50}, run)
+
+
+@case
+def message_render_cases():
+    screen = init_display()
+    message_box = MessageBox(0, 0, 800, 160)
+    for i in range(500):
+        message_box.add_message(f"The Goblin hits you for {i % 7} damage.", (255, 50, 50))
+
+    def idle():
+        message_box.render(screen)
+
+    def new_message():
+        message_box.add_message("You feel a cold draft.", (180, 180, 180))
+        message_box.render(screen)
+
+    yield Bench('message_log.render', {'frame': 'idle', 'scrollback': 500}, idle, number=100)
+    yield Bench('message_log.render', {'frame': 'new_message', 'scrollback': 500}, new_message, number=20)
+
+
+@case
+def floating_text_cases():
+    init_display()
+    game = make_dungeon_game(pygame.display.get_surface())
+    target = pygame.Surface((config.INTERNAL_GAME_AREA_PIXEL_WIDTH, config.INTERNAL_GAME_AREA_PIXEL_HEIGHT))
+    x, y = game.player.x, game.player.y
+    manager = FloatingTextManager()
+
+    def combat_frames():
+        # One attack's worth of texts, then a second of frames as Game.update runs them
+        manager.spawn(x, y, "HIT!", (255, 255, 0))
+        manager.spawn(x, y - 0.5, "7", (255, 0, 0))
+        manager.spawn(x, y, "MISS!", (150, 150, 150))
+        for _ in range(30):
+            manager.update()
+            manager.update()
+            manager.draw(target, game.camera)
+
+    yield Bench('floating_text.combat_frames', {'texts': 3, 'frames': 30}, combat_frames)
+
+
+@case
+def monster_turn_cases():
+    for count in (5, 20, 80):
+        game = make_dungeon_game(extra_monsters=count)
+        game.player.max_hp = game.player.hp = 10 ** 9 # Nobody dies, so every cycle does the same work
+        monsters = [e for e in game.entities if e is not game.player]
+        start_positions = [(monster, monster.x, monster.y) for monster in monsters]
+
+        def run(game=game, start_positions=start_positions):
+            # Every monster takes one turn, then everyone is put back where they started
+            with contextlib.redirect_stdout(io.StringIO()):
+                for monster, _, _ in start_positions:
+                    if monster.alive:
+                        monster.take_turn(game.player, game.game_map, game)
+                for monster, x, y in start_positions:
+                    game.game_map.move_entity(monster, x, y)
+                game.floating_texts.clear()
+                game.player.active_status_effects.clear()
+
+        yield Bench('monster.take_turn cycle', {'monsters': len(monsters)}, run)
+
+
+@case
+def scheduler_cases():
+    for count in (20, 200, 2000):
+        rng = random.Random(SEED)
+        actors = [Goblin(0, 0) for _ in range(count)]
+        for actor in actors:
+            actor.roll_initiative(rng)
+            actor.speed = rng.choice((0.5, 1, 1, 2))
+        scheduler = TurnScheduler()
+        scheduler.reset(actors)
+
+        def run(scheduler=scheduler, actors=actors):
+            # A round of turns, with one actor leaving and coming back (death and summon)
+            for _ in range(len(actors)):
+                scheduler.advance()
+            actor = scheduler.current()
+            scheduler.remove(actor)
+            scheduler.add(actor)
+
+        yield Bench('scheduler.turns', {'actors': count}, run)
+
+
+@case
+def timer_cases():
+    for count in (10, 1000):
+        rng = random.Random(SEED)
+        wheel = TimerWheel()
+        delays = [rng.randint(1, 200) for _ in range(count)]
+
+        def renew(index, wheel=wheel, delays=delays):
+            wheel.schedule(delays[index], renew, index)
+
+        for index in range(count):
+            renew(index)
+
+        def run(wheel=wheel):
+            # Ten turns; every timer that fires is scheduled again, so the count stays the same
+            for _ in range(10):
+                wheel.advance()
+
+        yield Bench('timers.advance', {'timers': count, 'turns': 10}, run)
+
+
+@case
+def dice_cases():
+    for expression in ("2d6+3", "4d8kh3"):
+        dice = compile_dice(expression)
+        rng = random.Random(SEED)
+
+        def roll_loop(dice=dice, rng=rng):
+            for _ in range(1000):
+                dice.roll(rng)
+
+        def roll_many(dice=dice, rng=rng):
+            dice.roll_many(1000, rng)
+
+        yield Bench('dice.roll', {'dice': expression, 'rolls': 1000}, roll_loop)
+        yield Bench('dice.roll_many', {'dice': expression, 'rolls': 1000}, roll_many)
@@ -0,0 +1,199 @@
+"""
+Runs the benchmark suite in benchmarks/cases.py and compares it with a stored baseline.
+
+Run from the repository root:
+    python benchmarks/run.py                      # everything, compared with benchmarks/baseline.json
+    python benchmarks/run.py --filter astar       # only cases whose id contains 'astar'
+    python benchmarks/run.py --update-baseline    # store this run as the new baseline
+
+Results are written as JSON (benchmarks/results.json by default). A case regresses when
+its best time is more than --threshold (default 25%) slower than the baseline, and the
+script then exits with status 1. Both runs also time a fixed pure-Python loop, and times
+are scaled by it before comparing, so a machine that is uniformly slower today doesn't
+fail every case. Baselines are still best compared on the machine that recorded them.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+# Must be set before pygame is imported
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT) # Assets are loaded relative to the repository root
+
+from benchmarks.cases import CASES
+
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baseline.json')
+DEFAULT_OUTPUT = os.path.join('benchmarks', 'results.json')
+MIN_SAMPLE_SECONDS = 0.002 # Fast benches are called several times per sample to get above timer noise
+
+
+def time_bench(bench, repeats):
+    """Returns per-call timings (seconds) for repeats samples, after one warm-up call."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        bench.function()
+        single = time.perf_counter() - start
+
+        number = bench.number
+        if single * number < MIN_SAMPLE_SECONDS:
+            number = max(number, int(MIN_SAMPLE_SECONDS / max(single, 1e-9)) + 1)
+
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(number):
+                bench.function()
+            samples.append((time.perf_counter() - start) / number)
+    return samples, number
+
+
+def calibrate(samples=7):
+    """Best time (us) of a fixed pure-Python workload, used to scale comparisons between runs."""
+    best = None
+    for _ in range(samples):
+        start = time.perf_counter()
+        total = 0
+        cells = {}
+        for i in range(200000):
+            total += i * i % 7
+            if i % 16 == 0:
+                cells[(i % 80, i % 45)] = total
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=ROOT).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def collect_meta():
+    import pygame
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'numpy': numpy_version,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def run_suite(name_filter=None, repeats=15):
+    results = {}
+    for case_function in CASES:
+        with contextlib.redirect_stdout(io.StringIO()):
+            benches = list(case_function())
+        for bench in benches:
+            if name_filter and name_filter not in bench.id:
+                continue
+            samples, number = time_bench(bench, repeats)
+            results[bench.id] = {
+                'name': bench.name,
+                'params': bench.params,
+                'median_us': statistics.median(samples) * 1e6,
+                'min_us': min(samples) * 1e6,
+                'mean_us': statistics.mean(samples) * 1e6,
+                'samples': len(samples),
+                'number': number,
+            }
+            print(f"{bench.id:<72} {results[bench.id]['min_us']:>12.1f} us (median {results[bench.id]['median_us']:.1f})")
+    return results
+
+
+def compare(results, baseline, threshold, speed_factor=1.0):
+    """
+    Prints a comparison table and returns the ids of the cases that regressed.
+    speed_factor scales the current times (baseline calibration / current calibration).
+    """
+    regressions = []
+    print()
+    print(f"{'case':<72} {'baseline us':>12} {'now us':>12} {'change':>8}")
+    for bench_id, result in results.items():
+        old = baseline.get(bench_id)
+        now_us = result['min_us'] * speed_factor
+        if old is None:
+            print(f"{bench_id:<72} {'-':>12} {now_us:>12.1f} {'new':>8}")
+            continue
+        ratio = now_us / old['min_us']
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append(bench_id)
+            flag = '  REGRESSION'
+        print(f"{bench_id:<72} {old['min_us']:>12.1f} {now_us:>12.1f} {ratio - 1:>+7.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the engine's hot paths.")
+    parser.add_argument('--filter', help="Only run cases whose id contains this text.")
+    parser.add_argument('--repeats', type=int, default=15, help="Timed samples per case.")
+    parser.add_argument('--quick', action='store_true', help="3 samples per case (smoke check, noisy).")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Where to write the JSON results.")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON to compare against.")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%).")
+    parser.add_argument('--update-baseline', action='store_true', help="Write this run to the baseline file.")
+    parser.add_argument('--no-normalize', action='store_true', help="Compare raw times, without the calibration loop.")
+    args = parser.parse_args()
+
+    repeats = 3 if args.quick else args.repeats
+    meta = collect_meta()
+    meta['calibration_us'] = calibrate()
+    results = run_suite(args.filter, repeats)
+    meta['calibration_us'] = min(meta['calibration_us'], calibrate()) # Once more, in case the machine was busy at the start
+    report = {'meta': meta, 'results': results}
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    speed_factor = 1.0
+    baseline_calibration = baseline['meta'].get('calibration_us')
+    if baseline_calibration and not args.no_normalize:
+        speed_factor = baseline_calibration / meta['calibration_us']
+        print(f"Calibration {meta['calibration_us']:.0f} us (baseline {baseline_calibration:.0f} us): "
+              f"scaling times by {speed_factor:.2f}")
+    regressions = compare(results, baseline['results'], args.threshold, speed_factor)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%} "
+              f"against {args.baseline} (commit {baseline['meta'].get('commit')}).")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -18,6 +18,36 @@ MIN_TILE_SIZE = 24
 # Initial FPS
 FPS = 30
 
+# Run seed for core.rng.GameRNG. None picks a new seed every run (it is shown on the character
+# sheet and in the message log when the player dies); set it to that number to replay the run exactly.
+RNG_SEED = None
+
+# Monster turns are all resolved in the frame after the player acts, unless they take longer than
+# this (the rest then runs next frame). Each monster's floating texts are shown this many text
+# steps (two per frame) after the previous monster's, so they still play one after another;
+# monsters that spawned no texts don't add to the wait, and it never goes past the cap (~1s).
+TURN_TIME_BUDGET_MS = 8
+TURN_PRESENTATION_STAGGER = 6
+TURN_PRESENTATION_MAX_DELAY = 60
+
+# Start with the phase profiler and its overlay on (F3 toggles it in game, F4 exports CSV/JSON)
+PROFILER_ENABLED = False
+
+# Level for core.log ('DEBUG', 'INFO', 'WARNING'...). Per-category overrides go in the
+# MITHRIM_LOG environment variable, e.g. MITHRIM_LOG="ai=DEBUG"; F2 toggles debug output in game.
+LOG_LEVEL = 'WARNING'
+
+# Level store (core/level_store.py): the last LEVEL_STORE_HOT_LEVELS levels left stay in memory as they
+# are; older ones are compressed, and spilled to LEVEL_STORE_SPILL_DIR (None = a temp dir) once the
+# compressed ones take more than LEVEL_STORE_MEMORY_BUDGET bytes.
+LEVEL_STORE_HOT_LEVELS = 2
+LEVEL_STORE_MEMORY_BUDGET = 8 * 1024 * 1024
+LEVEL_STORE_SPILL_DIR = None
+
+# Map storage: 'list' keeps Tile objects in nested lists, 'array' uses world.map.ArrayGameMap
+# (uint16 tile ids plus walkable/transparent planes, needs numpy).
+MAP_STORAGE = 'list'
+
 # --- NEW: Message Log Font Scaling ---
 # This factor will be multiplied by the actual_scale_factor of the game area
 # to determine the message log's font size.
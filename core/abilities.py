@@ -1,12 +1,14 @@
-import random
 from world.tile import floor, MimicTile, TrapTile
 
 from core.status_effects import PowerAttackBuff, EvasionBuff
+from core.dice import compile_dice
 from core.game import GameState
 from entities.monster import Monster, Mimic
 from entities.summons import MageHandEntity
-from core.floating_text import FloatingText
 from items.items import Potion, lesser_healing_potion # NEW: Import for potion drop
+from core.log import get_logger
+
+log = get_logger('combat')
 
 
 class Ability:
@@ -15,7 +17,12 @@ class Ability:
         self.description = description
         self.cost = cost # e.g., mana, stamina, uses per rest
         self.cooldown = cooldown # turns until usable again
-        self.current_cooldown = 0
+        self.cooldown_timer = None # Runs on game.timers while cooling down
+
+    @property
+    def current_cooldown(self):
+        """Turns until the ability can be used again."""
+        return self.cooldown_timer.remaining if self.cooldown_timer is not None else 0
 
     def can_use(self, user, game_instance):
         """Checks if the user can currently use this ability."""
@@ -32,15 +39,23 @@ class Ability:
         
         # Apply cost and set cooldown (common to all abilities)
         # user.spend_resource(self.cost) # Implement this in Player class later
-        self.current_cooldown = self.cooldown
+        if self.cooldown > 0:
+            self.cooldown_timer = game_instance.timers.schedule(self.cooldown, self.end_cooldown, user)
+            if hasattr(user, 'cooling_abilities'):
+                user.cooling_abilities.add(self)
+        if hasattr(user, 'notify_change'):
+            user.notify_change('cooldowns')
         
         game_instance.message_log.add_message(f"{user.name} uses {self.name}!", (100, 255, 255))
         return True # Indicate successful use
 
-    def tick_cooldown(self):
-        """Decrements the cooldown each turn."""
-        if self.current_cooldown > 0:
-            self.current_cooldown -= 1
+    def end_cooldown(self, user):
+        """Timer callback: the ability is ready again."""
+        self.cooldown_timer = None
+        if hasattr(user, 'cooling_abilities'):
+            user.cooling_abilities.discard(self)
+        if hasattr(user, 'notify_change'):
+            user.notify_change('cooldowns')
 
 
     def execute_on_target(self, user, game_instance, target_x, target_y):
@@ -91,7 +106,7 @@ class SpotTrapsAbility(Ability):
             investigation_bonus = user.get_ability_modifier(user.intelligence)
             if "investigation" in user.skill_proficiencies:
                 investigation_bonus += user.proficiency_bonus
-            d20_roll = random.randint(1, 20)
+            d20_roll = game_instance.rng.combat.randint(1, 20)
             investigation_check_total = d20_roll + investigation_bonus
             
             found_any = False
@@ -224,6 +239,7 @@ class FireBolt(Ability):
     def __init__(self):
         super().__init__("Fire Bolt", "Hurl a searing bolt of fire at a foe.", cost=0, cooldown=0)
         self.range = 8  # Example range in tiles
+        self.damage_dice = "1d10"
 
     def use(self, user, game_instance):
         if not super().use(user, game_instance):
@@ -285,7 +301,7 @@ class FireBolt(Ability):
             return False  # Invalid target, do not consume a turn
 
         # Fire Bolt damage calculation (example: 1d10)
-        damage_roll = random.randint(1, 10)
+        damage_roll = compile_dice(self.damage_dice).roll(game_instance.rng.combat)
         if target_monster and isinstance(target_monster, Monster):
             # Check if the target is specifically a Mimic
             hit_messages = [
@@ -293,7 +309,7 @@ class FireBolt(Ability):
                 f"Flames erupt as your spell connects with the {target_monster.name}!",
                 f"The {target_monster.name} is engulfed in magical fire!",
             ]
-            game_instance.message_log.add_message(random.choice(hit_messages), (255, 165, 0))
+            game_instance.message_log.add_message(game_instance.rng.flavor.choice(hit_messages), (255, 165, 0))
 
             if isinstance(target_monster, Mimic):
                 damage_dealt = target_monster.take_damage(damage_roll, game_instance) 
@@ -304,11 +320,9 @@ class FireBolt(Ability):
             game_instance.message_log.add_message(f"{target_monster.name} has {target_monster.hp}/{target_monster.max_hp} HP", (255, 165, 0))
 
             # Add FloatingText for "HIT!" and damage dealt
-            hit_text = FloatingText(target_monster.x, target_monster.y, "HIT!", (255, 255, 0))
-            game_instance.floating_texts.append(hit_text)
+            game_instance.floating_texts.spawn(target_monster.x, target_monster.y, "HIT!", (255, 255, 0))
 
-            damage_text = FloatingText(target_monster.x, target_monster.y - 0.5, str(damage_dealt), (255, 0, 0))  # <--- ADJUSTED Y
-            game_instance.floating_texts.append(damage_text)
+            game_instance.floating_texts.spawn(target_monster.x, target_monster.y - 0.5, str(damage_dealt), (255, 0, 0))  # <--- ADJUSTED Y
 
             if not target_monster.alive:
                 xp_gained = target_monster.die()
@@ -322,15 +336,15 @@ class FireBolt(Ability):
                 f"The {target_tile.name} explodes in a burst of flame!",
                 f"A magical inferno consumes the {target_tile.name}!",
             ]
-            game_instance.message_log.add_message(random.choice(destructible_messages), (255, 165, 0))                
+            game_instance.message_log.add_message(game_instance.rng.flavor.choice(destructible_messages), (255, 165, 0))                
 
             # For simplicity, we'll assume Fire Bolt instantly destroys destructible tiles
             # In a more complex system, destructible tiles might have HP.
             game_instance.message_log.add_message(f"Your Fire Bolt smashes the {target_tile.name}!", (255, 165, 0))
-            game_instance.game_map.tiles[target_y][target_x] = floor  # Replace with floor tile
+            game_instance.game_map.set_tile(target_x, target_y, floor)  # Replace with floor tile
             
             # --- NEW: 20% chance to drop a healing potion ---
-            if random.random() < 0.20:  # 20% chance
+            if game_instance.rng.loot.random() < 0.20:  # 20% chance
                 # Create a new instance of the potion to avoid modifying the global one
                 potion_to_drop = lesser_healing_potion.__class__(
                     name=lesser_healing_potion.name,
@@ -340,15 +354,13 @@ class FireBolt(Ability):
                     effect_type=lesser_healing_potion.effect_type,
                     effect_value=lesser_healing_potion.effect_value
                 )
-                potion_to_drop.x = target_x
-                potion_to_drop.y = target_y
-                game_instance.game_map.items_on_ground.append(potion_to_drop)
+                game_instance.game_map.add_item(potion_to_drop, target_x, target_y)
                 game_instance.message_log.add_message(f"A {potion_to_drop.name} drops from the {target_tile.name}!", potion_to_drop.color)
             # --- END NEW ---
 
             # --- MISSING FLOATING TEXT CREATION HERE FOR DESTRUCTIBLE ---
-            game_instance.floating_texts.append(FloatingText(target_x, target_y, "SMASH!", (255, 100, 0)))
-            print(f"DEBUG: FireBolt added SMASH! FloatingText for {target_tile.name} at ({target_x},{target_y}). List size: {len(game_instance.floating_texts)}")  # <--- ADD THIS DEBUG
+            game_instance.floating_texts.spawn(target_x, target_y, "SMASH!", (255, 100, 0))
+            log.debug("FireBolt smashed %s at (%d,%d).", target_tile.name, target_x, target_y)
 
             # If it was a MimicTile, ensure the Mimic entity is also handled
             if isinstance(target_tile, MimicTile):
@@ -361,8 +373,8 @@ class FireBolt(Ability):
         else:
             game_instance.message_log.add_message("Fire Bolt requires a monster target or a destructible object.", (255, 150, 0))
             # --- MISSING FLOATING TEXT FOR MISS/INVALID TARGET ---
-            game_instance.floating_texts.append(FloatingText(target_x, target_y, "INVALID!", (255, 0, 0)))
-            print(f"DEBUG: FireBolt added INVALID! FloatingText for ({target_x},{target_y}). List size: {len(game_instance.floating_texts)}")  # <--- ADD THIS DEBUG
+            game_instance.floating_texts.spawn(target_x, target_y, "INVALID!", (255, 0, 0))
+            log.debug("FireBolt has no valid target at (%d,%d).", target_x, target_y)
             return False  # Invalid target, stay in targeting mode
 
 
@@ -404,8 +416,7 @@ class MistyStep(Ability):
             return False # Invalid target, stay in targeting mode
         
         # Perform the teleport
-        user.x = target_x
-        user.y = target_y
+        game_instance.game_map.move_entity(user, target_x, target_y)
         game_instance.message_log.add_message(f"{user.name} vanishes in a silvery mist and reappears!", (100, 255, 255))
         game_instance.update_fov() # Update FOV after teleporting
         return True # Successfully used ability    
@@ -486,7 +497,7 @@ class MageHand(Ability):
             if item_at_target.on_pickup(user, game_instance):  # Use the actual user as the picker
                 game_instance.message_log.add_message(f"The Mage Hand picks up the {item_at_target.name}!", (0, 255, 0))
                 # Remove the item from the ground after successful pickup
-                game_instance.game_map.items_on_ground.remove(item_at_target)  # <-- Remove from ground
+                game_instance.game_map.remove_item(item_at_target)  # <-- Remove from ground
                 return True  # Action successful, end turn
             else:
                 game_instance.message_log.add_message(f"The Mage Hand cannot pick up the {item_at_target.name}.", (255, 150, 0))
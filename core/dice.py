@@ -0,0 +1,211 @@
+# MultipleFiles/dice.py
+"""
+Dice expressions: "1d6", "2d6+3", "4d8kh3" (keep the highest 3), "2d20kl1".
+
+compile_dice() parses an expression once and caches the Dice, so items and traps
+can keep their damage as a plain string and still roll without parsing:
+
+    dice = compile_dice("2d6+1")
+    rolls = dice.roll_dice(game.rng.combat, critical=True) # 4 dice on a critical hit
+    damage = dice.total(rolls)
+
+Dice roll one rng.randint(1, sides) per die, in order, so rolls stay reproducible
+from the run seed. roll_many() rolls a batch at once for simulations (with numpy
+if it is installed) and distribution() gives the exact odds of every total.
+"""
+import itertools
+import math
+import re
+from fractions import Fraction
+
+try:
+    import numpy as np
+except ImportError: # roll_many() falls back to plain Python
+    np = None
+
+_DICE_RE = re.compile(r'^(\d*)d(\d+)(?:(kh|kl)(\d+))?([+-]\d+)?$')
+_CACHE = {}
+
+# Keep-highest/lowest distributions are worked out over every sorted roll; past this many
+# they would take too long
+MAX_KEEP_OUTCOMES = 200000
+
+
+class DiceError(ValueError):
+    pass
+
+
+class Dice:
+    __slots__ = ('count', 'sides', 'keep', 'keep_count', 'modifier', '_critical', '_distribution')
+
+    def __init__(self, count, sides, modifier=0, keep=None, keep_count=None):
+        """
+        Args:
+            count (int): Number of dice.
+            sides (int): Sides per die.
+            modifier (int): Added to the total.
+            keep (str): 'kh' to keep the highest keep_count dice, 'kl' the lowest, None for all.
+        """
+        if count < 1 or sides < 1:
+            raise DiceError(f"Need at least one die with at least one side: {count}d{sides}")
+        if keep is not None and not 1 <= keep_count <= count:
+            raise DiceError(f"Can't keep {keep_count} of {count} dice")
+        self.count = count
+        self.sides = sides
+        self.modifier = modifier
+        self.keep = keep
+        self.keep_count = keep_count if keep is not None else count
+        self._critical = None
+        self._distribution = None
+
+    def __str__(self):
+        text = f"{self.count}d{self.sides}"
+        if self.keep:
+            text += f"{self.keep}{self.keep_count}"
+        if self.modifier:
+            text += f"{self.modifier:+d}"
+        return text
+
+    def __repr__(self):
+        return f"Dice('{self}')"
+
+    def __eq__(self, other):
+        return isinstance(other, Dice) and str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __getstate__(self):
+        return (self.count, self.sides, self.modifier, self.keep, self.keep_count)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    @property
+    def minimum(self):
+        return self.keep_count + self.modifier
+
+    @property
+    def maximum(self):
+        return self.keep_count * self.sides + self.modifier
+
+    @property
+    def mean(self):
+        if self.keep is None:
+            return self.count * (self.sides + 1) / 2 + self.modifier
+        return sum(total * chance for total, chance in self.distribution().items())
+
+    def critical(self):
+        """The dice rolled on a critical hit: twice as many (the modifier is not doubled)."""
+        if self._critical is None:
+            keep_count = self.keep_count * 2 if self.keep else None
+            self._critical = Dice(self.count * 2, self.sides, self.modifier, self.keep, keep_count)
+        return self._critical
+
+    # --- Rolling ---
+    def roll_dice(self, rng, critical=False):
+        """Rolls every die (twice as many on a critical hit). Returns the list of results."""
+        dice = self.critical() if critical else self
+        sides = dice.sides
+        return [rng.randint(1, sides) for _ in range(dice.count)]
+
+    def total(self, rolls):
+        """Total of rolls from roll_dice(): the kept dice plus the modifier."""
+        if self.keep is None:
+            return sum(rolls) + self.modifier
+        keep_count = self.keep_count * len(rolls) // self.count # Doubled for critical rolls
+        kept = sorted(rolls, reverse=self.keep == 'kh')[:keep_count]
+        return sum(kept) + self.modifier
+
+    def roll(self, rng, critical=False):
+        return self.total(self.roll_dice(rng, critical))
+
+    def describe(self, rolls, critical=False):
+        """E.g. "2d6 (3 + 5)" for a message."""
+        dice = self.critical() if critical else self
+        return f"{dice} ({' + '.join(map(str, rolls))})"
+
+    def roll_many(self, n, rng=None, critical=False):
+        """
+        Rolls the expression n times for simulations and returns the totals (a numpy array
+        if numpy is installed, else a list).
+
+        Args:
+            rng: numpy Generator, or random.Random without numpy. None makes a fresh one.
+        """
+        dice = self.critical() if critical else self
+        if np is None:
+            import random
+            rng = rng or random.Random()
+            return [dice.roll(rng) for _ in range(n)]
+        if rng is None or not hasattr(rng, 'integers'):
+            rng = np.random.default_rng(rng.getrandbits(64) if rng is not None else None)
+        rolls = rng.integers(1, dice.sides + 1, size=(n, dice.count))
+        if dice.keep is not None:
+            rolls.sort(axis=1)
+            rolls = rolls[:, -dice.keep_count:] if dice.keep == 'kh' else rolls[:, :dice.keep_count]
+        return rolls.sum(axis=1) + dice.modifier
+
+    # --- Odds ---
+    def outcomes(self):
+        """Exact number of ways to roll each total, out of sides ** count. Returns {total: ways}."""
+        if self._distribution is None:
+            if self.keep is None:
+                ways = _sum_ways(self.count, self.sides)
+            else:
+                ways = _keep_ways(self.count, self.sides, self.keep, self.keep_count)
+            self._distribution = {total + self.modifier: count for total, count in ways.items()}
+        return self._distribution
+
+    def distribution(self, exact=False):
+        """Chance of every total, as floats (or Fractions if exact). For tooltips and balancing."""
+        all_rolls = self.sides ** self.count
+        if exact:
+            return {total: Fraction(ways, all_rolls) for total, ways in self.outcomes().items()}
+        return {total: ways / all_rolls for total, ways in self.outcomes().items()}
+
+    def chance_at_least(self, value):
+        """Chance of rolling value or more (e.g. enough damage to kill)."""
+        all_rolls = self.sides ** self.count
+        return sum(ways for total, ways in self.outcomes().items() if total >= value) / all_rolls
+
+
+def _sum_ways(count, sides):
+    """Ways to roll each sum of count dice, by repeated convolution."""
+    ways = {0: 1}
+    for _ in range(count):
+        next_ways = {}
+        for total, total_ways in ways.items():
+            for face in range(1, sides + 1):
+                next_ways[total + face] = next_ways.get(total + face, 0) + total_ways
+        ways = next_ways
+    return ways
+
+
+def _keep_ways(count, sides, keep, keep_count):
+    """Ways to roll each kept sum, counting each sorted roll once with its number of orderings."""
+    if math.comb(sides + count - 1, count) > MAX_KEEP_OUTCOMES:
+        raise DiceError(f"Too many outcomes to work out {count}d{sides}{keep}{keep_count} exactly")
+    ways = {}
+    orderings_all = math.factorial(count)
+    for combo in itertools.combinations_with_replacement(range(1, sides + 1), count):
+        orderings = orderings_all
+        for face_count in (combo.count(face) for face in set(combo)):
+            orderings //= math.factorial(face_count)
+        kept = combo[-keep_count:] if keep == 'kh' else combo[:keep_count]
+        total = sum(kept)
+        ways[total] = ways.get(total, 0) + orderings
+    return ways
+
+
+def compile_dice(expression):
+    """Parses a dice expression (cached: the same string always gives the same Dice). Raises DiceError."""
+    dice = _CACHE.get(expression)
+    if dice is None:
+        match = _DICE_RE.match(expression.replace(' ', '').lower())
+        if not match:
+            raise DiceError(f"Not a dice expression: {expression!r}")
+        count, sides, keep, keep_count, modifier = match.groups()
+        dice = Dice(int(count or 1), int(sides), int(modifier or 0), keep, int(keep_count) if keep else None)
+        _CACHE[expression] = dice
+    return dice
@@ -1,5 +1,43 @@
+import heapq
+
 import pygame
 import config # Import config for TILE_SIZE and font scaling
+from core.log import get_logger
+
+log = get_logger('render')
+
+# Fonts by (size, bold): pygame.font.SysFont does a system font lookup on every call
+_FONT_CACHE = {}
+# Rendered strings by (text, color, size, bold). Floating texts are mostly the same few
+# labels ("HIT!", "MISS!") and small damage numbers, so this stays small; it's cleared if not.
+_SURFACE_CACHE = {}
+SURFACE_CACHE_LIMIT = 512
+
+POOL_LIMIT = 64 # Expired FloatingText objects kept for reuse
+
+
+def get_font(size, bold=False):
+    font = _FONT_CACHE.get((size, bold))
+    if font is None:
+        font = _FONT_CACHE[(size, bold)] = pygame.font.SysFont('consolas', size, bold=bold)
+    return font
+
+
+def render_text(text, color, size, bold=True):
+    """Returns the (shared, don't draw on it) surface for text in the given color and size."""
+    key = (text, color, size, bold)
+    surface = _SURFACE_CACHE.get(key)
+    if surface is None:
+        if len(_SURFACE_CACHE) >= SURFACE_CACHE_LIMIT:
+            _SURFACE_CACHE.clear()
+        surface = _SURFACE_CACHE[key] = get_font(size, bold).render(text, True, color)
+    return surface
+
+
+def default_font_size():
+    # Scaled with TILE_SIZE: half a tile, but never below a readable size
+    return max(10, int(config.TILE_SIZE * 0.5))
+
 
 class FloatingText:
     def __init__(self, x, y, text, color, duration=60, y_speed=-0.5, font_size=None):
@@ -15,38 +53,29 @@ class FloatingText:
             y_speed (float): How fast the text moves upwards (pixels per frame).
             font_size (int, optional): Specific font size. If None, uses a scaled default.
         """
+        self.reset(x, y, text, color, duration, y_speed, font_size)
+
+    def reset(self, x, y, text, color, duration=60, y_speed=-0.5, font_size=None):
+        """(Re)initializes the text, so FloatingTextManager can reuse expired objects."""
         self.x = x # World X (tile coordinate)
         self.y = y # World Y (tile coordinate)
+        self.start_y = y
         self.text = text
         self.color = color
         self.duration = duration
         self.frames_left = duration
         self.y_speed = y_speed # Negative for upward movement
+        self.font_size = font_size if font_size is not None else default_font_size()
+        self.spawn_step = 0 # Set by FloatingTextManager
 
-        # Determine font size dynamically based on TILE_SIZE if not specified
-        if font_size is None:
-            self.font_size = int(config.TILE_SIZE * 0.5) # Example: half the tile size
-            if self.font_size < 10: # Ensure a minimum readable size
-                self.font_size = 10
-        else:
-            self.font_size = font_size
-            
-        self.font = pygame.font.SysFont('consolas', self.font_size, bold=True)
-        self.surface = self.font.render(self.text, True, self.color)
-        self.rect = self.surface.get_rect()
-
-
-    def update(self):
-        """Updates the text's position and remaining duration."""
-        # The y_speed is applied to the *world* y coordinate, which is then converted by the camera.
-        # This makes the text float up relative to its starting point.
-        self.y += self.y_speed / config.FPS # Divide by FPS to make speed frame-rate independent
-        self.frames_left -= 1
-
-        if self.frames_left <= 0:
-            print(f"DEBUG: FloatingText '{self.text}' at ({self.x:.2f},{self.y:.2f}) expired.") # <--- ADD THIS
+        # The text surface is only looked up the first time it is drawn, so game logic
+        # (and headless runs) never touch fonts
+        self.surface = None
+        self.rect = None
 
-        return self.frames_left > 0
+    def _render_surface(self):
+        self.surface = render_text(self.text, self.color, self.font_size)
+        self.rect = self.surface.get_rect()
 
 
     def draw(self, screen_surface, camera):
@@ -54,15 +83,104 @@ class FloatingText:
         Draws the floating text on the screen.
         Converts world coordinates to screen coordinates using the camera.
         """
+        if self.surface is None:
+            self._render_surface()
         screen_x_tile, screen_y_tile = camera.world_to_screen(self.x, self.y)
-        
+
 
         screen_x_pixel = screen_x_tile * config.TILE_SIZE
         screen_y_pixel = screen_y_tile * config.TILE_SIZE
-        
+
         draw_x = screen_x_pixel + (config.TILE_SIZE - self.rect.width) // 2
 
         draw_y = screen_y_pixel - self.rect.height
-        # print(f"DEBUG: Drawing FloatingText '{self.text}' at world ({self.x:.2f},{self.y:.2f}) -> screen_pixel ({draw_x},{draw_y})")
         screen_surface.blit(self.surface, (draw_x, draw_y))
 
+
+class FloatingTextManager:
+    """
+    The live floating texts of a game (Game.floating_texts).
+
+    Texts don't step themselves: the manager counts update steps, works out each text's
+    position from its age when drawing, and expires texts off a heap ordered by expiry
+    step, so an update costs nothing per live text. Expired texts go back to a pool.
+    Iterating yields the live texts in spawn order.
+
+    set_delay() holds back texts spawned from then on, so the texts of several monster
+    turns resolved in one frame still play one after another.
+    """
+    def __init__(self):
+        self.step = 0
+        self.delay = 0 # Update steps before newly spawned texts appear
+        self._live = {}     # sequence number -> FloatingText, in spawn order
+        self._expiry = []   # heap of (expiry step, sequence number)
+        self._pool = []
+        self._next_seq = 0
+
+    def spawn(self, x, y, text, color, duration=60, y_speed=-0.5, font_size=None):
+        """Adds a floating text (same arguments as FloatingText) and returns it."""
+        if self._pool:
+            floating_text = self._pool.pop()
+            floating_text.reset(x, y, text, color, duration, y_speed, font_size)
+        else:
+            floating_text = FloatingText(x, y, text, color, duration, y_speed, font_size)
+        self.add(floating_text)
+        return floating_text
+
+    def add(self, floating_text):
+        """Adds an already built FloatingText."""
+        seq = self._next_seq
+        self._next_seq += 1
+        floating_text.spawn_step = self.step + self.delay
+        self._live[seq] = floating_text
+        heapq.heappush(self._expiry, (floating_text.spawn_step + floating_text.frames_left, seq))
+
+    @property
+    def spawned(self):
+        """Texts added so far (compare before and after a turn to see if it spawned any)."""
+        return self._next_seq
+
+    def set_delay(self, steps):
+        """Texts spawned from now on appear after `steps` update steps (0: straight away)."""
+        self.delay = max(0, steps)
+
+    def update(self):
+        """Advances every text by one step and drops the expired ones. Returns how many expired."""
+        self.step += 1
+        expiry = self._expiry
+        expired = 0
+        while expiry and expiry[0][0] <= self.step:
+            _, seq = heapq.heappop(expiry)
+            floating_text = self._live.pop(seq, None)
+            if floating_text is None:
+                continue
+            expired += 1
+            log.debug("FloatingText '%s' at (%.2f,%.2f) expired.", floating_text.text, floating_text.x, floating_text.start_y)
+            if len(self._pool) < POOL_LIMIT:
+                floating_text.surface = None
+                self._pool.append(floating_text)
+        return expired
+
+    def draw(self, screen_surface, camera):
+        step = self.step
+        fps = config.FPS
+        for floating_text in self._live.values():
+            age = step - floating_text.spawn_step
+            if age < 0:
+                continue # Delayed, not shown yet
+            floating_text.y = floating_text.start_y + floating_text.y_speed / fps * age
+            floating_text.frames_left = floating_text.duration - age
+            floating_text.draw(screen_surface, camera)
+
+    def clear(self):
+        for floating_text in self._live.values():
+            if len(self._pool) < POOL_LIMIT:
+                self._pool.append(floating_text)
+        self._live.clear()
+        self._expiry.clear()
+
+    def __len__(self):
+        return len(self._live)
+
+    def __iter__(self):
+        return iter(list(self._live.values()))
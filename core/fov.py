@@ -1,74 +1,287 @@
 # MultipleFiles/fov.py
-import math
+
+# Octant transforms (xx, xy, yx, yy) mapping octant-relative offsets onto the map
+_OCTANTS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+)
+
+# Codes stored in the light grid. 0 means the tile is not lit this turn.
+LIGHT_NONE = 0
+LIGHT_TYPE_CODES = {'player': 1, 'torch': 2, 'darkvision': 3}
+LIGHT_TYPE_NAMES = [None, 'player', 'torch', 'darkvision']
+LIGHT_PLAYER = LIGHT_TYPE_CODES['player']
+LIGHT_DARKVISION = LIGHT_TYPE_CODES['darkvision']
+
+
+def get_light_code(light_source_type):
+    """Returns the light grid code for a light type, registering new types on first use."""
+    code = LIGHT_TYPE_CODES.get(light_source_type)
+    if code is None:
+        code = len(LIGHT_TYPE_NAMES)
+        if code > 255:
+            raise ValueError("Too many light types for the uint8 light grid.")
+        LIGHT_TYPE_CODES[light_source_type] = code
+        LIGHT_TYPE_NAMES.append(light_source_type)
+    return code
+
 
 class FOV:
     def __init__(self, game_map):
         self.game_map = game_map
-        self.visible_sources = {}
-        self.explored = set()
+        self.width = game_map.width
+        self.height = game_map.height
+
+        # uint8 grids indexed by y * width + x: light type code this turn, and explored flag
+        self.light = bytearray(self.width * self.height)
+        self.explored_mask = bytearray(self.width * self.height)
+        self.newly_explored = 0 # Tiles explored for the first time since the last clear_visible()
+        self._region = None # [x0, y0, x1, y1] bounding every tile lit since the last clear_visible()
+
+        # Static lightmap (torches): light position -> tile indexes it lights, and tile index -> number of lights on it
+        self.static_light_radius = 4
+        self._static_lights = {}
+        self._static_lit = {}
+        self._static_region = None
+        game_map.tile_listeners.append(self._on_tile_changed)
+
+    # --- Bulk queries ---
+    def clear_visible(self):
+        """Forget this turn's lighting (explored tiles stay explored)."""
+        self.light[:] = bytes(len(self.light))
+        self.newly_explored = 0
+        self._region = None
+
+
+    def light_everything(self, light_source_type='player'):
+        """Light and explore the whole map in one go (used for the tavern)."""
+        size = len(self.light)
+        self.newly_explored += self.explored_mask.count(0)
+        self.light[:] = bytes([get_light_code(light_source_type)]) * size
+        self.explored_mask[:] = b'\x01' * size
+        self._region = [0, 0, self.width - 1, self.height - 1]
+
+
+    def visible_region(self):
+        """
+        Returns (row_slice, column_slice) bounding every tile lit this turn, or None if nothing is lit.
+        The region may be slightly larger than the lit tiles; it never misses one.
+        """
+        if self._region is None:
+            return None
+        x0, y0, x1, y1 = self._region
+        return slice(y0, y1 + 1), slice(x0, x1 + 1)
+
+
+    def count_visible(self):
+        return len(self.light) - self.light.count(LIGHT_NONE)
+
+
+    def is_explored(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and bool(self.explored_mask[y * self.width + x])
+
+
+    @property
+    def visible_sources(self):
+        """{(x, y): light type} snapshot of this turn's lit tiles (slow, for debugging and tools)."""
+        width = self.width
+        return {(i % width, i // width): LIGHT_TYPE_NAMES[code] for i, code in enumerate(self.light) if code}
+
+
+    @property
+    def explored(self):
+        """Set snapshot of every explored (x, y) (slow, for debugging and tools)."""
+        width = self.width
+        return {(i % width, i // width) for i, flag in enumerate(self.explored_mask) if flag}
+
+
+    def _grow_region(self, x0, y0, x1, y1):
+        x0 = max(0, x0)
+        y0 = max(0, y0)
+        x1 = min(self.width - 1, x1)
+        y1 = min(self.height - 1, y1)
+        region = self._region
+        if region is None:
+            self._region = [x0, y0, x1, y1]
+        else:
+            region[0] = min(region[0], x0)
+            region[1] = min(region[1], y0)
+            region[2] = max(region[2], x1)
+            region[3] = max(region[3], y1)
     
     def compute_fov(self, origin_x, origin_y, radius=8, light_source_type='player', player_darkvision_radius=0):
-        """Compute field of view from origin point using simple raycasting"""
+        """Compute field of view from origin point using recursive shadowcasting"""
         
+        # Tiles further away than the normal sight radius are only seen thanks to darkvision (dim)
+        dim_beyond_sq = None
+        if light_source_type == 'player' and player_darkvision_radius > 0:
+            dim_beyond_sq = (radius + 0.5) ** 2
+
         # Adjust radius if player has darkvision and it's the player's light source
         # If player_darkvision_radius is greater than the base radius, use it.
         if light_source_type == 'player' and player_darkvision_radius > radius:
             radius = player_darkvision_radius # Use the extended darkvision radius
         
+        self._grow_region(origin_x - radius, origin_y - radius, origin_x + radius, origin_y + radius)
+        code = get_light_code(light_source_type)
+        width = self.width
+        mark_index = self._mark_index
+        def mark(x, y, dim):
+            mark_index(y * width + x, code, dim)
+        self._shadowcast(origin_x, origin_y, radius, dim_beyond_sq, mark)
+    
+
+    def _shadowcast(self, origin_x, origin_y, radius, dim_beyond_sq, mark):
+        """Calls mark(x, y, dim) for the origin and every tile visible from it within radius"""
         # Origin is always visible
-        self.visible_sources[(origin_x, origin_y)] = light_source_type
-        self.explored.add((origin_x, origin_y))
+        mark(origin_x, origin_y, False)
         
-        # Cast rays in all directions
-        # Pass player_darkvision_radius to _cast_ray as well, so it can tint correctly
-        for angle in range(0, 360, 2):
-            self._cast_ray(origin_x, origin_y, angle, radius, light_source_type, player_darkvision_radius)
+        # Each octant is scanned row by row; every tile is visited at most once per octant
+        for xx, xy, yx, yy in _OCTANTS:
+            self._cast_light(origin_x, origin_y, 1, 1.0, 0.0, radius, xx, xy, yx, yy, dim_beyond_sq, mark)
     
 
-    def _cast_ray(self, start_x, start_y, angle, max_distance, light_source_type, player_darkvision_radius=0):
-        """Cast a ray from start position at given angle"""
-        rad = math.radians(angle)
-        dx = math.cos(rad)
-        dy = math.sin(rad)
-        
-        for i in range(max_distance + 1):
-            x = int(start_x + dx * i)
-            y = int(start_y + dy * i)
-            
-            if not (0 <= x < self.game_map.width and 0 <= y < self.game_map.height):
-                break
-            
-            current_source = self.visible_sources.get((x, y))
-            
-            # CORRECTED LOGIC FOR DARKVISION TINTING
-            if light_source_type == 'player':
-                # If this ray is from the player's light source
-                # If darkvision is active and we are beyond the normal sight range (8)
-                if player_darkvision_radius > 0 and i > 6: 
-                    # This tile is visible due to darkvision, so it's dim
-                    if current_source != 'player': # Don't overwrite full player light if it's already set
-                        self.visible_sources[(x, y)] = 'darkvision' # 'darkvision' source type
-                elif current_source != 'player': # If not darkvision extended, and not already player light
-                    self.visible_sources[(x, y)] = 'player' # Set to full player light
-            elif current_source == 'player':
-                pass # Player light always takes precedence, don't downgrade
-            elif current_source == 'torch' and light_source_type == 'player':
-                self.visible_sources[(x, y)] = 'player' # Upgrade to player light
-            else: # No source, or current source is 'torch' and new source is 'torch'
-                self.visible_sources[(x, y)] = light_source_type
-
-            self.explored.add((x, y))
-            
-            if self.game_map.tiles[y][x].block_sight:
+    def _cast_light(self, cx, cy, row, start_slope, end_slope, radius, xx, xy, yx, yy, dim_beyond_sq, mark):
+        """Scan one octant from `row` outwards, recursing around every run of opaque tiles"""
+        if start_slope < end_slope:
+            return
+
+        width = self.game_map.width
+        height = self.game_map.height
+        tiles = self.game_map.tiles
+        radius_sq = (radius + 0.5) ** 2  # the extra half tile gives a rounder light circle
+        new_start = 0.0
+
+        for j in range(row, radius + 1):
+            dx = -j - 1
+            dy = -j
+            blocked = False
+            while dx <= 0:
+                dx += 1
+                # Translate the octant-relative (dx, dy) into map coordinates
+                x = cx + dx * xx + dy * xy
+                y = cy + dx * yx + dy * yy
+                left_slope = (dx - 0.5) / (dy + 0.5)
+                right_slope = (dx + 0.5) / (dy - 0.5)
+                if start_slope < right_slope:
+                    continue
+                elif end_slope > left_slope:
+                    break
+
+                in_bounds = 0 <= x < width and 0 <= y < height
+                distance_sq = dx * dx + dy * dy
+                if in_bounds and distance_sq <= radius_sq:
+                    mark(x, y, dim_beyond_sq is not None and distance_sq > dim_beyond_sq)
+
+                opaque = not in_bounds or tiles[y][x].block_sight
+                if blocked:
+                    # Scanning a run of opaque tiles
+                    if opaque:
+                        new_start = right_slope
+                        continue
+                    blocked = False
+                    start_slope = new_start
+                elif opaque and j < radius:
+                    # Start of an opaque run: light the rest of the octant past it first
+                    blocked = True
+                    self._cast_light(cx, cy, j + 1, start_slope, left_slope, radius, xx, xy, yx, yy,
+                                     dim_beyond_sq, mark)
+                    new_start = right_slope
+            if blocked:
                 break
 
 
+    def _mark(self, x, y, light_source_type, dim):
+        """Record that (x, y) is lit by light_source_type. Player light is never downgraded."""
+        self._mark_index(y * self.width + x, get_light_code(light_source_type), dim)
+
+
+    def _mark_index(self, i, code, dim):
+        light = self.light
+        if code == LIGHT_PLAYER:
+            if light[i] != LIGHT_PLAYER: # Don't overwrite full player light if it's already set
+                # Tiles only seen through darkvision are dim
+                light[i] = LIGHT_DARKVISION if dim else LIGHT_PLAYER
+        elif light[i] != LIGHT_PLAYER: # Player light always takes precedence
+            light[i] = code
+        if not self.explored_mask[i]:
+            self.explored_mask[i] = 1
+            self.newly_explored += 1
+
+
+    # --- Static lightmap ---
+    def set_static_lights(self, positions, radius=4):
+        """Build the lightmap for static light sources (torches). Call once per level."""
+        self.static_light_radius = radius
+        self._static_lights = {}
+        self._static_lit = {}
+        self._static_region = None
+        for position in positions:
+            self._add_static_light(position)
+
+
+    def apply_static_lights(self):
+        """Light every tile of the cached lightmap as 'torch' (player light still takes precedence)"""
+        if not self._static_lit:
+            return
+        torch_code = get_light_code('torch')
+        for i in self._static_lit:
+            self._mark_index(i, torch_code, False)
+        self._grow_region(*self._static_region)
+
+
+    def _add_static_light(self, position):
+        footprint = set()
+        width = self.width
+        self._shadowcast(position[0], position[1], self.static_light_radius, None,
+                         lambda x, y, dim: footprint.add(y * width + x))
+        self._static_lights[position] = footprint
+        for i in footprint:
+            self._static_lit[i] = self._static_lit.get(i, 0) + 1
+
+        # Keep a bounding box of everything the static lights can reach
+        radius = self.static_light_radius
+        x, y = position
+        if self._static_region is None:
+            self._static_region = [x - radius, y - radius, x + radius, y + radius]
+        else:
+            region = self._static_region
+            region[0] = min(region[0], x - radius)
+            region[1] = min(region[1], y - radius)
+            region[2] = max(region[2], x + radius)
+            region[3] = max(region[3], y + radius)
+
+
+    def _remove_static_light(self, position):
+        for i in self._static_lights.pop(position):
+            count = self._static_lit[i] - 1
+            if count:
+                self._static_lit[i] = count
+            else:
+                del self._static_lit[i]
+
+
+    def _on_tile_changed(self, x, y, old_tile, new_tile):
+        """Re-light only the static lights in range of a tile whose block_sight changed"""
+        if old_tile.block_sight == new_tile.block_sight:
+            return
+        reach_sq = (self.static_light_radius + 0.5) ** 2
+        for lx, ly in list(self._static_lights):
+            if (x - lx) ** 2 + (y - ly) ** 2 <= reach_sq:
+                self._remove_static_light((lx, ly))
+                self._add_static_light((lx, ly))
+
+
     # NEW: Update get_visibility_type to handle 'darkvision'
     def get_visibility_type(self, x, y):
         """Returns 'player', 'torch', 'darkvision', 'explored', or 'unexplored'"""
-        if (x, y) in self.visible_sources:
-            return self.visible_sources[(x, y)]
-        elif (x, y) in self.explored:
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return 'unexplored'
+        i = y * self.width + x
+        code = self.light[i]
+        if code:
+            return LIGHT_TYPE_NAMES[code]
+        elif self.explored_mask[i]:
             return 'explored'
         return 'unexplored'
 
@@ -1,5 +1,6 @@
+import time
+
 import pygame
-import random
 import config
 
 
@@ -15,7 +16,7 @@ class GameState:
 
 
 from core.fov import FOV
-from world.map import GameMap
+from world.map import GameMap, ArrayGameMap
 from world.dungeon_generator import generate_dungeon
 from world.tavern_generator import generate_tavern
 from entities.player import Player, Fighter, Rogue, Wizard
@@ -34,13 +35,24 @@ from entities.races import Human, HillDwarf, DrowElf # NEW: Import DrowElf
 from entities.summons import MageHandEntity
 from core.abilities import SecondWind, PowerAttack, CunningAction, Evasion, FireBolt, MistyStep, MageHand
 from core.message_log import MessageBox
-from core.status_effects import PowerAttackBuff, CunningActionDashBuff, EvasionBuff
+from core.status_effects import PowerAttackBuff, CunningActionDashBuff, EvasionBuff, POWER_ATTACK
 from items.items import Potion, Weapon, Armor, Chest, lesser_healing_potion
-from core.pathfinding import astar
+from core.pathfinding import astar, DistanceMap
 from world.tile import floor, MimicTile, TrapTile
-from core.floating_text import FloatingText 
+from core.floating_text import FloatingTextManager
+from core.map_layer import MapLayer
+from core.rng import GameRNG
+from core.profiler import Profiler
+from core.level_store import LevelStore, StoredLevel
+from core.scheduler import TurnScheduler
+from core.timers import TimerWheel
+from core import log as game_log
 import graphics
 
+log = game_log.get_logger('game')
+input_log = game_log.get_logger('input')
+render_log = game_log.get_logger('render')
+
 
 INTERNAL_WIDTH = 800
 INTERNAL_HEIGHT = 600
@@ -102,20 +114,53 @@ class Camera:
 
 
 class Game:
-    def __init__(self, screen):
+    def __init__(self, screen, headless=False, seed=None):
+        """
+        Args:
+            screen (pygame.Surface): The display surface, or None when headless.
+            headless (bool): Run the game logic only: no surfaces, fonts or tileset are touched
+                             and render() does nothing (see core/headless.py).
+            seed (int, optional): Run seed. Defaults to config.RNG_SEED, then to a fresh one.
+        """
         self.screen = screen
+        self.headless = headless
+
+        # Every random roll in a run comes from this, so the run can be replayed from rng.seed
+        self.rng = GameRNG(seed if seed is not None else config.RNG_SEED)
+        log.info("Run seed %d", self.rng.seed)
+
+        # Phase timings (F3 toggles, F4 exports). None while off, so instrumented code only pays an `if`.
+        self.profiler = Profiler() if config.PROFILER_ENABLED else None
+        self.show_profiler_overlay = config.PROFILER_ENABLED
+        self._profiler_overlay_surface = None
+        self._profiler_overlay_time = 0.0
         
         self.internal_surface = None
         self.inventory_ui_surface = None
         self.camera = None
         self.message_log = None
+
+        # Retained rendering state (see render())
+        self.map_layer = MapLayer()
+        self._needs_full_redraw = True
+        self._last_rendered_state = None
+        self._last_camera_offset = None
+        self._game_area_had_overlay = False
+        self.game_area_rect = None
+        self.scaled_game_area = None
+        self._game_area_scaled = False
         
         self.entities = []  # Initialize the entities list here
-        self.turn_order = []  # Initialize the turn order list
-        self.current_turn_index = 0
+        self._distance_maps = {}  # name -> (game_map, map revision, DistanceMap), see get_distance_map()
+        self.scheduler = TurnScheduler() # Who acts next on the current level
+        self.timers = TimerWheel() # Effect expiry, cooldowns and summon lifetimes, in player turns
+        self._dead_entities = [] # Reported by entity_died(), removed by cleanup_entities()
         
-        self._recalculate_dimensions() 
-        self._init_fonts()
+        if self.headless:
+            self._init_headless_dimensions()
+        else:
+            self._recalculate_dimensions() 
+            self._init_fonts()
 
         # NEW: Start in character creation state
         self.game_state = GameState.CHARACTER_CREATION 
@@ -127,9 +172,11 @@ class Game:
             0,
             config.SCREEN_HEIGHT - config.MESSAGE_LOG_HEIGHT,
             config.GAME_AREA_WIDTH,
-            config.MESSAGE_LOG_HEIGHT
+            config.MESSAGE_LOG_HEIGHT,
+            headless=self.headless
         )
-        self._recalculate_dimensions()
+        if not self.headless:
+            self._recalculate_dimensions()
 
         self.ability_in_use = None
         self.targeting_ability_range = 0
@@ -138,7 +185,17 @@ class Game:
             
         self.message_log.add_message("Welcome to the dungeon!", (100, 255, 100))
         
-        self.floating_texts = []  # Initialize floating texts list
+        self.floating_texts = FloatingTextManager()  # Live floating texts (spawn() adds one)
+
+        # Visited dungeon levels, restored when the stairs lead back to them
+        self.level_store = LevelStore(hot_levels=config.LEVEL_STORE_HOT_LEVELS,
+                                      memory_budget=config.LEVEL_STORE_MEMORY_BUDGET,
+                                      spill_dir=config.LEVEL_STORE_SPILL_DIR)
+
+        # Sidebar cache (see draw_ui)
+        self._ui_panel_surface = None
+        self._ui_panel_dirty = True
+        self._ui_panel_signature = None
 
         # REMOVED: Player creation moved to character_creation_start
         self.player = None 
@@ -231,6 +288,11 @@ class Game:
         
         self.player.race = chosen_race
         self.player.race.apply_traits(self.player, self) 
+        self.player.add_change_listener(self._on_player_changed)
+        # A new character starts a new dungeon
+        self.level_store.clear()
+        self.level_store.external['player'] = self.player
+        self.timers.clear()
         
         # REMOVED: self.player.has_darkvision = self.player.race.has_darkvision (handled by apply_traits)
         self.player.damage_resistances.extend(self.player.race.damage_resistances)
@@ -287,6 +349,8 @@ class Game:
         
         self.internal_surface = pygame.Surface((config.INTERNAL_GAME_AREA_PIXEL_WIDTH, config.INTERNAL_GAME_AREA_PIXEL_HEIGHT)).convert_alpha()
         
+        self._layout_game_area()
+        
         self.inventory_ui_surface = pygame.Surface((config.GAME_AREA_WIDTH, config.SCREEN_HEIGHT - config.MESSAGE_LOG_HEIGHT)).convert_alpha()
         self.inventory_ui_surface.fill((0,0,0,0))
 
@@ -298,22 +362,29 @@ class Game:
         self.camera.viewport_height = config.INTERNAL_GAME_AREA_HEIGHT_TILES
         
         if self.message_log is not None: 
-            self.message_log.rect.x = 0
-            self.message_log.rect.y = config.SCREEN_HEIGHT - config.MESSAGE_LOG_HEIGHT
-            self.message_log.rect.width = config.GAME_AREA_WIDTH
-            self.message_log.rect.height = config.MESSAGE_LOG_HEIGHT
-            
             new_font_size = int(config.MESSAGE_LOG_FONT_BASE_SIZE * config.TARGET_EFFECTIVE_TILE_SCALE)
             if new_font_size < 8: new_font_size = 8 
-            self.message_log.font = pygame.font.SysFont('consolas', new_font_size)
-            
-            self.message_log.line_height = self.message_log.font.get_linesize()
-            self.message_log.max_lines = self.message_log.rect.height // self.message_log.line_height
+            # Re-wraps the scrollback only if the width or font size actually changed
+            self.message_log.resize(0, config.SCREEN_HEIGHT - config.MESSAGE_LOG_HEIGHT,
+                                    config.GAME_AREA_WIDTH, config.MESSAGE_LOG_HEIGHT, font_size=new_font_size)
         
+        self._needs_full_redraw = True
+        self._ui_panel_dirty = True
+
+        # Cached tile surfaces are only valid for the tile size they were baked at
+        if graphics.tile_cache_size() != config.TILE_SIZE:
+            graphics.invalidate_tile_cache()
         graphics.setup_tile_mapping() 
         self._init_fonts() 
 
 
+    def _init_headless_dimensions(self):
+        """Headless stand-in for _recalculate_dimensions(): only the camera, which level setup positions."""
+        self.camera = Camera(config.BASE_SCREEN_WIDTH, config.BASE_SCREEN_HEIGHT, config.TILE_SIZE, 0)
+        self.camera.viewport_width = config.INTERNAL_GAME_AREA_WIDTH_TILES
+        self.camera.viewport_height = config.INTERNAL_GAME_AREA_HEIGHT_TILES
+
+
     def _init_fonts(self):
         """Initializes or re-initializes fonts based on current TILE_SIZE and screen dimensions."""
         
@@ -331,10 +402,17 @@ class Game:
         self.font_small = pygame.font.SysFont('consolas', 14)
         
 
+    def create_game_map(self, width, height):
+        """Creates an empty map using the storage mode picked in config.MAP_STORAGE."""
+        if config.MAP_STORAGE == 'array':
+            return ArrayGameMap(width, height)
+        return GameMap(width, height)
+
+
     def generate_tavern(self):
         self.game_state = GameState.TAVERN
         self._previous_game_state = GameState.TAVERN
-        self.game_map = GameMap(40, 24)
+        self.game_map = self.create_game_map(40, 24)
         self.fov = FOV(self.game_map)
         self.door_position = generate_tavern(self.game_map)
         
@@ -356,9 +434,11 @@ class Game:
         self.camera.target_y = float(self.player.y)        
         
         self.npcs = create_tavern_npcs(self.game_map, self.door_position)
-        self.entities = [self.player] + self.npcs
-        self.turn_order = []
-        self.current_turn_index = 0
+        self.entities = []
+        for entity in [self.player] + self.npcs:
+            self.add_entity(entity)
+        self.scheduler.clear()
+        self._dead_entities = []
         self.update_fov()
         
         self.message_log.add_message("=== WELCOME TO THE PRANCING PONY TAVERN ===", (255, 215, 0))
@@ -371,10 +451,11 @@ class Game:
         self.current_level = level_number
         self.max_level_reached = max(self.max_level_reached, level_number)
         
-        self.game_map = GameMap(80, 45)
+        self.game_map = self.create_game_map(80, 45)
         self.fov = FOV(self.game_map)
         
-        rooms, self.stairs_positions, self.torch_light_sources = generate_dungeon(self.game_map, level_number)
+        rooms, self.stairs_positions, self.torch_light_sources = generate_dungeon(self.game_map, level_number, rng=self.rng.mapgen)
+        self.fov.set_static_lights(self.torch_light_sources, radius=4)
         
         if spawn_on_stairs_up and 'up' in self.stairs_positions:
             start_x, start_y = self.stairs_positions['up']
@@ -384,20 +465,10 @@ class Game:
         self.player.x = start_x
         self.player.y = start_y
 
-
-        ideal_x = self.player.x - self.camera.viewport_width // 2
-        ideal_y = self.player.y - self.camera.viewport_height // 2
-        # Clamp ideal position to map boundaries
-        ideal_x = max(0, min(ideal_x, self.game_map.width - self.camera.viewport_width))
-        ideal_y = max(0, min(ideal_y, self.game_map.height - self.camera.viewport_height))
-        self.camera.x = ideal_x
-        self.camera.y = ideal_y
-        self.camera.target_x = self.player.x # Also set target_x/y so lerp starts correctly
-        self.camera.target_y = self.player.y
-        # No need to call self.camera.update here, as render will do it.
-
+        self._snap_camera_to_player()
         
-        self.entities = [self.player]
+        self.entities = []
+        self.add_entity(self.player)
         
         monsters_per_level = min(2 + level_number, len(rooms) - 1)
         monster_rooms = rooms[1:monsters_per_level + 1]
@@ -418,7 +489,7 @@ class Game:
                 self.game_map.is_walkable(x, y)):
 
                 # Randomly choose a monster class from the possible_monsters list
-                chosen_monster_class = random.choice(possible_monsters)
+                chosen_monster_class = self.rng.mapgen.choice(possible_monsters)
                 
                 # Mimic is handled separately as a special case in dungeon_generator.py
                 if chosen_monster_class == Mimic:
@@ -435,19 +506,19 @@ class Game:
                 # This would require adding 'base_hp', 'base_attack_power' attributes to your monster classes.
                 # For now, their __init__ values are static.
 
-                self.entities.append(monster)
+                self.add_entity(monster)
                 self.message_log.add_message(f"A {monster.name} appears!", (255, 150, 0))
 
-        if len(rooms) > 2 and random.random() < 0.6:
+        if len(rooms) > 2 and self.rng.mapgen.random() < 0.6:
             shuffled_healer_rooms = list(rooms[1:-1])
-            random.shuffle(shuffled_healer_rooms)
+            self.rng.mapgen.shuffle(shuffled_healer_rooms)
             healer_spawned = False
             for healer_room in shuffled_healer_rooms:
                 possible_spawn_points = []
                 for y_coord in range(healer_room.y1 + 2, healer_room.y2 - 1):
                     for x_coord in range(healer_room.x1 + 2, healer_room.x2 - 1):
                         if self.game_map.is_walkable(x_coord, y_coord) and \
-                           not any(e.x == x_coord and e.y == y_coord for e in self.entities):
+                           not self.game_map.entities_at(x_coord, y_coord):
                             is_near_tunnel = False
                             for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
                                 neighbor_x, neighbor_y = x_coord + dx, y_coord + dy
@@ -459,9 +530,9 @@ class Game:
                                 possible_spawn_points.append((x_coord, y_coord))
                 
                 if possible_spawn_points:
-                    healer_x, healer_y = random.choice(possible_spawn_points)
+                    healer_x, healer_y = self.rng.mapgen.choice(possible_spawn_points)
                     dungeon_healer = DungeonHealer(healer_x, healer_y)
-                    self.entities.append(dungeon_healer)
+                    self.add_entity(dungeon_healer)
                     self.message_log.add_message(f"You sense a benevolent presence nearby...", (0, 255, 255))
                     self.message_log.add_message(f"A {dungeon_healer.name} is at ({healer_x}, {healer_y})", (0, 255, 255))
                     healer_spawned = True
@@ -479,21 +550,14 @@ class Game:
         item_spawn_chance = 0.9
 
         for room in rooms:
-            if random.random() < item_spawn_chance:
+            if self.rng.mapgen.random() < item_spawn_chance:
                 item_x, item_y = room.center()
                 
-                is_blocked_by_non_item_entity = False
-                for e in self.entities:
-                    if e.x == item_x and e.y == item_y and \
-                       (isinstance(e, Monster) and not isinstance(e, Mimic) or isinstance(e, NPC)):
-                        is_blocked_by_non_item_entity = True
-                        break
+                is_blocked_by_non_item_entity = any(
+                    isinstance(e, Monster) and not isinstance(e, Mimic) or isinstance(e, NPC)
+                    for e in self.game_map.entities_at(item_x, item_y))
 
-                is_occupied_by_another_item = False
-                for existing_item in self.game_map.items_on_ground:
-                    if existing_item.x == item_x and existing_item.y == item_y:
-                        is_occupied_by_another_item = True
-                        break
+                is_occupied_by_another_item = bool(self.game_map.items_at(item_x, item_y))
 
 
                 is_decorative_tile = self.game_map.tiles[item_y][item_x] != floor                    
@@ -505,7 +569,7 @@ class Game:
                     not is_decorative_tile:
                     
 
-                    chosen_template = random.choice(item_templates)
+                    chosen_template = self.rng.mapgen.choice(item_templates)
                     item_to_add = chosen_template.__class__(
                         name=chosen_template.name,
                         char=chosen_template.char,
@@ -514,23 +578,85 @@ class Game:
                         **{k: v for k, v in chosen_template.__dict__.items() if k not in ['name', 'char', 'color', 'description', 'owner', 'x', 'y']}
                     )
 
-                    item_to_add.x = item_x
-                    item_to_add.y = item_y
-                    self.game_map.items_on_ground.append(item_to_add)
+                    self.game_map.add_item(item_to_add, item_x, item_y)
                     self.message_log.add_message(f"You spot a {item_to_add.name} on the ground.", item_to_add.color)
 
-        self.turn_order = [e for e in self.entities if not (isinstance(e, Mimic) and e.disguised)]
-        for entity in self.turn_order:
-            entity.roll_initiative()
+        actors = [e for e in self.entities if not (isinstance(e, Mimic) and e.disguised)]
+        for entity in actors:
+            entity.roll_initiative(self.rng.combat)
         
-        self.turn_order = sorted(self.turn_order, key=lambda e: e.initiative, reverse=True)
-        self.current_turn_index = 0
+        self.scheduler.reset(actors)
+        self._dead_entities = []
         self.update_fov()
         
         self.message_log.add_message(f"=== ENTERED DUNGEON LEVEL {level_number} ===", (0, 255, 255))        
         if hasattr(self, 'stairs_positions'):
             self.message_log.add_message(f"Stairs down at {self.stairs_positions.get('down')}", (150, 150, 255))
 
+    def _snap_camera_to_player(self):
+        ideal_x = self.player.x - self.camera.viewport_width // 2
+        ideal_y = self.player.y - self.camera.viewport_height // 2
+        # Clamp ideal position to map boundaries
+        ideal_x = max(0, min(ideal_x, self.game_map.width - self.camera.viewport_width))
+        ideal_y = max(0, min(ideal_y, self.game_map.height - self.camera.viewport_height))
+        self.camera.x = ideal_x
+        self.camera.y = ideal_y
+        self.camera.target_x = self.player.x # Also set target_x/y so lerp starts correctly
+        self.camera.target_y = self.player.y
+        # No need to call self.camera.update here, as render will do it.
+
+    def enter_level(self, level_number, spawn_on_stairs_up=False):
+        """Goes to a dungeon level: the stored one if it was visited before, else a freshly generated one."""
+        stored = self.level_store.take(level_number)
+        if stored is None:
+            self.generate_level(level_number, spawn_on_stairs_up)
+        else:
+            self._restore_level(level_number, stored)
+
+    def _store_current_level(self):
+        """Puts the dungeon level being left into the level store (without the player)."""
+        if self.game_state == GameState.TAVERN or getattr(self, "game_map", None) is None:
+            return
+        self.game_map.remove_entity(self.player)
+        entities = [e for e in self.entities if e is not self.player]
+        # Off-level timers would fire on the wrong level (and can't be pickled): stop them
+        for entity in entities:
+            if hasattr(entity, 'pause_timers'):
+                entity.pause_timers(self)
+        self.level_store.put(self.current_level, StoredLevel(
+            self.game_map, self.fov,
+            entities,
+            [e for e in self.scheduler if e is not self.player],
+            self.stairs_positions, self.torch_light_sources,
+            (self.player.x, self.player.y),
+        ))
+
+    def _restore_level(self, level_number, stored):
+        self.game_state = GameState.DUNGEON
+        self._previous_game_state = GameState.DUNGEON
+        self.current_level = level_number
+        self.max_level_reached = max(self.max_level_reached, level_number)
+
+        self.game_map = stored.game_map
+        self.fov = stored.fov
+        self.stairs_positions = stored.stairs_positions
+        self.torch_light_sources = stored.torch_light_sources
+
+        # Back where the player left, i.e. on the stairs they took
+        self.player.x, self.player.y = stored.player_position
+        self._snap_camera_to_player()
+
+        self.entities = list(stored.entities) # Already in the map's position index
+        for entity in self.entities:
+            if hasattr(entity, 'resume_timers'):
+                entity.resume_timers(self)
+        self.add_entity(self.player)
+        self.scheduler.reset(sorted(stored.turn_order + [self.player], key=lambda e: e.initiative, reverse=True))
+        self._dead_entities = []
+        self.update_fov()
+
+        self.message_log.add_message(f"=== RETURNED TO DUNGEON LEVEL {level_number} ===", (0, 255, 255))
+
     def check_tavern_door_interaction(self):
         if self.game_state == GameState.TAVERN:
             player_pos = (self.player.x, self.player.y)
@@ -539,20 +665,17 @@ class Game:
 
     def check_npc_interaction(self):
         if self.game_state == GameState.TAVERN:
-            for npc in self.npcs:
-                if (abs(self.player.x - npc.x) <= 1 and
-                    abs(self.player.y - npc.y) <= 1 and
-                    (abs(self.player.x - npc.x) + abs(self.player.y - npc.y)) == 1):
-                    return npc
+            for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
+                for npc in self.game_map.entities_at(self.player.x + dx, self.player.y + dy):
+                    if npc in self.npcs:
+                        return npc
         return None
 
     def check_dungeon_npc_interaction(self):
         if self.game_state == GameState.DUNGEON:
-            for entity in self.entities:
-                if isinstance(entity, DungeonHealer):
-                    if (abs(self.player.x - entity.x) <= 1 and
-                        abs(self.player.y - entity.y) <= 1 and
-                        (abs(self.player.x - entity.x) + abs(self.player.y - entity.y)) == 1):
+            for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
+                for entity in self.game_map.entities_at(self.player.x + dx, self.player.y + dy):
+                    if isinstance(entity, DungeonHealer):
                         return entity
         return None
 
@@ -570,45 +693,71 @@ class Game:
         if direction == 'down':
             new_level = self.current_level + 1
             self.message_log.add_message(f"Going down to level {new_level}...", (100, 200, 255))
-            self.generate_level(new_level, spawn_on_stairs_up=False)
+            self._store_current_level()
+            self.enter_level(new_level, spawn_on_stairs_up=False)
         elif direction == 'up' and self.current_level > 1:
             new_level = self.current_level - 1
             self.message_log.add_message(f"Going up to level {new_level}...", (100, 200, 255))
-            self.generate_level(new_level, spawn_on_stairs_up=True)
+            self._store_current_level()
+            self.enter_level(new_level, spawn_on_stairs_up=True)
         elif direction == 'up' and self.current_level == 1:
             self.message_log.add_message("Returning to tavern...", (100, 200, 255))
+            self._store_current_level()
             self.generate_tavern()
 
     def update_fov(self):
         if self.game_state == GameState.TAVERN:
-            self.fov.visible_sources.clear()
-            self.fov.explored.clear()
-            for y in range(self.game_map.height):
-                for x in range(self.game_map.width):
-                    self.fov.visible_sources[(x, y)] = 'player'
-                    self.fov.explored.add((x, y))
+            self.fov.light_everything('player')
         else:
-            self.fov.visible_sources.clear()
+            self.fov.clear_visible()
             # Pass player.darkvision_radius to compute_fov
             self.fov.compute_fov(self.player.x, self.player.y, radius=6, light_source_type='player', player_darkvision_radius=self.player.darkvision_radius)
-            for tx, ty in self.torch_light_sources:
-                self.fov.compute_fov(tx, ty, radius=4, light_source_type='torch')
+            # Torches don't move, their light comes from the lightmap built in generate_level
+            self.fov.apply_static_lights()
+
+    def get_distance_map(self, name, goals):
+        """
+        Returns a DistanceMap toward goals (a list of (x, y)), cached under name.
+        It is only rebuilt when the goals, the level or the map's walkability change,
+        so every monster chasing the same goal shares one BFS.
+        """
+        goals = tuple(goals)
+        cached = self._distance_maps.get(name)
+        if cached is not None:
+            game_map, revision, distance_map = cached
+            if game_map is self.game_map and revision == self.game_map.revision and distance_map.goals == goals:
+                return distance_map
+        distance_map = DistanceMap(self.game_map, goals)
+        self._distance_maps[name] = (self.game_map, self.game_map.revision, distance_map)
+        return distance_map
+
+    def get_player_distance_map(self):
+        """Distance map rooted at the player, recomputed only after the player moves."""
+        return self.get_distance_map('player', [(self.player.x, self.player.y)])
 
     def get_current_entity(self):
-        if not self.turn_order or self.game_state == GameState.TAVERN:
+        if self.game_state == GameState.TAVERN:
             return self.player
-        if self.current_turn_index >= len(self.turn_order):
-            self.current_turn_index = 0
-        return self.turn_order[self.current_turn_index]
+        return self.scheduler.current() or self.player
 
     def next_turn(self):
+        profiler = self.profiler
+        if not profiler:
+            self._advance_turn()
+            return
+        profiler.begin('turn')
+        self._advance_turn()
+        profiler.end('turn')
+
+    def _advance_turn(self):
+        profiler = self.profiler
         if self.game_state == GameState.TAVERN:
-            if random.random() < 0.3:
+            if self.rng.flavor.random() < 0.3:
                 ambient_msgs = [
                     "The torch flickers, casting long shadows...",
                     "Distant drips echo through the stone halls..."
                 ]
-                self.message_log.add_message(random.choice(ambient_msgs), (150, 150, 150))
+                self.message_log.add_message(self.rng.flavor.choice(ambient_msgs), (150, 150, 150))
             return
         
         # Get the entity whose turn it *just was* or *is currently* before advancing the index
@@ -618,73 +767,84 @@ class Game:
         # This ensures effects tick down AFTER their actions, but before the next entity's turn.
         if current_acting_entity:
             current_acting_entity.process_status_effects(self)
+            if current_acting_entity is self.player:
+                self.timers.advance() # Timers count the player's turns
+        if profiler:
+            profiler.mark('turn', 'status_effects')
 
         self.cleanup_entities()
+        if profiler:
+            profiler.mark('turn', 'cleanup')
 
         # If after cleanup, there are no entities left (e.g., all monsters died)
-        if not self.turn_order:
+        if not self.scheduler:
             if self.player.alive:
-                self.turn_order = [self.player] # Ensure player is in turn order
-                self.current_turn_index = 0
+                self.scheduler.reset([self.player]) # Ensure player is in turn order
                 self.player_has_acted = False # Reset for player's next turn
                 self.update_fov()
             return # No more turns to process if no entities
 
-        # Advance the turn index to the next entity
-        self.current_turn_index = (self.current_turn_index + 1) % len(self.turn_order)
+        # Hand the turn to the next entity
+        self.scheduler.advance()
         
-        # Get the entity whose turn it is now (after advancing the index)
+        # Get the entity whose turn it is now
         current = self.get_current_entity() 
 
         # If it's the player's turn, reset their action flag and update FOV
         if current == self.player:
+            if profiler:
+                profiler.mark('turn', 'other')
             self.update_fov()
+            if profiler:
+                profiler.mark('turn', 'fov')
             self.player_has_acted = False # This is correctly reset for player's turn
-            if random.random() < 0.25:
+            if self.rng.flavor.random() < 0.25:
                 ambient_msgs = [
                     "The dungeon emits an eerie glow...",
                     "Something shuffles in the darkness..."
                 ]
-                self.message_log.add_message(random.choice(ambient_msgs), (180, 180, 180))
+                self.message_log.add_message(self.rng.flavor.choice(ambient_msgs), (180, 180, 180))
         # If it's a monster's turn, it will be handled by the update loop in Game.update()
+        if profiler:
+            profiler.mark('turn', 'other')
+
+
+    def add_entity(self, entity):
+        """Adds an entity to the level, at its current position."""
+        self.entities.append(entity)
+        self.game_map.add_entity(entity)
+
+    def remove_entity(self, entity):
+        if entity in self.entities:
+            self.entities.remove(entity)
+            self.game_map.remove_entity(entity)
 
 
+    def add_summon(self, summon):
+        """Puts a summoned entity on the level: it gets turns and vanishes when its duration runs out."""
+        self.add_entity(summon)
+        summon.roll_initiative(self.rng.combat)
+        self.scheduler.add(summon)
+        summon.start_duration(self)
+
+    def entity_died(self, entity):
+        """Called by take_damage() when an entity dies. It is removed at the end of the turn."""
+        self._dead_entities.append(entity)
+
     def cleanup_entities(self):
-        # Store the entity whose turn it *was* or *is about to be*
-        entity_whose_turn_it_was = None
-        if self.turn_order and 0 <= self.current_turn_index < len(self.turn_order):
-            entity_whose_turn_it_was = self.turn_order[self.current_turn_index]
-        # Filter out dead entities from the main entities list
-        self.entities = [e for e in self.entities if e.alive]
-        
-        # Rebuild the turn_order list with only alive entities
-        new_turn_order = []
-        for entity in self.turn_order:
+        """Removes the entities that died this turn from the level and the turn order."""
+        if not self._dead_entities:
+            return
+        dead, self._dead_entities = self._dead_entities, []
+        for entity in dead:
             if entity.alive:
-                new_turn_order.append(entity)
-        self.turn_order = new_turn_order
-        
-        # If the player is the only one left, ensure they are in turn_order
-        if not self.turn_order and self.player.alive:
-            self.turn_order = [self.player]
-            self.current_turn_index = 0
-            return # Nothing else to do if only player remains
-        # Adjust current_turn_index based on who was supposed to act
-        if entity_whose_turn_it_was and entity_whose_turn_it_was in self.turn_order:
-            # If the entity whose turn it was is still alive, maintain its position
-            self.current_turn_index = self.turn_order.index(entity_whose_turn_it_was)
-        else:
-            # If the entity whose turn it was died or was removed,
-            # move the index back one to compensate for the next_turn increment,
-            # or wrap around if it was the last entity.
-            # This ensures the *next* entity in the sequence gets its turn.
-            self.current_turn_index = (self.current_turn_index - 1 + len(self.turn_order)) % len(self.turn_order)
-            # If the list became empty, this would cause an error, but we handle that above.
-            # If the list is not empty, this will point to the entity that is now at the "previous" spot.
-            # next_turn() will then increment it to the correct "next" entity.
-        # Ensure index is within bounds after cleanup
-        if self.current_turn_index >= len(self.turn_order):
-            self.current_turn_index = 0 # Reset if somehow out of bounds (e.g., all entities died except player)
+                continue # Brought back since (e.g. healed)
+            self.remove_entity(entity)
+            self.scheduler.remove(entity)
+
+        # If the player is the only one left, ensure they are in the turn order
+        if not self.scheduler and self.player.alive:
+            self.scheduler.reset([self.player])
 
 
     def handle_events(self):
@@ -698,7 +858,24 @@ class Game:
                 self.render()            
 
             if event.type == pygame.KEYDOWN:
-                print(f"  DEBUG KEYDOWN event: {pygame.key.name(event.key)} (value: {event.key})")
+                input_log.debug("KEYDOWN event: %s (value: %d)", pygame.key.name(event.key), event.key)
+                # --- NEW: Debug keys work in every state ---
+                if event.key == pygame.K_F2:
+                    debug_on = game_log.toggle_debug()
+                    self.message_log.add_message(f"Debug logging {'on' if debug_on else 'off'}.", (180, 180, 180))
+                    continue
+                if event.key == pygame.K_F3:
+                    self.toggle_profiler()
+                    continue
+                if event.key == pygame.K_F4:
+                    self.export_profile()
+                    continue
+                if event.key == pygame.K_PAGEUP:
+                    self.message_log.page_up()
+                    continue
+                if event.key == pygame.K_PAGEDOWN:
+                    self.message_log.page_down()
+                    continue
                 
                 # --- NEW: Handle Character Creation Input ---
                 if self.game_state == GameState.CHARACTER_CREATION:
@@ -716,19 +893,19 @@ class Game:
                        return True  # Consume event so no other input is processed
 
                 if self.game_state == GameState.CLASS_SELECTION:
-                    print(f"DEBUG: In CLASS_SELECTION state. Selected Class Index: {self.selected_class_index}")
+                    input_log.debug("In CLASS_SELECTION state. Selected Class Index: %d", self.selected_class_index)
                     if event.key == pygame.K_UP:
-                        print("DEBUG: K_UP pressed in CLASS_SELECTION")
+                        input_log.debug("K_UP pressed in CLASS_SELECTION")
                         self.selected_class_index = (self.selected_class_index - 1) % len(self.available_classes)
                         self.message_log.add_message(f"Current Class: {self.available_classes[self.selected_class_index].__name__}", (255, 255, 255))
                         self.message_log.add_message("A brief description of the class will go here.", (150, 150, 150))
                     elif event.key == pygame.K_DOWN:
-                        print("DEBUG: K_DOWN pressed in CLASS_SELECTION")
+                        input_log.debug("K_DOWN pressed in CLASS_SELECTION")
                         self.selected_class_index = (self.selected_class_index + 1) % len(self.available_classes)
                         self.message_log.add_message(f"Current Class: {self.available_classes[self.selected_class_index].__name__}", (255, 255, 255))
                         self.message_log.add_message("A brief description of the class will go here.", (150, 150, 150))
                     elif event.key == pygame.K_RETURN:
-                        print("DEBUG: K_RETURN pressed in CLASS_SELECTION")
+                        input_log.debug("K_RETURN pressed in CLASS_SELECTION")
                         self.finalize_character_creation()
                     return True
 
@@ -848,16 +1025,14 @@ class Game:
                         
                         
                         if self.game_map.is_walkable(target_x, target_y):
-                            self.player.x = target_x
-                            self.player.y = target_y
+                            self.game_map.move_entity(self.player, target_x, target_y)
                             self.message_log.add_message("You Dash forward!", (100, 255, 100))
                             action_taken = True
                         else:
                             target_x_1 = self.player.x + dx
                             target_y_1 = self.player.y + dy
                             if self.game_map.is_walkable(target_x_1, target_y_1):
-                                self.player.x = target_x_1
-                                self.player.y = target_y_1
+                                self.game_map.move_entity(self.player, target_x_1, target_y_1)
                                 self.message_log.add_message("You Dash forward but hit an obstacle!", (255, 150, 0))
                                 action_taken = True
                             else:
@@ -887,7 +1062,7 @@ class Game:
                         if self.game_state == GameState.TAVERN:
                             npc = self.check_npc_interaction()
                             if npc:
-                                self.message_log.add_message(f"{npc.name}: {npc.get_dialogue()}", (200, 200, 255))
+                                self.message_log.add_message(f"{npc.name}: {npc.get_dialogue(self.rng.flavor)}", (200, 200, 255))
                                 action_taken = True
                         elif self.game_state == GameState.DUNGEON:
                             # --- MODIFIED START ---
@@ -986,7 +1161,7 @@ class Game:
     
         # Confirm target selection
         elif key == pygame.K_RETURN:
-            print("DEBUG: K_RETURN pressed in TARGETING. Calling execute_targeted_ability.")
+            input_log.debug("K_RETURN pressed in TARGETING. Calling execute_targeted_ability.")
             self.execute_targeted_ability()  # Handle the ability effect
             return  # Exit targeting mode
     
@@ -1019,11 +1194,11 @@ class Game:
 
         # Pass the confirmed target coordinates to the ability's execute_on_target method
         if self.ability_in_use.execute_on_target(self.player, self, target_x, target_y):
-            print("DEBUG: ability_in_use.execute_on_target returned True. Resetting state.")
+            log.debug("ability_in_use.execute_on_target returned True. Resetting state.")
             # If the ability successfully executed its effect, then reset state and end turn
             self._reset_targeting_state()
         else:
-            print("DEBUG: ability_in_use.execute_on_target returned False. Staying in targeting mode.")
+            log.debug("ability_in_use.execute_on_target returned False. Staying in targeting mode.")
             # If execute_on_target returns False, it means the target was invalid for that ability
             # (e.g., Fire Bolt on empty tile, Misty Step on blocked tile). Stay in targeting mode.
             pass  # Message already handled by ability.execute_on_target
@@ -1086,23 +1261,23 @@ class Game:
 
     def get_interactable_item_at(self, x, y):
         """Checks if there's an interactable item (like a Potion or Chest) at the given coordinates."""
-        for item in self.game_map.items_on_ground:
+        for item in self.game_map.items_at(x, y):
             # Check for any Item (including Potion, Weapon, Armor, Tools)
             # Exclude Mimic if it's disguised, as it's handled separately by MimicTile
-            if item.x == x and item.y == y and not (isinstance(item, Mimic) and item.disguised):
+            if not (isinstance(item, Mimic) and item.disguised):
                 return item
         return None
 
     def get_chest_at(self, x, y):
         """Checks if there's a chest at the given coordinates."""
-        for item in self.game_map.items_on_ground:
-            if isinstance(item, Chest) and item.x == x and item.y == y:
+        for item in self.game_map.items_at(x, y):
+            if isinstance(item, Chest):
                 return item
         return None
 
     def handle_item_pickup(self):
         """Check for items at player's position and pick them up."""
-        items_at_player_pos = [item for item in self.game_map.items_on_ground if item.x == self.player.x and item.y == self.player.y]
+        items_at_player_pos = self.game_map.items_at(self.player.x, self.player.y)
         if items_at_player_pos:
             item_to_pick_up = items_at_player_pos[0]
             # Ensure it's not a Chest, as Chests are handled by their own 'open' method
@@ -1111,7 +1286,7 @@ class Game:
             
             if item_to_pick_up.on_pickup(self.player, self):
                 # Remove the item from the ground after successful pickup
-                self.game_map.items_on_ground.remove(item_to_pick_up)
+                self.game_map.remove_item(item_to_pick_up)
                 self.update_fov() # Update FOV to reflect item removal
                 return True
             else:
@@ -1161,9 +1336,7 @@ class Game:
                 self.message_log.add_message(f"Cannot equip {self.selected_inventory_item.name}.", (255, 100, 100))
         elif key == pygame.K_d:
             self.player.inventory.remove_item(self.selected_inventory_item)
-            self.selected_inventory_item.x = self.player.x
-            self.selected_inventory_item.y = self.player.y
-            self.game_map.items_on_ground.append(self.selected_inventory_item)
+            self.game_map.add_item(self.selected_inventory_item, self.player.x, self.player.y)
             self.message_log.add_message(f"You drop the {self.selected_inventory_item.name}.", self.selected_inventory_item.color)
             action_taken_in_menu = True
         elif key == pygame.K_ESCAPE or key == pygame.K_c:
@@ -1176,8 +1349,8 @@ class Game:
             self.next_turn()
 
     def get_target_at(self, x, y):
-        for entity in self.entities:
-            if entity.x == x and entity.y == y and entity != self.player and entity.alive:
+        for entity in self.game_map.entities_at(x, y):
+            if entity != self.player and entity.alive:
                 return entity
         return None
 
@@ -1195,16 +1368,15 @@ class Game:
         if self.game_state == GameState.TAVERN:
             if (new_x, new_y) == self.door_position:
                 self.message_log.add_message("You enter the dark dungeon...", (100, 255, 100))
-                self.generate_level(1)
+                self.enter_level(1)
                 return True
 
-            for npc in self.npcs:
-                if npc.x == new_x and npc.y == new_y and npc.alive:
+            for npc in self.game_map.entities_at(new_x, new_y):
+                if npc in self.npcs and npc.alive:
                     self.message_log.add_message(f"You can't move onto {npc.name}.", (255, 150, 0))
                     return False
             if self.game_map.is_walkable(new_x, new_y):
-                self.player.x = new_x
-                self.player.y = new_y
+                self.game_map.move_entity(self.player, new_x, new_y)
                 self.update_fov()
                 self.camera.target_x = float(self.player.x)
                 self.camera.target_y = float(self.player.y)                
@@ -1218,10 +1390,11 @@ class Game:
             
             # --- Step 2: Identify monsters adjacent to player *before* moving ---
             monsters_adjacent_before_move = []
-            for entity in self.entities:
-                # Ensure it's a monster, alive, and adjacent to the player
-                if isinstance(entity, Monster) and entity.alive and self.player.is_adjacent_to(entity):
-                    monsters_adjacent_before_move.append(entity)
+            for dx_adj, dy_adj in [(0,1),(1,0),(0,-1),(-1,0),(-1,-1),(1,-1),(-1,1),(1,1)]:
+                for entity in self.game_map.entities_at(self.player.x + dx_adj, self.player.y + dy_adj):
+                    # Ensure it's a monster and alive
+                    if isinstance(entity, Monster) and entity.alive:
+                        monsters_adjacent_before_move.append(entity)
             
             # --- Step 3: Handle interaction with an entity at the new position ---
             if target_at_new_pos:
@@ -1254,8 +1427,7 @@ class Game:
                         # Fall through to movement logic below, which will trigger the trap.
                
                 original_player_x, original_player_y = self.player.x, self.player.y
-                self.player.x = new_x
-                self.player.y = new_y
+                self.game_map.move_entity(self.player, new_x, new_y)
                 
                 self.camera.target_x = float(self.player.x)
                 self.camera.target_y = float(self.player.y)
@@ -1316,7 +1488,7 @@ class Game:
         
         str_modifier = self.player.get_ability_modifier(self.player.strength)
         athletics_bonus = str_modifier + self.player.proficiency_bonus
-        d20_roll = random.randint(1, 20)
+        d20_roll = self.rng.combat.randint(1, 20)
         skill_check_total = d20_roll + athletics_bonus
         self.message_log.add_message(
             f"You attempt to smash the {target_tile.name} (DC {destruction_dc}): {d20_roll} + {athletics_bonus} = {skill_check_total}",
@@ -1325,12 +1497,12 @@ class Game:
         
         if skill_check_total >= destruction_dc:
             self.message_log.add_message(f"You successfully smash the {target_tile.name}!", (0, 255, 0))
-            self.game_map.tiles[y][x] = floor
+            self.game_map.set_tile(x, y, floor)
             
             # --- NEW: 20% chance to drop a Lesser Healing Potion ---
             if target_tile.name in ["Crate", "Barrel"]: # Check if it was a crate or barrel
                 drop_chance = 0.50 # 20% chance
-                if random.random() < drop_chance:
+                if self.rng.loot.random() < drop_chance:
                     # Create a new instance of the potion
                     new_potion = lesser_healing_potion.__class__(
                         name=lesser_healing_potion.name,
@@ -1340,9 +1512,7 @@ class Game:
                         effect_type=lesser_healing_potion.effect_type,
                         effect_value=lesser_healing_potion.effect_value
                     )
-                    new_potion.x = x
-                    new_potion.y = y
-                    self.game_map.items_on_ground.append(new_potion)
+                    self.game_map.add_item(new_potion, x, y)
                     self.message_log.add_message(f"A {new_potion.name} drops from the {target_tile.name}!", new_potion.color)
             # --- END NEW DROP LOGIC ---
 
@@ -1363,8 +1533,8 @@ class Game:
             return
 
         # Determine the actual d20 roll based on advantage/disadvantage
-        roll1 = random.randint(1, 20)
-        roll2 = random.randint(1, 20) # Always roll a second for simplicity
+        roll1 = self.rng.combat.randint(1, 20)
+        roll2 = self.rng.combat.randint(1, 20) # Always roll a second for simplicity
         final_d20_roll = roll1
         roll_message_part = f"a d20: {roll1}"
         if advantage and disadvantage: # They cancel each other out
@@ -1384,10 +1554,8 @@ class Game:
 
         # --- Check for PowerAttackBuff ---
         power_attack_buff = None
-        for effect in self.player.active_status_effects:
-            if isinstance(effect, PowerAttackBuff):
-                power_attack_buff = effect
-                break
+        if self.player.active_status_effects.mask & POWER_ATTACK:
+            power_attack_buff = self.player.active_status_effects.get("PowerAttackBuff")
             
         if power_attack_buff:
             attack_modifier += power_attack_buff.attack_modifier # Apply accuracy penalty
@@ -1427,31 +1595,23 @@ class Game:
                 f"A solid blow lands on the {target.name}!",
                 f"The {target.name} recoils from your strike!"
             ]
-            self.message_log.add_message(random.choice(hit_messages), (100, 255, 100))
-
-            hit_text = FloatingText(target.x, target.y, "HIT!", (255, 255, 0), y_speed=0.4)
-            self.floating_texts.append(hit_text)
+            self.message_log.add_message(self.rng.flavor.choice(hit_messages), (100, 255, 100))
 
+            self.floating_texts.spawn(target.x, target.y, "HIT!", (255, 255, 0), y_speed=0.4)
 
-            # Parse weapon damage dice (e.g., "1d6")
-            dice_count_str, die_type_str = self.player.equipped_weapon.damage_dice.split('d')
-            num_dice = int(dice_count_str)
-            die_type = int(die_type_str)
 
-            damage_rolls = []
-            total_dice_rolled = num_dice
+            # Weapon damage dice (e.g., "1d6"), compiled once by core.dice
+            dice = self.player.equipped_weapon.dice
 
             if is_critical_hit:
-                total_dice_rolled *= 2 # Double the number of dice rolled for critical hits
-                self.message_log.add_message(f"Critical Hit! Rolling {total_dice_rolled}d{die_type} for damage!", (255, 255, 0))
+                # Double the number of dice rolled for critical hits
+                self.message_log.add_message(f"Critical Hit! Rolling {dice.critical()} for damage!", (255, 255, 0))
 
-            for _ in range(total_dice_rolled):
-                damage_rolls.append(random.randint(1, die_type))
-
-            damage_dice_rolls_sum = sum(damage_rolls)
+            damage_rolls = dice.roll_dice(self.rng.combat, critical=is_critical_hit)
+            damage_dice_rolls_sum = dice.total(damage_rolls)
 
             # Construct the message part for dice rolls
-            damage_message_dice_part = f"{total_dice_rolled}d{die_type} ({' + '.join(map(str, damage_rolls))})"
+            damage_message_dice_part = dice.describe(damage_rolls, critical=is_critical_hit)
 
             damage_modifier = self.player.attack_power
 
@@ -1459,7 +1619,7 @@ class Game:
                 damage_modifier += power_attack_buff.damage_modifier # Apply damage bonus
                 self.message_log.add_message(f"Power Attack: +{power_attack_buff.damage_modifier} damage.", (255, 165, 0))
                 # The buff should be consumed after one attack
-                self.player.active_status_effects.remove(power_attack_buff) # Remove the buff
+                self.player.remove_status_effect(power_attack_buff, self) # Remove the buff
                 self.message_log.add_message(f"Power Attack buff consumed.", (150, 150, 150))
 
             damage_total = max(1, damage_dice_rolls_sum + damage_modifier)
@@ -1476,8 +1636,7 @@ class Game:
                 (255, 100, 100)
             )
 
-            damage_text = FloatingText(target.x, target.y - 0.5, str(damage_dealt), (255, 0, 0), y_speed=0.6)
-            self.floating_texts.append(damage_text)
+            self.floating_texts.spawn(target.x, target.y - 0.5, str(damage_dealt), (255, 0, 0), y_speed=0.6)
 
 
             if not target.alive:
@@ -1487,7 +1646,7 @@ class Game:
                     f"The {target.name} dies! [+{xp_gained} XP]",
                     (100, 255, 100)
                 )
-                if random.random() < 0.7:
+                if self.rng.flavor.random() < 0.7:
                     self.add_ambient_combat_message()
             else:
                 self.message_log.add_message(
@@ -1501,10 +1660,9 @@ class Game:
                 f"The {target.name} deftly dodges your attack!",
                 f"Your weapon glances harmlessly off the {target.name}!"
             ]
-            self.message_log.add_message(random.choice(miss_messages), (200, 200, 200))
+            self.message_log.add_message(self.rng.flavor.choice(miss_messages), (200, 200, 200))
 
-            miss_text = FloatingText(target.x, target.y, "MISS!", (150, 150, 150))
-            self.floating_texts.append(miss_text)
+            self.floating_texts.spawn(target.x, target.y, "MISS!", (150, 150, 150))
 
 
 
@@ -1514,26 +1672,44 @@ class Game:
             "Silence returns to the dungeon...",
             "Your weapon drips with monster blood..."
         ]
-        self.message_log.add_message(random.choice(messages), (170, 170, 170))
+        self.message_log.add_message(self.rng.flavor.choice(messages), (170, 170, 170))
 
     def update(self, dt):
-        initial_floating_texts_count = len(self.floating_texts) # <--- ADD THIS
-        self.floating_texts = [text for text in self.floating_texts if text.update()]        
-        if len(self.floating_texts) != initial_floating_texts_count: # <--- ADD THIS
-            print(f"DEBUG: FloatingTexts updated. Removed {initial_floating_texts_count - len(self.floating_texts)} expired texts. New list size: {len(self.floating_texts)}") # <--- ADD THIS
-
-
-
-
-        # NEW: Only update camera and process turns if player exists and game is in an active state
+        """One frame: visuals first, then any pending monster turns."""
+        profiler = self.profiler
+        if profiler:
+            profiler.begin('update')
+        self.update_presentation(dt)
+        if profiler:
+            profiler.mark('update', 'presentation')
+        self.update_turns()
+        if profiler:
+            profiler.mark('update', 'turn_logic')
+            profiler.end('update')
+
+
+    def update_presentation(self, dt):
+        """Per-frame visuals only (floating texts, camera). Never changes game state."""
+        expired = self.floating_texts.update()
+        if expired:
+            render_log.debug("FloatingTexts updated. Removed %d expired texts. New list size: %d",
+                             expired, len(self.floating_texts))
+
+        # NEW: Only update camera if player exists and game is in an active state
         if self.player and (self.game_state == GameState.DUNGEON or self.game_state == GameState.TAVERN or self.game_state == GameState.TARGETING): # Include TARGETING
             # If in targeting mode for Mage Hand, camera should follow the cursor
             if self.game_state == GameState.TARGETING and self.ability_in_use and isinstance(self.ability_in_use, MageHand):
                 self.camera.update(self.targeting_cursor_x, self.targeting_cursor_y, self.game_map.width, self.game_map.height)
             else:
                 self.camera.update(self.player.x, self.player.y, self.game_map.width, self.game_map.height)
-        
 
+        # Floating texts advance a second step while the player is alive (their speeds are tuned for it)
+        if self.player and self.player.alive:
+            self.floating_texts.update()
+
+
+    def update_turns(self):
+        """Game logic for one frame: runs the pending monster turns. Safe to call without rendering."""
         if not self.player: # If player hasn't been created yet (e.g., in character creation)
             return # Do nothing else in update
         if not self.player.alive:
@@ -1544,13 +1720,12 @@ class Game:
                     "You fought bravely, but the dungeon proved too strong. Rest now.",
                     "The dungeon's embrace is cold and final. You have fallen."
                 ]
-                chosen_death_message = random.choice(death_messages)
+                chosen_death_message = self.rng.flavor.choice(death_messages)
                 self.message_log.add_message(chosen_death_message, (255, 0, 0))
+                self.message_log.add_message(f"Run seed {self.rng.seed} (set RNG_SEED in config.py to replay this run).", (150, 150, 150))
                 self._game_over_displayed = True
             return
         
-        self.floating_texts = [text for text in self.floating_texts if text.update()]        
-        
         # This condition was already here, but now it's after the player check
         if self.game_state == GameState.TAVERN or \
            self.game_state == GameState.INVENTORY or \
@@ -1561,21 +1736,51 @@ class Game:
            self.game_state == GameState.CLASS_SELECTION: # Added CLASS_SELECTION
             return # <--- Keep this line as is
         
-        current = self.get_current_entity()
-        
-        # --- NEW: Explicitly reset player_has_acted at the start of player's turn ---
-        if current == self.player and self.player_has_acted:
-            self.player_has_acted = False
-            self.message_log.add_message("Your turn begins!", (100, 255, 100))
-            self.update_fov()
-        elif current == self.player and not self.player_has_acted:
-            # Player's turn, waiting for input. Do nothing here.
-            pass
-        elif current and current != self.player and current.alive: # <--- THIS IS THE MONSTER'S TURN
+        # Resolve every monster turn up to the player's next one in this frame, unless that
+        # takes longer than the time budget (the rest then carries over to the next frame)
+        profiler = self.profiler
+        budget = config.TURN_TIME_BUDGET_MS / 1000.0
+        start_time = time.perf_counter()
+        resolved = 0
+        staggered = 0 # Turns resolved this frame that spawned floating texts
+        while True:
+            current = self.get_current_entity()
+
+            # --- NEW: Explicitly reset player_has_acted at the start of player's turn ---
+            if current == self.player:
+                if self.player_has_acted:
+                    self.player_has_acted = False
+                    self.message_log.add_message("Your turn begins!", (100, 255, 100))
+                    self.update_fov()
+                break # Player's turn, waiting for input
+            if not (current and current.alive):
+                break # No active entity or entity is dead.
+            if resolved and time.perf_counter() - start_time > budget:
+                break
+
+            # <--- THIS IS THE MONSTER'S TURN
+            # Each monster's floating texts start a little after the previous texts, up to a cap
+            self.floating_texts.set_delay(min(staggered * config.TURN_PRESENTATION_STAGGER,
+                                              config.TURN_PRESENTATION_MAX_DELAY))
+            spawned = self.floating_texts.spawned
+            if profiler:
+                # Own section, so headless runs (which call update_turns() directly) still get it
+                profiler.mark('update', 'turn_logic')
+                profiler.begin('monster')
             current.take_turn(self.player, self.game_map, self)
+            if self.floating_texts.spawned != spawned:
+                staggered += 1
+            if profiler:
+                profiler.mark('monster', f"take_turn:{current.name}")
+                profiler.end('monster')
+                profiler.mark('update', 'take_turn')
             self.next_turn()
-        else:
-            pass # No active entity or entity is dead.
+            if profiler:
+                profiler.mark('update', 'next_turn')
+            resolved += 1
+            if not self.player.alive or self.game_state != GameState.DUNGEON:
+                break
+        self.floating_texts.set_delay(0)
         
 
     def handle_window_resize(self):
@@ -1590,28 +1795,21 @@ class Game:
             self.font = pygame.font.SysFont('consolas', int(INTERNAL_HEIGHT/50))
 
     def render(self):
-        """Main render method - draws everything"""
-        self.screen.fill((0, 0, 0))
-        self.internal_surface.fill((0, 0, 0))
+        """Main render method - draws everything that changed since the last frame"""
+        if self.headless:
+            return
+        profiler = self.profiler
+        if profiler:
+            profiler.begin('frame')
+        full_redraw = self._needs_full_redraw or self.game_state != self._last_rendered_state
+        self._last_rendered_state = self.game_state
+        self._needs_full_redraw = False
+        dirty_rects = []
+
+        if self.game_state in (GameState.DUNGEON, GameState.TAVERN, GameState.TARGETING):
+            if full_redraw:
+                self.screen.fill((0, 0, 0))
 
-        self.inventory_ui_surface.fill((0,0,0,0))
-        if self.game_state == GameState.CHARACTER_CREATION: # NEW: Character Creation Render
-            self.render_character_creation_screen()
-            self.screen.blit(self.inventory_ui_surface, (0, 0)) # Use inventory_ui_surface for overlay
-        elif self.game_state == GameState.CLASS_SELECTION:
-            self.render_class_selection_screen()
-            self.screen.blit(self.inventory_ui_surface, (0, 0))
-        elif self.game_state == GameState.INVENTORY:
-            self.render_inventory_screen()
-            self.screen.blit(self.inventory_ui_surface, (0, 0))
-        elif self.game_state == GameState.INVENTORY_MENU:
-            self.render_inventory_screen()
-            self.screen.blit(self.inventory_ui_surface, (0, 0))
-            self.render_inventory_menu_popup()
-        elif self.game_state == GameState.CHARACTER_MENU:
-            self.render_character_menu()
-            self.screen.blit(self.inventory_ui_surface, (0, 0))
-        else: # This block handles DUNGEON and TAVERN, and now TARGETING
             # --- NEW: Camera Update Logic for Targeting State ---
             if self.game_state == GameState.TARGETING:
                 # In targeting mode, camera follows the targeting cursor
@@ -1620,229 +1818,291 @@ class Game:
                 # Otherwise, camera follows the player (normal dungeon/tavern view)
                 self.camera.update(self.player.x, self.player.y, self.game_map.width, self.game_map.height)
             # --- END NEW CAMERA LOGIC ---
+            if profiler:
+                profiler.mark('frame', 'camera')
+
+            # Tiles, items and entities are all painted by the map layer
+            map_changed = self.render_map_with_fov()
+            if profiler:
+                profiler.mark('frame', 'map')
+
+            # The game area only has to be recomposed if the map, the camera or an overlay changed
+            camera_offset = (int(self.camera.x * config.TILE_SIZE), int(self.camera.y * config.TILE_SIZE))
+            has_overlay = bool(self.floating_texts) or self.game_state == GameState.TARGETING
+            if (not self._game_area_scaled or map_changed or has_overlay or self._game_area_had_overlay or
+                    camera_offset != self._last_camera_offset):
+                self._last_camera_offset = camera_offset
+                self._game_area_had_overlay = has_overlay
+                self.compose_game_area()
+                dirty_rects.append(self.present_game_area())
+            elif full_redraw:
+                # Nothing in the game area changed; reuse last frame's scaled surface
+                dirty_rects.append(self.present_game_area())
+            if profiler:
+                profiler.mark('frame', 'present')
+        else:
+            self.screen.fill((0, 0, 0))
+            self.inventory_ui_surface.fill((0,0,0,0))
+            if self.game_state == GameState.CHARACTER_CREATION: # NEW: Character Creation Render
+                self.render_character_creation_screen()
+                self.screen.blit(self.inventory_ui_surface, (0, 0)) # Use inventory_ui_surface for overlay
+            elif self.game_state == GameState.CLASS_SELECTION:
+                self.render_class_selection_screen()
+                self.screen.blit(self.inventory_ui_surface, (0, 0))
+            elif self.game_state == GameState.INVENTORY:
+                self.render_inventory_screen()
+                self.screen.blit(self.inventory_ui_surface, (0, 0))
+            elif self.game_state == GameState.INVENTORY_MENU:
+                self.render_inventory_screen()
+                self.screen.blit(self.inventory_ui_surface, (0, 0))
+                self.render_inventory_menu_popup()
+            elif self.game_state == GameState.CHARACTER_MENU:
+                self.render_character_menu()
+                self.screen.blit(self.inventory_ui_surface, (0, 0))
+            full_redraw = True
+            if profiler:
+                profiler.mark('frame', 'menus')
+
+        # Only draw UI if player exists (after character creation)
+        if self.player and self.draw_ui(force=full_redraw):
+            dirty_rects.append(pygame.Rect(config.GAME_AREA_WIDTH, 0, config.UI_PANEL_WIDTH, config.SCREEN_HEIGHT))
+        if profiler:
+            profiler.mark('frame', 'ui_panel')
+        if self.message_log.render(self.screen, force=full_redraw):
+            dirty_rects.append(self.message_log.rect)
+        if profiler:
+            profiler.mark('frame', 'message_log')
+
+        if profiler and self.show_profiler_overlay:
+            dirty_rects.append(self.draw_profiler_overlay())
+            profiler.skip('frame') # The overlay's own cost isn't part of the frame it measures
+
+        if full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty_rects)
+        if profiler:
+            profiler.mark('frame', 'flip')
+            profiler.end('frame')
 
-            self.render_map_with_fov()
-            self.render_items_on_ground()
-            self.render_entities()
 
-            # <--- THIS IS THE CRITICAL LOOP ---
-            for text_obj in self.floating_texts: # <--- ADD THIS LOOP
-                text_obj.draw(self.internal_surface, self.camera) # Draw on internal surface
+    def compose_game_area(self):
+        """Composes the map layer and overlays on the internal surface and rescales it."""
+        profiler = self.profiler
+        self.internal_surface.fill((0, 0, 0))
+        self.map_layer.draw(self.internal_surface, self.camera)
+        if profiler:
+            profiler.mark('frame', 'compose')
 
+        # <--- THIS IS THE CRITICAL LOOP ---
+        self.floating_texts.draw(self.internal_surface, self.camera) # Draw on internal surface
+        if profiler:
+            profiler.mark('frame', 'floating_texts')
 
-            if self.game_state == GameState.TARGETING:
-                screen_x, screen_y = self.camera.world_to_screen(
-                    self.targeting_cursor_x,
-                    self.targeting_cursor_y
-                )
 
-                # Check if we're targeting a monster or destructible
-                target_type = None
-                target_entity = self.get_target_at(self.targeting_cursor_x, self.targeting_cursor_y)
-                if isinstance(target_entity, Monster):
-                    target_type = "monster"
-                elif (tile := self.game_map.tiles[self.targeting_cursor_y][self.targeting_cursor_x]) and tile.destructible:
-                    target_type = "destructible"
-
-                # Set cursor color based on target type
-                cursor_color = (
-                    (255, 100, 100) if target_type == "monster" else  # Red for monsters
-                    (255, 200, 100) if target_type == "destructible" else  # Yellow for objects
-                    (100, 100, 255)  # Blue for empty tiles
+        if self.game_state == GameState.TARGETING:
+            screen_x, screen_y = self.camera.world_to_screen(
+                self.targeting_cursor_x,
+                self.targeting_cursor_y
+            )
+
+            # Check if we're targeting a monster or destructible
+            target_type = None
+            target_entity = self.get_target_at(self.targeting_cursor_x, self.targeting_cursor_y)
+            if isinstance(target_entity, Monster):
+                target_type = "monster"
+            elif (tile := self.game_map.tiles[self.targeting_cursor_y][self.targeting_cursor_x]) and tile.destructible:
+                target_type = "destructible"
+
+            # Set cursor color based on target type
+            cursor_color = (
+                (255, 100, 100) if target_type == "monster" else  # Red for monsters
+                (255, 200, 100) if target_type == "destructible" else  # Yellow for objects
+                (100, 100, 255)  # Blue for empty tiles
+            )
+
+            # --- START MODIFICATION FOR MAGE HAND GRAPHIC ---
+            if isinstance(self.ability_in_use, MageHand):
+                # Draw the Mage Hand graphic at the cursor position
+                # You might want a specific color for the Mage Hand graphic
+                graphics.draw_tile(self.internal_surface, screen_x * config.TILE_SIZE, screen_y * config.TILE_SIZE, 'mh', color_tint=(150, 200, 255))
+            else:
+                # Draw cursor rect (more visible than just an outline) for other abilities
+                cursor_width = 3
+                pygame.draw.rect(
+                    self.internal_surface,
+                    cursor_color,
+                    (screen_x * config.TILE_SIZE,
+                     screen_y * config.TILE_SIZE,
+                     config.TILE_SIZE,
+                     config.TILE_SIZE),
+                    cursor_width
                 )
+            # --- END MODIFICATION FOR MAGE HAND GRAPHIC ---
+        if profiler:
+            profiler.mark('frame', 'targeting')
+
+        self._scale_game_area()
+        if profiler:
+            profiler.mark('frame', 'scale')
+
+
+    def draw_profiler_overlay(self):
+        """Draws the profiler's percentile table in the top-left corner and returns its rect."""
+        now = time.perf_counter()
+        # Rebuilding the text every frame would cost more than most of the phases it shows
+        if self._profiler_overlay_surface is None or now - self._profiler_overlay_time > 0.5:
+            lines = self.profiler.report_lines() or ["Profiling... (F3 hides, F4 exports)"]
+            font = self.inventory_font_info
+            line_height = font.get_linesize()
+            width = max(font.size(line)[0] for line in lines) + 12
+            surface = pygame.Surface((width, line_height * len(lines) + 8), pygame.SRCALPHA)
+            surface.fill((0, 0, 0, 190))
+            for i, line in enumerate(lines):
+                color = (255, 255, 120) if not line.startswith(' ') else (220, 220, 220)
+                surface.blit(font.render(line, True, color), (6, 4 + i * line_height))
+            self._profiler_overlay_surface = surface
+            self._profiler_overlay_time = now
+        return self.screen.blit(self._profiler_overlay_surface, (4, 4))
+
+
+    def toggle_profiler(self):
+        if self.profiler:
+            self.profiler = None
+            self.message_log.add_message("Profiler off.", (180, 180, 180))
+        else:
+            self.profiler = Profiler()
+            self.message_log.add_message("Profiler on (F4 exports CSV/JSON).", (180, 180, 180))
+        self.show_profiler_overlay = self.profiler is not None
+        self._profiler_overlay_surface = None
+        self._needs_full_redraw = True # Clears the old overlay off the game area
 
-                # --- START MODIFICATION FOR MAGE HAND GRAPHIC ---
-                if isinstance(self.ability_in_use, MageHand):
-                    # Draw the Mage Hand graphic at the cursor position
-                    # You might want a specific color for the Mage Hand graphic
-                    graphics.draw_tile(self.internal_surface, screen_x * config.TILE_SIZE, screen_y * config.TILE_SIZE, 'mh', color_tint=(150, 200, 255))
-                else:
-                    # Draw cursor rect (more visible than just an outline) for other abilities
-                    cursor_width = 3
-                    pygame.draw.rect(
-                        self.internal_surface,
-                        cursor_color,
-                        (screen_x * config.TILE_SIZE,
-                         screen_y * config.TILE_SIZE,
-                         config.TILE_SIZE,
-                         config.TILE_SIZE),
-                        cursor_width
-                    )
-                # --- END MODIFICATION FOR MAGE HAND GRAPHIC ---
 
-            available_width = config.GAME_AREA_WIDTH
-            available_height = config.SCREEN_HEIGHT - config.MESSAGE_LOG_HEIGHT
+    def export_profile(self):
+        if not self.profiler:
+            self.message_log.add_message("Profiler is off (F3 turns it on).", (180, 180, 180))
+            return
+        base = time.strftime("profile_%Y%m%d_%H%M%S")
+        self.profiler.export_csv(base + ".csv")
+        self.profiler.export_json(base + ".json")
+        self.message_log.add_message(f"Profile written to {base}.csv/.json", (180, 180, 180))
 
-            internal_surface_aspect_ratio = config.INTERNAL_GAME_AREA_PIXEL_WIDTH / config.INTERNAL_GAME_AREA_PIXEL_HEIGHT
-            scale_to_fit_width = available_width / config.INTERNAL_GAME_AREA_PIXEL_WIDTH
-            scale_to_fit_height = available_height / config.INTERNAL_GAME_AREA_PIXEL_HEIGHT
 
-            actual_display_scale = min(scale_to_fit_width, scale_to_fit_height)
+    def _scale_game_area(self):
+        """Scales the internal surface into the preallocated screen-sized game area surface."""
+        if self.scaled_game_area is not None:
+            pygame.transform.scale(self.internal_surface, self.game_area_rect.size, self.scaled_game_area)
+        self._game_area_scaled = True
 
-            scaled_width = int(config.INTERNAL_GAME_AREA_PIXEL_WIDTH * actual_display_scale)
-            scaled_height = int(config.INTERNAL_GAME_AREA_PIXEL_HEIGHT * actual_display_scale)
 
-            offset_x = (available_width - scaled_width) // 2
-            offset_y = (available_height - scaled_height) // 2
+    def present_game_area(self):
+        """Blits the (already scaled) game area onto the screen and returns the rect it covers."""
+        if self.scaled_game_area is None:
+            # 1:1 display scale, the internal surface can go straight to the screen
+            self.screen.blit(self.internal_surface, self.game_area_rect.topleft)
+        else:
+            self.screen.blit(self.scaled_game_area, self.game_area_rect.topleft)
+        return self.game_area_rect
 
-            target_rect = pygame.Rect(offset_x, offset_y, scaled_width, scaled_height)
 
-            scaled_game_area = pygame.transform.scale(self.internal_surface, target_rect.size)
-            self.screen.blit(scaled_game_area, target_rect.topleft)
+    def _layout_game_area(self):
+        """Works out where the scaled game area sits on screen and preallocates its surface."""
+        available_width = config.GAME_AREA_WIDTH
+        available_height = config.SCREEN_HEIGHT - config.MESSAGE_LOG_HEIGHT
 
-        # Only draw UI if player exists (after character creation)
-        if self.player:
-            self.draw_ui()
-        self.message_log.render(self.screen)
+        scale_to_fit_width = available_width / config.INTERNAL_GAME_AREA_PIXEL_WIDTH
+        scale_to_fit_height = available_height / config.INTERNAL_GAME_AREA_PIXEL_HEIGHT
+
+        actual_display_scale = min(scale_to_fit_width, scale_to_fit_height)
 
-        pygame.display.flip()
+        scaled_width = int(config.INTERNAL_GAME_AREA_PIXEL_WIDTH * actual_display_scale)
+        scaled_height = int(config.INTERNAL_GAME_AREA_PIXEL_HEIGHT * actual_display_scale)
+
+        offset_x = (available_width - scaled_width) // 2
+        offset_y = (available_height - scaled_height) // 2
+
+        self.game_area_rect = pygame.Rect(offset_x, offset_y, scaled_width, scaled_height)
+
+        if self.game_area_rect.size == self.internal_surface.get_size():
+            self.scaled_game_area = None
+        else:
+            self.scaled_game_area = pygame.Surface(self.game_area_rect.size, 0, self.internal_surface)
+        self._game_area_scaled = False
 
 
     def render_map_with_fov(self):
-        map_render_height = config.INTERNAL_GAME_AREA_PIXEL_HEIGHT
-        
+        """
+        Brings the retained map layer up to date for every tile under the camera.
+        Tiles, items and entities are all painted into the layer; only cells whose
+        draw list changed are repainted. Returns True if anything was repainted.
+        """
+        self.map_layer.ensure(self.game_map)
+        self.map_layer.begin_frame()
+
+        items_at = self.game_map.items_at
+        entities_at = self.game_map.entities_at
         camera_x_int = int(self.camera.x)
         camera_y_int = int(self.camera.y)
     
         for y in range(camera_y_int, min(camera_y_int + self.camera.viewport_height + 1, self.game_map.height)):
             for x in range(camera_x_int, min(camera_x_int + self.camera.viewport_width + 1, self.game_map.width)):
-                
-                screen_x_float, screen_y_float = self.camera.world_to_screen(x, y)
-                
-                draw_x = screen_x_float * config.TILE_SIZE
-                draw_y = screen_y_float * config.TILE_SIZE
-                
                 visibility_type = self.fov.get_visibility_type(x, y)
                 if visibility_type == 'unexplored':
+                    self.map_layer.update_tile(x, y, ())
                     continue
-                
-                tile = self.game_map.tiles[y][x]
-                
-                # Initialize display_char with a default value
-                display_char = tile.char  # Default to the tile's character
-                render_color_tint = None  # Initialize render_color_tint
-                highlight_color = None  # For highlighting revealed traps
-
-                # --- NEW LOGIC HERE ---
-                # Check if there's an item or entity at this exact spot
-                item_at_pos = next((item for item in self.game_map.items_on_ground if item.x == x and item.y == y), None)
-                entity_at_pos = next((entity for entity in self.entities if entity.x == x and entity.y == y), None)
-                # If there's an item or entity (that's not disguised as a tile), draw the floor instead of the tile's char
-                # Mimics are special: if disguised, they are handled as tiles, so we draw their disguise char.
-                # If revealed, they are entities, and we draw floor + entity.
-                draw_tile_char = tile.char
-                if item_at_pos and not (isinstance(item_at_pos, Mimic) and item_at_pos.disguised):
-                    draw_tile_char = floor.char # Draw floor under the item
-                elif entity_at_pos and entity_at_pos != self.player and not (isinstance(entity_at_pos, Mimic) and entity_at_pos.disguised):
-                    draw_tile_char = floor.char # Draw floor under the entity (excluding player, who is drawn later)
-                elif entity_at_pos == self.player: # Always draw floor under player
-                    draw_tile_char = floor.char
-                
-                render_color_tint = None
-                if visibility_type == 'player':
-                    render_color_tint = None
-                elif visibility_type == 'torch':
-                    render_color_tint = (128, 128, 128, 255)
-                elif visibility_type == 'darkvision': # NEW: Darkvision tint
-                    render_color_tint = (90, 90, 90, 255) # Slightly darker than torch, but still visible
-                elif visibility_type == 'explored':
-                    render_color_tint = (60, 60, 60, 255)
-
-                graphics.draw_tile(self.internal_surface, draw_x, draw_y, draw_tile_char, color_tint=render_color_tint)
-                
-
-                # Handle TrapTile display
-                if isinstance(tile, TrapTile):
-                    display_char = tile.get_display_char()
-                    display_color = tile.get_display_color()
-                    if tile.highlighted:
-                        highlight_color = (255, 255, 0, 100)  # Yellow for highlighted traps
-                    else:
-                        highlight_color = None  # No highlight
-    
-                # Draw the base tile (floor, wall, or trap's hidden/revealed char)
-                graphics.draw_tile(self.internal_surface, draw_x, draw_y, display_char, color_tint=render_color_tint)                        
-                
-                # Draw Highlight Overlay for Traps
-                if highlight_color:
-                    highlight_surface = pygame.Surface((config.TILE_SIZE, config.TILE_SIZE), pygame.SRCALPHA)
-                    highlight_surface.fill(highlight_color)
-                    self.internal_surface.blit(highlight_surface, (draw_x, draw_y))
-                    
-
-
-    def render_entities(self):
-        map_render_height = config.INTERNAL_GAME_AREA_PIXEL_HEIGHT 
-        for entity in self.entities:
-            if isinstance(entity, Mimic) and entity.disguised:
-                continue 
-            visibility_type = self.fov.get_visibility_type(entity.x, entity.y)
-            # The is_in_viewport check is still useful for broad culling
-            if entity.alive and self.camera.is_in_viewport(entity.x, entity.y) and \
-               (visibility_type == 'player' or visibility_type == 'torch' or visibility_type == 'explored' or visibility_type == 'darkvision'):
-
-                # --- MODIFIED: Get float screen coordinates ---
-                screen_x_float, screen_y_float = self.camera.world_to_screen(entity.x, entity.y)
-                # --- MODIFIED: Calculate pixel draw positions using floats ---
-                draw_x = screen_x_float * config.TILE_SIZE
-                draw_y = screen_y_float * config.TILE_SIZE
-                # The pixel bounds check is still good
-                if (0 <= draw_x < config.INTERNAL_GAME_AREA_PIXEL_WIDTH and
-                    0 <= draw_y < map_render_height):
-
-                    entity_color_tint = None
-                    if visibility_type == 'player':
-                        entity_color_tint = None
-                    elif visibility_type == 'torch':
-                        entity_color_tint = (128, 128, 128, 255)
-                    elif visibility_type == 'darkvision':
-                        entity_color_tint = (90, 90, 90, 255)
-                    elif visibility_type == 'explored':
-                        entity_color_tint = (60, 60, 60, 255)
-                    # Always draw floor under entities, as map rendering might have drawn a decorative tile
-                    # --- MODIFIED: Pass float draw_x, draw_y to graphics.draw_tile ---
-                    graphics.draw_tile(self.internal_surface, draw_x, draw_y, floor.char, color_tint=entity_color_tint)
-                    graphics.draw_tile(self.internal_surface, draw_x, draw_y, entity.char, color_tint=entity_color_tint)
-
-
-
-    def render_items_on_ground(self):
-        """Render items lying on the dungeon floor."""
-        map_render_height = config.INTERNAL_GAME_AREA_PIXEL_HEIGHT 
-        
-        for item in self.game_map.items_on_ground:
+                draws = self._tile_draw_list(x, y, visibility_type, items_at(x, y), entities_at(x, y))
+                self.map_layer.update_tile(x, y, draws)
+
+        return self.map_layer.tiles_redrawn > 0
+
+
+    def _tile_draw_list(self, x, y, visibility_type, items_at_pos, entities_at_pos):
+        """Returns the (char, tint) draws for one visible map cell: the tile, then items, then entities."""
+        tile = self.game_map.tiles[y][x]
+        render_color_tint = graphics.get_light_tint(visibility_type)
+        draws = []
+
+        # Check if there's an item or entity at this exact spot
+        item_at_pos = items_at_pos[0] if items_at_pos else None
+        entity_at_pos = entities_at_pos[0] if entities_at_pos else None
+        # If there's an item or entity (that's not disguised as a tile), draw the floor instead of the tile's char
+        # Mimics are special: if disguised, they are handled as tiles, so we draw their disguise char.
+        # If revealed, they are entities, and we draw floor + entity.
+        draw_tile_char = tile.char
+        if item_at_pos and not (isinstance(item_at_pos, Mimic) and item_at_pos.disguised):
+            draw_tile_char = floor.char # Draw floor under the item
+        elif entity_at_pos and entity_at_pos != self.player and not (isinstance(entity_at_pos, Mimic) and entity_at_pos.disguised):
+            draw_tile_char = floor.char # Draw floor under the entity (excluding player, who is drawn later)
+        elif entity_at_pos == self.player: # Always draw floor under player
+            draw_tile_char = floor.char
+        draws.append((draw_tile_char, render_color_tint))
+
+        # Handle TrapTile display
+        display_char = tile.char
+        highlight_color = None
+        if isinstance(tile, TrapTile):
+            display_char = tile.get_display_char()
+            if tile.highlighted:
+                highlight_color = (255, 255, 0, 100)  # Yellow for highlighted traps
+
+        # Draw the base tile (floor, wall, or trap's hidden/revealed char)
+        draws.append((display_char, render_color_tint))
+        if highlight_color:
+            draws.append((MapLayer.HIGHLIGHT, highlight_color))
+
+        # Items lying on the floor, then living entities, always on top of a floor tile
+        for item in items_at_pos:
             if isinstance(item, Mimic) and item.disguised:
-                continue 
-            
-            visibility_type = self.fov.get_visibility_type(item.x, item.y)
-            
-            if self.camera.is_in_viewport(item.x, item.y) and \
-               (visibility_type == 'player' or visibility_type == 'torch' or visibility_type == 'explored' or visibility_type == 'darkvision'):
-                
-                # --- MODIFIED: Get float screen coordinates ---
-                screen_x_float, screen_y_float = self.camera.world_to_screen(item.x, item.y)
-                
-                # --- MODIFIED: Calculate pixel draw positions using floats ---
-                draw_x = screen_x_float * config.TILE_SIZE
-                draw_y = screen_y_float * config.TILE_SIZE
-                
-                if (0 <= draw_x < config.INTERNAL_GAME_AREA_PIXEL_WIDTH and
-                    0 <= draw_y < map_render_height):
-                    
-                    item_color_tint = None
-                    if visibility_type == 'player':
-                        item_color_tint = None
-                    elif visibility_type == 'torch':
-                        item_color_tint = (128, 128, 128, 255)
-                    elif visibility_type == 'darkvision':
-                        item_color_tint = (90, 90, 90, 255)
-                    elif visibility_type == 'explored':
-                        item_color_tint = (60, 60, 60, 255)
-                    
-                    # Always draw floor under items, as map rendering might have drawn a decorative tile
-                    # --- MODIFIED: Pass float draw_x, draw_y to graphics.draw_tile ---
-                    graphics.draw_tile(self.internal_surface, draw_x, draw_y, floor.char, color_tint=item_color_tint)
-                    graphics.draw_tile(self.internal_surface, draw_x, draw_y, item.char, color_tint=item_color_tint)
+                continue
+            draws.append((floor.char, render_color_tint))
+            draws.append((item.char, render_color_tint))
+        for entity in entities_at_pos:
+            if not entity.alive or (isinstance(entity, Mimic) and entity.disguised):
+                continue
+            draws.append((floor.char, render_color_tint))
+            draws.append((entity.char, render_color_tint))
+
+        return tuple(draws)
 
 
     def render_character_creation_screen(self):
@@ -2094,6 +2354,8 @@ class Game:
         current_y_left += self.inventory_font_info.get_linesize() + 5
         hp_color = (255, 0, 0) if self.player.hp < self.player.max_hp // 3 else (255, 255, 0) if self.player.hp < self.player.max_hp * 2 // 3 else (0, 255, 0)
         self._draw_text(target_surface, self.inventory_font_info, f"HP: {self.player.hp}/{self.player.max_hp}", hp_color, left_column_x, current_y_left)
+        current_y_left += self.inventory_font_info.get_linesize() + 5
+        self._draw_text(target_surface, self.inventory_font_info, f"Run seed: {self.rng.seed}", (150, 150, 150), left_column_x, current_y_left)
         current_y_left += self.inventory_font_info.get_linesize() + 15
 
         self._draw_text(target_surface, self.inventory_font_section, "ATTRIBUTES & SAVES", (255, 215, 0), left_column_x, current_y_left)
@@ -2182,14 +2444,43 @@ class Game:
             lines.append(' '.join(current_line))
         return lines
 
-    def draw_ui(self):
-        ui_panel_rect = pygame.Rect(config.GAME_AREA_WIDTH, 0, config.UI_PANEL_WIDTH, config.SCREEN_HEIGHT)
-        pygame.draw.rect(self.screen, (20, 20, 20), ui_panel_rect)
+    def draw_ui(self, force=False):
+        """
+        Draws the sidebar. It is composed offscreen and only rebuilt when the player
+        reports a change (see Player.add_change_listener) or whose turn it is, the
+        position, level or game state moves on; otherwise the cached panel is reused. Does nothing
+        unless the panel changed or force is set (the screen was cleared).
+        Returns True if the panel was drawn.
+        """
+        panel_size = (config.UI_PANEL_WIDTH, config.SCREEN_HEIGHT)
+        signature = (self.game_state, self.current_level, self.player.x, self.player.y,
+                     self.get_current_entity())
+        if (self._ui_panel_dirty or signature != self._ui_panel_signature or
+                self._ui_panel_surface is None or self._ui_panel_surface.get_size() != panel_size):
+            if self._ui_panel_surface is None or self._ui_panel_surface.get_size() != panel_size:
+                self._ui_panel_surface = pygame.Surface(panel_size)
+            self._draw_ui_panel(self._ui_panel_surface)
+            self._ui_panel_signature = signature
+            self._ui_panel_dirty = False
+        elif not force:
+            return False
+        self.screen.blit(self._ui_panel_surface, (config.GAME_AREA_WIDTH, 0))
+        return True
+
+
+    def _on_player_changed(self, player, what):
+        self._ui_panel_dirty = True
+
+
+    def _draw_ui_panel(self, surface):
+        """Draws the sidebar contents onto surface (panel-local coordinates)."""
+        ui_panel_rect = pygame.Rect(0, 0, config.UI_PANEL_WIDTH, config.SCREEN_HEIGHT)
+        pygame.draw.rect(surface, (20, 20, 20), ui_panel_rect)
         
-        pygame.draw.rect(self.screen, (50, 50, 50), ui_panel_rect, 2)
+        pygame.draw.rect(surface, (50, 50, 50), ui_panel_rect, 2)
 
-        panel_offset_x = config.GAME_AREA_WIDTH + 15
-        panel_right_edge = config.SCREEN_WIDTH - 15
+        panel_offset_x = 15
+        panel_right_edge = config.UI_PANEL_WIDTH - 15
         available_text_width = panel_right_edge - panel_offset_x
         
         current_y = 15
@@ -2216,42 +2507,42 @@ class Game:
         separator_color = (70, 70, 70)
         separator_thickness = 2
 
-        draw_centered_header(self.screen, font_header, "PLAYER", (255, 215, 0), current_y)
+        draw_centered_header(surface, font_header, "PLAYER", (255, 215, 0), current_y)
         current_y += font_header.get_linesize() + 10
-        self._draw_text(self.screen, font_info, f"Name: {self.player.name}", (255, 255, 255), panel_offset_x, current_y)
+        self._draw_text(surface, font_info, f"Name: {self.player.name}", (255, 255, 255), panel_offset_x, current_y)
         current_y += font_info.get_linesize() + 5
-        self._draw_text(self.screen, font_info, f"Class: {self.player.class_name}", (255, 255, 255), panel_offset_x, current_y)
+        self._draw_text(surface, font_info, f"Class: {self.player.class_name}", (255, 255, 255), panel_offset_x, current_y)
         current_y += font_info.get_linesize() + 5    
-        self._draw_text(self.screen, font_info, f"Level: {self.player.level}", (255, 255, 255), panel_offset_x, current_y)
+        self._draw_text(surface, font_info, f"Level: {self.player.level}", (255, 255, 255), panel_offset_x, current_y)
         current_y += font_info.get_linesize() + 5
-        self._draw_text(self.screen, font_info, f"XP: {self.player.current_xp}/{self.player.xp_to_next_level}", (255, 255, 255), panel_offset_x, current_y)
+        self._draw_text(surface, font_info, f"XP: {self.player.current_xp}/{self.player.xp_to_next_level}", (255, 255, 255), panel_offset_x, current_y)
         current_y += font_info.get_linesize() + 15    
-        pygame.draw.line(self.screen, separator_color, (panel_offset_x - 5, current_y), (panel_right_edge + 5, current_y), separator_thickness)
+        pygame.draw.line(surface, separator_color, (panel_offset_x - 5, current_y), (panel_right_edge + 5, current_y), separator_thickness)
         current_y += 15
 
-        draw_centered_header(self.screen, font_header, "VITALS", (255, 215, 0), current_y)
+        draw_centered_header(surface, font_header, "VITALS", (255, 215, 0), current_y)
         current_y += font_header.get_linesize() + 10
         
         hp_color = (255, 0, 0) if self.player.hp < self.player.max_hp // 3 else (255, 255, 0) if self.player.hp < self.player.max_hp * 2 // 3 else (0, 255, 0)
-        self._draw_text(self.screen, font_info, f"HP: {self.player.hp}/{self.player.max_hp}", hp_color, panel_offset_x, current_y)
+        self._draw_text(surface, font_info, f"HP: {self.player.hp}/{self.player.max_hp}", hp_color, panel_offset_x, current_y)
         current_y += font_info.get_linesize() + 5
         
         bar_width = config.UI_PANEL_WIDTH - 40
         bar_height = 10
         hp_bar_rect = pygame.Rect(panel_offset_x, current_y, bar_width, bar_height)
-        pygame.draw.rect(self.screen, (50, 0, 0), hp_bar_rect)
-        pygame.draw.rect(self.screen, (20, 20, 20), hp_bar_rect, 1)
+        pygame.draw.rect(surface, (50, 0, 0), hp_bar_rect)
+        pygame.draw.rect(surface, (20, 20, 20), hp_bar_rect, 1)
         fill_width = int(bar_width * (self.player.hp / self.player.max_hp))
-        pygame.draw.rect(self.screen, hp_color, (panel_offset_x, current_y, fill_width, bar_height))
+        pygame.draw.rect(surface, hp_color, (panel_offset_x, current_y, fill_width, bar_height))
         current_y += bar_height + 15
-        pygame.draw.line(self.screen, separator_color, (panel_offset_x - 5, current_y), (panel_right_edge + 5, current_y), separator_thickness)
+        pygame.draw.line(surface, separator_color, (panel_offset_x - 5, current_y), (panel_right_edge + 5, current_y), separator_thickness)
         current_y += 15
 
-        draw_centered_header(self.screen, font_header, "ABILITIES", (255, 215, 0), current_y)
+        draw_centered_header(surface, font_header, "ABILITIES", (255, 215, 0), current_y)
         current_y += font_header.get_linesize() + 10
         
         if not self.player.abilities:
-            self._draw_text(self.screen, font_info, "None", (150, 150, 150), panel_offset_x, current_y)
+            self._draw_text(surface, font_info, "None", (150, 150, 150), panel_offset_x, current_y)
             current_y += font_info.get_linesize() + 5
         else:
             sorted_abilities = sorted(self.player.abilities.values(), key=lambda ab: ab.name)
@@ -2260,14 +2551,14 @@ class Game:
                 ability_color = (100, 255, 255) if ability.current_cooldown == 0 else (255, 150, 0)
                 
                 ability_display_text = f"{i+1}. {ability.name}{cooldown_text}"
-                current_y = draw_wrapped_and_update_y(self.screen, font_info, ability_display_text, ability_color, panel_offset_x, current_y)
+                current_y = draw_wrapped_and_update_y(surface, font_info, ability_display_text, ability_color, panel_offset_x, current_y)
                 current_y += 5
         current_y += 10
-        pygame.draw.line(self.screen, separator_color, (panel_offset_x - 5, current_y), (panel_right_edge + 5, current_y), separator_thickness)
+        pygame.draw.line(surface, separator_color, (panel_offset_x - 5, current_y), (panel_right_edge + 5, current_y), separator_thickness)
         current_y += 15
         
         ''''
-        draw_centered_header(self.screen, self.font_header, "ATTRIBUTES & SAVES", (255, 215, 0), current_y)
+        draw_centered_header(surface, self.font_header, "ATTRIBUTES & SAVES", (255, 215, 0), current_y)
         current_y += self.font_header.get_linesize() + 10
 
         def format_ability_and_save(name, score, modifier, save_bonus, save_proficient):
@@ -2293,54 +2584,54 @@ class Game:
 
         for attr_name, score, mod, save_bonus, save_prof in attributes_data:
             line_text = format_ability_and_save(attr_name, score, mod, save_bonus, save_prof)
-            current_y = draw_wrapped_and_update_y(self.screen, self.font_info, line_text, (255, 255, 255), panel_offset_x, current_y)
+            current_y = draw_wrapped_and_update_y(surface, self.font_info, line_text, (255, 255, 255), panel_offset_x, current_y)
             current_y += 2
         
         current_y += 10
-        pygame.draw.line(self.screen, separator_color, (panel_offset_x - 5, current_y), (panel_right_edge + 5, current_y), separator_thickness)
+        pygame.draw.line(surface, separator_color, (panel_offset_x - 5, current_y), (panel_right_edge + 5, current_y), separator_thickness)
         current_y += 15
         '''
         
-        draw_centered_header(self.screen, font_header, "INVENTORY", (255, 215, 0), current_y)
+        draw_centered_header(surface, font_header, "INVENTORY", (255, 215, 0), current_y)
         current_y += self.font_header.get_linesize() + 10
         inventory_count = len(self.player.inventory.items)
         inventory_capacity = self.player.inventory.capacity
-        self._draw_text(self.screen, self.font_info, f"Items: {inventory_count}/{inventory_capacity}", (255, 255, 255), panel_offset_x, current_y)
+        self._draw_text(surface, self.font_info, f"Items: {inventory_count}/{inventory_capacity}", (255, 255, 255), panel_offset_x, current_y)
         current_y += self.font_info.get_linesize() + 5
         
         max_items_to_show = 3
         for i, item in enumerate(self.player.inventory.items[:max_items_to_show]):
-            current_y = draw_wrapped_and_update_y(self.screen, font_small, f"- {item.name}", item.color, panel_offset_x + 10, current_y)
+            current_y = draw_wrapped_and_update_y(surface, font_small, f"- {item.name}", item.color, panel_offset_x + 10, current_y)
         if inventory_count > max_items_to_show:
-            current_y = draw_wrapped_and_update_y(self.screen, font_small, f"...and {inventory_count - max_items_to_show} more", (150, 150, 150), panel_offset_x + 10, current_y)
+            current_y = draw_wrapped_and_update_y(surface, font_small, f"...and {inventory_count - max_items_to_show} more", (150, 150, 150), panel_offset_x + 10, current_y)
         current_y += 10
-        pygame.draw.line(self.screen, separator_color, (panel_offset_x - 5, current_y), (panel_right_edge + 5, current_y), separator_thickness)
+        pygame.draw.line(surface, separator_color, (panel_offset_x - 5, current_y), (panel_right_edge + 5, current_y), separator_thickness)
         current_y += 15
         
-        draw_centered_header(self.screen, font_header, "EFFECTS", (255, 215, 0), current_y)
+        draw_centered_header(surface, font_header, "EFFECTS", (255, 215, 0), current_y)
         current_y += font_header.get_linesize() + 10
         if not self.player.active_status_effects:
-            self._draw_text(self.screen, font_info, "None", (150, 150, 150), panel_offset_x, current_y)
+            self._draw_text(surface, font_info, "None", (150, 150, 150), panel_offset_x, current_y)
             current_y += font_info.get_linesize() + 5
         else:
             for effect in self.player.active_status_effects:
-                current_y = draw_wrapped_and_update_y(self.screen, font_info, f"{effect.name} ({effect.turns_left})", (255, 100, 0), panel_offset_x, current_y)
+                current_y = draw_wrapped_and_update_y(surface, font_info, f"{effect.name} ({effect.turns_left})", (255, 100, 0), panel_offset_x, current_y)
                 current_y += 2
         current_y += 10
-        pygame.draw.line(self.screen, separator_color, (panel_offset_x - 5, current_y), (panel_right_edge + 5, current_y), separator_thickness)
+        pygame.draw.line(surface, separator_color, (panel_offset_x - 5, current_y), (panel_right_edge + 5, current_y), separator_thickness)
         current_y += 15
         
-        draw_centered_header(self.screen, font_header, "STATUS", (255, 215, 0), current_y)
+        draw_centered_header(surface, font_header, "STATUS", (255, 215, 0), current_y)
         current_y += font_header.get_linesize() + 10
         if self.game_state == GameState.TAVERN:
-            current_y = draw_wrapped_and_update_y(self.screen, font_info, "Location: The Prancing Pony Tavern", (150, 200, 255), panel_offset_x, current_y)
+            current_y = draw_wrapped_and_update_y(surface, font_info, "Location: The Prancing Pony Tavern", (150, 200, 255), panel_offset_x, current_y)
         else:
-            current_y = draw_wrapped_and_update_y(self.screen, font_info, f"Dungeon Level: {self.current_level}", (150, 200, 255), panel_offset_x, current_y)
-            current_y = draw_wrapped_and_update_y(self.screen, font_info, f"Position: ({self.player.x}, {self.player.y})", (150, 150, 150), panel_offset_x, current_y)
+            current_y = draw_wrapped_and_update_y(surface, font_info, f"Dungeon Level: {self.current_level}", (150, 200, 255), panel_offset_x, current_y)
+            current_y = draw_wrapped_and_update_y(surface, font_info, f"Position: ({self.player.x}, {self.player.y})", (150, 150, 150), panel_offset_x, current_y)
             current = self.get_current_entity()
             if current:
                 turn_color = (255, 255, 255) if current == self.player else (255, 100, 100)
-                current_y = draw_wrapped_and_update_y(self.screen, font_info, f"Turn: {current.name}", turn_color, panel_offset_x, current_y)
+                current_y = draw_wrapped_and_update_y(surface, font_info, f"Turn: {current.name}", turn_color, panel_offset_x, current_y)
         current_y += 10
         current_y += 15
        
@@ -2396,6 +2687,6 @@ class Game:
             ])
         for control in controls_list:
             if current_y + font_small.get_linesize() < max_controls_y:
-                current_y = draw_wrapped_and_update_y(self.screen, font_small, control, (150, 150, 150), panel_offset_x, current_y)
+                current_y = draw_wrapped_and_update_y(surface, font_small, control, (150, 150, 150), panel_offset_x, current_y)
             else:
                 break
@@ -0,0 +1,170 @@
+# MultipleFiles/headless.py
+"""
+Headless simulation: plays the game logic with no window, fonts or tileset.
+Used to soak-test balance and performance over many runs, e.g.
+
+    python -m core.headless --runs 500 --policy explorer --seed 1
+"""
+import argparse
+import random
+import time
+
+from core.game import Game, GameState
+from core.profiler import Profiler
+from core import log as game_log
+
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (1, -1), (-1, 1), (1, 1)]
+
+
+class RandomPolicy:
+    """Moves (or attacks) in a random direction every turn."""
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed) # Own RNG so the policy doesn't shift the game's rolls
+
+    def choose_action(self, game):
+        return self.rng.choice(DIRECTIONS)
+
+
+class ScriptedPolicy:
+    """Plays back a fixed list of (dx, dy) moves, looping when it runs out."""
+    def __init__(self, moves):
+        self.moves = list(moves)
+        self.index = 0
+
+    def choose_action(self, game):
+        move = self.moves[self.index % len(self.moves)]
+        self.index += 1
+        return move
+
+
+class ExplorerPolicy(RandomPolicy):
+    """
+    Walks to the tavern door, then down the stairs of every level, attacking
+    anything standing in the way. Wanders randomly when there is no route.
+    """
+    def choose_action(self, game):
+        player = game.player
+        if game.game_state == GameState.TAVERN:
+            goal = game.door_position
+        else:
+            goal = game.stairs_positions.get('down')
+        if goal is None:
+            return super().choose_action(game)
+
+        step = game.get_distance_map('explorer_goal', [goal]).step_towards(player.x, player.y)
+        if step is None:
+            return super().choose_action(game)
+        return step[0] - player.x, step[1] - player.y
+
+
+POLICIES = {
+    'random': RandomPolicy,
+    'explorer': ExplorerPolicy,
+}
+
+
+def create_game(race_index=0, class_index=0, seed=None):
+    """Returns a headless Game with a finished character, standing in the tavern."""
+    game = Game(None, headless=True, seed=seed)
+    game.selected_race_index = race_index
+    game.finalize_race_selection()
+    game.selected_class_index = class_index
+    game.finalize_character_creation()
+    return game
+
+
+def play_turn(game, policy):
+    """
+    Plays one player action chosen by the policy, then every monster turn until the player is up again.
+    Returns True if the player's action was accepted (bumping into a wall, say, is not).
+    """
+    dx, dy = policy.choose_action(game)
+    acted = game.handle_player_action(dx, dy)
+    if acted:
+        game.player_has_acted = True
+        game.next_turn()
+
+    # update_turns() resolves the monster turns within a time budget, so it may take a few calls
+    for _ in range(len(game.scheduler) + 1):
+        if not game.player.alive or game.get_current_entity() == game.player:
+            break
+        game.update_turns()
+    # Lets update_turns() start the player's turn (it resets player_has_acted there)
+    game.update_turns()
+    return acted
+
+
+def run_episode(policy, seed=None, max_turns=1000, start_level=None, race_index=0, class_index=0, profiler=None):
+    """
+    Plays one game until the player dies or max_turns player actions have been tried. Returns a stats dict.
+    The same seed and policy always replay the same game. A Profiler passed in collects the turn phase timings.
+    """
+    start_time = time.perf_counter()
+    game = create_game(race_index, class_index, seed)
+    game.profiler = profiler
+    if start_level is not None:
+        game.generate_level(start_level)
+
+    turns = 0
+    wasted = 0
+    while turns < max_turns and game.player.alive:
+        if not play_turn(game, policy):
+            wasted += 1
+        turns += 1
+
+    return {
+        'seed': game.rng.seed,
+        'turns': turns,
+        'wasted_actions': wasted,
+        'alive': game.player.alive,
+        'level': game.current_level if game.game_state != GameState.TAVERN else 0,
+        'max_level': game.max_level_reached,
+        'hp': game.player.hp,
+        'player_level': game.player.level,
+        'seconds': time.perf_counter() - start_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless games and print a summary.")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the first run; run i uses seed + i.")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='explorer')
+    parser.add_argument('--max-turns', type=int, default=1000)
+    parser.add_argument('--start-level', type=int, default=None)
+    parser.add_argument('--race', type=int, default=0, help="Index into Game.available_races.")
+    parser.add_argument('--class', dest='class_index', type=int, default=0, help="Index into Game.available_classes.")
+    parser.add_argument('--verbose', action='store_true', help="Turn on debug logging (to stderr).")
+    parser.add_argument('--profile', metavar='PATH', help="Write turn phase timings to PATH (.csv or .json).")
+    args = parser.parse_args()
+
+    if args.verbose:
+        game_log.set_level(game_log.DEBUG)
+    profiler = Profiler(window=100000) if args.profile else None
+    results = []
+    for run in range(args.runs):
+        seed = args.seed + run
+        policy = POLICIES[args.policy](seed)
+        result = run_episode(policy, seed, args.max_turns, args.start_level, args.race, args.class_index, profiler)
+        results.append(result)
+        print(f"seed {seed}: {'alive' if result['alive'] else 'dead'} after {result['turns']} turns, "
+              f"level {result['level']} (max {result['max_level']}), hp {result['hp']}, {result['seconds']:.2f}s")
+
+    total_turns = sum(r['turns'] for r in results)
+    total_seconds = sum(r['seconds'] for r in results)
+    deaths = sum(1 for r in results if not r['alive'])
+    print(f"{len(results)} runs, {deaths} deaths, average max level {sum(r['max_level'] for r in results) / max(1, len(results)):.2f}")
+    print(f"{total_turns} turns in {total_seconds:.2f}s ({total_turns / max(total_seconds, 1e-9):.0f} turns/s)")
+
+    if profiler:
+        for line in profiler.report_lines(('turn', 'monster')):
+            print(line)
+        if args.profile.endswith('.csv'):
+            profiler.export_csv(args.profile)
+        else:
+            profiler.export_json(args.profile)
+        print(f"Profile written to {args.profile}")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,15 +8,22 @@ class Inventory:
             return False # Inventory is full
         self.items.append(item)
         item.owner = self.owner # Set the item's owner (e.g., the player)
+        self._notify_owner()
         return True
 
     def remove_item(self, item):
         if item in self.items:
             self.items.remove(item)
             item.owner = None
+            self._notify_owner()
             return True
         return False
 
+    def _notify_owner(self):
+        notify_change = getattr(getattr(self, 'owner', None), 'notify_change', None)
+        if notify_change:
+            notify_change('inventory')
+
     def get_items_by_type(self, item_type):
         """Returns a list of items of a specific type (e.g., Potion, Weapon)."""
         return [item for item in self.items if isinstance(item, item_type)]
@@ -0,0 +1,174 @@
+# MultipleFiles/level_store.py
+"""
+Keeps visited dungeon levels so the stairs lead back to the same floor.
+
+The most recently left levels stay in memory as live objects. Older ones are
+pickled and zlib-compressed, and once the compressed levels go over the memory
+budget the oldest are written to disk. Shared tile templates (world.tile) and the
+objects registered in `external` (the player) are pickled by name, so a restored
+level points at the very same objects as the rest of the game.
+"""
+import atexit
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import zlib
+from collections import OrderedDict
+
+from world.tile import TILE_TEMPLATES
+
+
+class StoredLevel:
+    """Everything a dungeon level needs to be resumed. The player is not part of it."""
+    def __init__(self, game_map, fov, entities, turn_order, stairs_positions, torch_light_sources, player_position):
+        self.game_map = game_map
+        self.fov = fov # Carries the explored mask and the torch lightmap
+        self.entities = entities
+        self.turn_order = turn_order
+        self.stairs_positions = stairs_positions
+        self.torch_light_sources = torch_light_sources
+        self.player_position = player_position # Where the player left the level
+
+
+class _LevelPickler(pickle.Pickler):
+    def __init__(self, file, external_ids):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.external_ids = external_ids
+
+    def persistent_id(self, obj):
+        return self.external_ids.get(id(obj))
+
+
+class _LevelUnpickler(pickle.Unpickler):
+    def __init__(self, file, external_objects):
+        super().__init__(file)
+        self.external_objects = external_objects
+
+    def persistent_load(self, pid):
+        return self.external_objects[pid]
+
+
+class LevelStore:
+    def __init__(self, hot_levels=2, memory_budget=8 * 1024 * 1024, spill_dir=None, compress_level=6):
+        """
+        Args:
+            hot_levels (int): Levels kept as live objects (restoring them is free).
+            memory_budget (int): Bytes of compressed levels kept in memory before spilling to disk.
+            spill_dir (str): Where spilled levels go. None makes a temporary directory when first needed.
+            compress_level (int): zlib level for cold levels.
+        """
+        self.hot_levels = hot_levels
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.compress_level = compress_level
+        self.external = {} # name -> object pickled by reference (e.g. 'player')
+
+        self._hot = OrderedDict()  # key -> StoredLevel, oldest first
+        self._cold = OrderedDict() # key -> compressed bytes, oldest first
+        self._cold_bytes = 0
+        self._disk = {}            # key -> file path
+        self._own_spill_dir = False
+
+    def __contains__(self, key):
+        return key in self._hot or key in self._cold or key in self._disk
+
+    def __len__(self):
+        return len(self._hot) + len(self._cold) + len(self._disk)
+
+    def put(self, key, level):
+        """Stores a level that is being left, replacing any older copy of it."""
+        self.discard(key)
+        self._hot[key] = level
+        while len(self._hot) > self.hot_levels:
+            old_key, old_level = self._hot.popitem(last=False)
+            data = zlib.compress(self._dumps(old_level), self.compress_level)
+            self._cold[old_key] = data
+            self._cold_bytes += len(data)
+        while self._cold_bytes > self.memory_budget and self._cold:
+            old_key, data = self._cold.popitem(last=False)
+            self._cold_bytes -= len(data)
+            self._spill(old_key, data)
+
+    def take(self, key):
+        """Removes and returns the stored level (restored from memory or disk), or None if there isn't one."""
+        level = self._hot.pop(key, None)
+        if level is not None:
+            return level
+        data = self._cold.pop(key, None)
+        if data is not None:
+            self._cold_bytes -= len(data)
+        elif key in self._disk:
+            path = self._disk.pop(key)
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.remove(path)
+        else:
+            return None
+        return self._loads(zlib.decompress(data))
+
+    def discard(self, key):
+        self._hot.pop(key, None)
+        data = self._cold.pop(key, None)
+        if data is not None:
+            self._cold_bytes -= len(data)
+        path = self._disk.pop(key, None)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def clear(self):
+        """Forgets every stored level (new game), deleting spilled files."""
+        for key in list(self._disk):
+            self.discard(key)
+        self._hot.clear()
+        self._cold.clear()
+        self._cold_bytes = 0
+        self._remove_spill_dir()
+
+    def _remove_spill_dir(self):
+        if self._own_spill_dir and self.spill_dir and os.path.isdir(self.spill_dir):
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+        if self._own_spill_dir:
+            self.spill_dir = None
+            self._own_spill_dir = False
+
+    def stats(self):
+        return {
+            'hot': list(self._hot),
+            'cold': list(self._cold),
+            'cold_bytes': self._cold_bytes,
+            'disk': list(self._disk),
+        }
+
+    # --- Serialization ---
+    def _external_ids(self):
+        ids = {id(tile): ('tile', name) for name, tile in TILE_TEMPLATES.items()}
+        for name, obj in self.external.items():
+            ids[id(obj)] = ('external', name)
+        return ids
+
+    def _external_objects(self):
+        objects = {('tile', name): tile for name, tile in TILE_TEMPLATES.items()}
+        for name, obj in self.external.items():
+            objects[('external', name)] = obj
+        return objects
+
+    def _dumps(self, level):
+        buffer = io.BytesIO()
+        _LevelPickler(buffer, self._external_ids()).dump(level)
+        return buffer.getvalue()
+
+    def _loads(self, data):
+        return _LevelUnpickler(io.BytesIO(data), self._external_objects()).load()
+
+    def _spill(self, key, data):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix='mithrim_levels_')
+            self._own_spill_dir = True
+            atexit.register(self._remove_spill_dir)
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir, f"level_{key}.bin")
+        with open(path, 'wb') as f:
+            f.write(data)
+        self._disk[key] = path
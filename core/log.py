@@ -0,0 +1,96 @@
+# MultipleFiles/log.py
+"""
+Category loggers on top of the standard logging module.
+
+    from core.log import get_logger
+    log = get_logger('ai')
+    log.debug("%s moved to (%d,%d)", self.name, self.x, self.y)
+
+Pass the values as arguments instead of building an f-string: logging only formats
+the message if the level is enabled, so a disabled debug line costs one level check.
+For lines that need extra work just to collect their arguments, guard them with
+`if log.isEnabledFor(DEBUG):`.
+
+Levels come from config.LOG_LEVEL, can be overridden per category with the
+MITHRIM_LOG environment variable (e.g. MITHRIM_LOG="ai=DEBUG,traps=INFO") and can be
+changed at runtime with set_level() (F2 in game toggles debug output).
+"""
+import logging
+import os
+import sys
+
+import config
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+
+ROOT_NAME = 'mithrim'
+CATEGORIES = ('game', 'ai', 'render', 'combat', 'traps', 'input')
+
+_configured = False
+
+
+def get_logger(category):
+    """Returns the logger for a category, e.g. get_logger('ai')."""
+    if not _configured:
+        configure()
+    return logging.getLogger(f"{ROOT_NAME}.{category}")
+
+
+def _parse_level(level):
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Unknown log level: {level}")
+    return value
+
+
+def configure(level=None, stream=None):
+    """
+    Sets up the 'mithrim' logger once: one stderr handler and the configured levels.
+    Safe to call again (e.g. from a tool) to change the level or the stream.
+    """
+    global _configured
+    root = logging.getLogger(ROOT_NAME)
+    root.propagate = False
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter("%(levelname)s [%(name)s] %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(_parse_level(level if level is not None else getattr(config, 'LOG_LEVEL', 'WARNING')))
+    _configured = True
+
+    overrides = os.environ.get('MITHRIM_LOG', '')
+    for entry in overrides.split(','):
+        if '=' in entry:
+            category, category_level = entry.split('=', 1)
+            set_level(category_level, category.strip())
+        elif entry.strip():
+            set_level(entry)
+
+
+def set_level(level, category=None):
+    """Changes the level of one category, or of every category (which drops per-category levels)."""
+    level = _parse_level(level)
+    if category is None:
+        logging.getLogger(ROOT_NAME).setLevel(level)
+        for name in CATEGORIES:
+            logging.getLogger(f"{ROOT_NAME}.{name}").setLevel(logging.NOTSET)
+    else:
+        logging.getLogger(f"{ROOT_NAME}.{category}").setLevel(level)
+
+
+def get_level():
+    return logging.getLogger(ROOT_NAME).getEffectiveLevel()
+
+
+def toggle_debug():
+    """Switches every category between DEBUG and config.LOG_LEVEL. Returns True if debug is now on."""
+    if get_level() <= DEBUG:
+        set_level(getattr(config, 'LOG_LEVEL', 'WARNING'))
+        return False
+    set_level(DEBUG)
+    return True
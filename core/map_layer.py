@@ -0,0 +1,83 @@
+import pygame
+import config
+import graphics
+
+
+class MapLayer:
+    """
+    Retained, world-space rendering of the map (tiles, items and entities).
+
+    Every map cell remembers the list of (char, tint) draws it was last painted with.
+    A cell is only repainted when its draw list changes, so an idle frame costs a
+    comparison per visible cell plus one blit of the camera window.
+    """
+    # Marker used in a draw list for a translucent highlight overlay instead of a tile char
+    HIGHLIGHT = None
+
+    def __init__(self):
+        self.surface = None
+        self.game_map = None
+        self.tile_size = None
+        self._drawn = {}
+        self._highlight_surfaces = {}
+        self.tiles_redrawn = 0  # Cells repainted by the last update_tile() pass (reset by begin_frame)
+
+    def ensure(self, game_map):
+        """(Re)allocates the world surface when the map or the tile size changes."""
+        if game_map is self.game_map and self.tile_size == config.TILE_SIZE and self.surface is not None:
+            return
+        self.game_map = game_map
+        self.tile_size = config.TILE_SIZE
+        self.surface = pygame.Surface((game_map.width * self.tile_size, game_map.height * self.tile_size))
+        self.surface.fill((0, 0, 0))
+        self._drawn = {}
+        self._highlight_surfaces = {}
+
+    def invalidate(self):
+        """Forces every cell to be repainted on its next update."""
+        self.game_map = None
+
+    def begin_frame(self):
+        self.tiles_redrawn = 0
+
+    def update_tile(self, x, y, draws):
+        """
+        Repaints the cell at (x, y) if its draw list differs from the last one painted there.
+
+        Args:
+            x (int): World X (tile coordinate).
+            y (int): World Y (tile coordinate).
+            draws (tuple): (char, tint) pairs drawn bottom to top. A char of MapLayer.HIGHLIGHT
+                           fills the cell with the (RGBA) tint instead of drawing a tile.
+        Returns:
+            bool: True if the cell was repainted.
+        """
+        if self._drawn.get((x, y)) == draws:
+            return False
+
+        draw_x = x * self.tile_size
+        draw_y = y * self.tile_size
+        self.surface.fill((0, 0, 0), (draw_x, draw_y, self.tile_size, self.tile_size))
+        for char, tint in draws:
+            if char is self.HIGHLIGHT:
+                self.surface.blit(self._get_highlight_surface(tint), (draw_x, draw_y))
+            else:
+                graphics.draw_tile(self.surface, draw_x, draw_y, char, color_tint=tint)
+
+        self._drawn[(x, y)] = draws
+        self.tiles_redrawn += 1
+        return True
+
+    def draw(self, target_surface, camera):
+        """Blits the part of the world surface under the camera onto target_surface."""
+        area = pygame.Rect(int(camera.x * self.tile_size), int(camera.y * self.tile_size),
+                           target_surface.get_width(), target_surface.get_height())
+        target_surface.blit(self.surface, (0, 0), area)
+
+    def _get_highlight_surface(self, color):
+        surface = self._highlight_surfaces.get(color)
+        if surface is None:
+            surface = pygame.Surface((self.tile_size, self.tile_size), pygame.SRCALPHA)
+            surface.fill(color)
+            self._highlight_surfaces[color] = surface
+        return surface
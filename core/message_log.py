@@ -1,63 +1,193 @@
+from collections import deque
+
 import pygame
 from pygame import Rect
 
+# Lines kept by a headless MessageBox (nothing is drawn, so there is no height to fill)
+HEADLESS_MAX_LINES = 200
+
+# Scrollback: messages kept for re-wrapping, and wrapped lines kept for scrolling
+SCROLLBACK_MESSAGES = 1000
+SCROLLBACK_LINES = 2000
+
+TEXT_PADDING = 20 # Horizontal room left free when wrapping
+
+# Measured words kept. Numbers and names make the set of words open-ended, so the cache
+# is dropped and rebuilt when it gets this big (re-measuring a word is cheap)
+WORD_WIDTH_CACHE_LIMIT = 2048
+
+
 class MessageBox:
-    def __init__(self, x, y, width, height, font=None):
+    def __init__(self, x, y, width, height, font=None, headless=False):
         self.rect = Rect(x, y, width, height)
-        self.messages = []
-        
+        self.headless = headless
+        self.scroll_offset = 0 # Lines scrolled back from the newest one
+
+        if headless:
+            # No fonts: messages are stored unwrapped
+            self.messages = deque(maxlen=HEADLESS_MAX_LINES)
+            self.font = None
+            self.font_size = None
+            self.line_height = 1
+            self.max_lines = HEADLESS_MAX_LINES
+            return
+
+        self.entries = deque(maxlen=SCROLLBACK_MESSAGES) # (text, color) as added, for re-wrapping
+        self.messages = deque(maxlen=SCROLLBACK_LINES)   # Wrapped (line, color)
+
         if font is None:
             self.font = pygame.font.Font(None, 16)
         else:
             self.font = pygame.font.Font(font, 16)
+        self.font_size = 16
 
+        self._word_widths = {}   # word -> pixel width in the current font
+        self._line_surfaces = {} # (line, color) -> rendered surface, for the visible lines only
+        self._surface = None     # The whole box, redrawn only when _dirty
+        self._dirty = True
+        self._update_metrics()
+
+    def _update_metrics(self):
         self.line_height = self.font.get_linesize()
-        self.max_lines = height // self.line_height
+        self.max_lines = max(1, self.rect.height // self.line_height)
+        self._space_width = self.font.size(' ')[0]
+        self._word_widths.clear()
+        self._line_surfaces.clear()
+        self._surface = None
+        self._dirty = True
 
-    def add_message(self, text, color=None):
-        """Add a new message to the log"""
-        if color is None:
-            color = (255, 255, 255)  # Default to white
-            
-        # Split long messages into multiple lines if needed
-        words = text.split(' ')
+    def resize(self, x, y, width, height, font_size=None):
+        """
+        Moves the box after a window resize. The scrollback is only re-wrapped
+        if the width or the font changed.
+
+        Args:
+            font_size (int): Consolas size to switch to, or None to keep the current font.
+        """
+        if self.headless:
+            self.rect = Rect(x, y, width, height)
+            return
+        rewrap = width != self.rect.width
+        if font_size is not None and font_size != self.font_size:
+            self.font = pygame.font.SysFont('consolas', font_size)
+            self.font_size = font_size
+            rewrap = True
+        self.rect = Rect(x, y, width, height)
+        self._update_metrics()
+        if rewrap:
+            self.messages.clear()
+            for text, color in self.entries:
+                self.messages.extend(self._wrap(text, color))
+        self.scroll_offset = min(self.scroll_offset, self._max_scroll())
+
+    def _word_width(self, word):
+        width = self._word_widths.get(word)
+        if width is None:
+            if len(self._word_widths) >= WORD_WIDTH_CACHE_LIMIT:
+                self._word_widths.clear()
+            width = self._word_widths[word] = self.font.size(word)[0]
+        return width
+
+    def _wrap(self, text, color):
+        """Splits text into (line, color) tuples that fit the box, measuring each word once."""
+        max_width = self.rect.width - TEXT_PADDING
+        space_width = self._space_width
         lines = []
         current_line = []
-        
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            if self.font.size(test_line)[0] <= self.rect.width - 20:  # 20px padding
+        current_width = 0
+        for word in text.split(' '):
+            word_width = self._word_width(word)
+            if not current_line:
                 current_line.append(word)
+                current_width = word_width
+            elif current_width + space_width + word_width <= max_width:
+                current_line.append(word)
+                current_width += space_width + word_width
             else:
-                lines.append(' '.join(current_line))
+                lines.append((' '.join(current_line), color))
                 current_line = [word]
+                current_width = word_width
         if current_line:
-            lines.append(' '.join(current_line))
-            
-        for line in lines:
-            self.messages.append((line, color))
-            
-        # Keep log to max_lines
-        self.messages = self.messages[-self.max_lines:]
-
-    def render(self, surface):
-        """Render the message log to the given surface"""
-        # Draw background
-        pygame.draw.rect(surface, (0, 0, 0), self.rect)
-        
-        # Draw only the top border line
-        # Start point: (self.rect.left, self.rect.top)
-        # End point: (self.rect.right, self.rect.top)
-        # Color: (50, 50, 50) for subtle gray
-        # Thickness: 1 pixel
-        pygame.draw.line(surface, (50, 50, 50), 
-                         (self.rect.left, self.rect.top), 
-                         (self.rect.right, self.rect.top), 
-                         1)
-
-        # Render messages
+            lines.append((' '.join(current_line), color))
+        return lines
+
+    def add_message(self, text, color=None):
+        """Add a new message to the log"""
+        if color is None:
+            color = (255, 255, 255)  # Default to white
+
+        if self.headless:
+            self.messages.append((text, color))
+            return
+
+        self.entries.append((text, color))
+        lines = self._wrap(text, color)
+        self.messages.extend(lines)
+        if self.scroll_offset:
+            # Keep the lines the player scrolled back to in view
+            self.scroll_offset = min(self.scroll_offset + len(lines), self._max_scroll())
+        self._dirty = True
+
+    # --- Scrollback ---
+    def _max_scroll(self):
+        return max(0, len(self.messages) - self.max_lines)
+
+    def scroll(self, lines):
+        """Scrolls back (positive) or forward (negative) through older messages."""
+        if self.headless:
+            return
+        offset = max(0, min(self.scroll_offset + lines, self._max_scroll()))
+        if offset != self.scroll_offset:
+            self.scroll_offset = offset
+            self._dirty = True
+
+    def page_up(self):
+        self.scroll(self.max_lines - 1)
+
+    def page_down(self):
+        self.scroll(-(self.max_lines - 1))
+
+    def visible_lines(self):
+        end = len(self.messages) - self.scroll_offset
+        start = max(0, end - self.max_lines)
+        return [self.messages[i] for i in range(start, end)]
+
+    # --- Drawing ---
+    def _redraw(self):
+        if self._surface is None or self._surface.get_size() != self.rect.size:
+            self._surface = pygame.Surface(self.rect.size)
+        surface = self._surface
+        surface.fill((0, 0, 0))
+        # Draw only the top border line, in a subtle gray
+        pygame.draw.line(surface, (50, 50, 50), (0, 0), (self.rect.width, 0), 1)
+
+        line_surfaces = {}
         y_offset = 5  # Padding from top
-        for msg, color in self.messages:
-            text_surface = self.font.render(msg, True, color)
-            surface.blit(text_surface, (self.rect.x + 5, self.rect.y + y_offset))
+        for line in self.visible_lines():
+            text_surface = self._line_surfaces.get(line)
+            if text_surface is None:
+                text_surface = self.font.render(line[0], True, line[1])
+            line_surfaces[line] = text_surface
+            surface.blit(text_surface, (5, y_offset))
             y_offset += self.line_height
+
+        if self.scroll_offset:
+            marker = self.font.render(f"-- {self.scroll_offset} more (PgDn) --", True, (150, 150, 150))
+            surface.blit(marker, (self.rect.width - marker.get_width() - 5, self.rect.height - self.line_height))
+
+        self._line_surfaces = line_surfaces # Lines that scrolled out of view are dropped
+        self._dirty = False
+
+    def render(self, surface, force=False):
+        """
+        Render the message log to the given surface. Does nothing unless the log changed
+        or force is set (e.g. the screen was cleared). Returns True if anything was drawn.
+        """
+        if self.headless:
+            return False
+        if self._dirty:
+            self._redraw()
+        elif not force:
+            return False
+        surface.blit(self._surface, self.rect.topleft)
+        return True
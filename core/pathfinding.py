@@ -1,107 +1,210 @@
 import heapq
 
-class Node:
-    """A node in the pathfinding grid."""
-    def __init__(self, parent=None, position=None):
-        self.parent = parent
-        self.position = position
+from core.log import get_logger
 
-        self.g = 0  # Cost from start to this node
-        self.h = 0  # Heuristic (estimated cost from this node to end)
-        self.f = 0  # Total cost (g + h)
+log = get_logger('ai')
 
-    def __eq__(self, other):
-        return self.position == other.position
+# Diagonal steps cost sqrt(2) so the octile heuristic below is exact on open floor
+DIAGONAL_COST = 1.4142135623730951
 
-    def __hash__(self):
-        return hash(self.position)
+# 8-way moves as (dx, dy, cost), cardinals first
+MOVES = (
+    (0, -1, 1.0), (0, 1, 1.0), (-1, 0, 1.0), (1, 0, 1.0),
+    (-1, -1, DIAGONAL_COST), (-1, 1, DIAGONAL_COST), (1, -1, DIAGONAL_COST), (1, 1, DIAGONAL_COST),
+)
 
-    # For heapq (priority queue)
-    def __lt__(self, other):
-        return self.f < other.f
+# Cap for the monster AI's detour searches (roughly a quarter of an 80x45 level): a monster
+# that can't get round a crowd within this many nodes waits a turn instead of stalling the frame
+MONSTER_MAX_EXPANSIONS = 1000
 
-def astar(game_map, start, end, entities=None):
+
+def octile_distance(x1, y1, x2, y2):
+    """Cost of the cheapest 8-way path between two points on an open grid."""
+    dx = abs(x1 - x2)
+    dy = abs(y1 - y2)
+    return dx + dy + (DIAGONAL_COST - 2) * min(dx, dy)
+
+
+def build_occupancy(game_map, entities):
+    """
+    Returns a bytearray indexed by y * width + x with 1 under every given entity.
+    Build it once and share it between searches; callers decide which entities block.
+    """
+    width = game_map.width
+    occupancy = bytearray(width * game_map.height)
+    for entity in entities:
+        if 0 <= entity.x < width and 0 <= entity.y < game_map.height:
+            occupancy[entity.y * width + entity.x] = 1
+    return occupancy
+
+
+def _passable_grid(game_map):
+    """bytes of walkable flags indexed by y * width + x when the map keeps a walkable plane, else None."""
+    walkable = getattr(game_map, 'walkable', None)
+    if walkable is None:
+        return None
+    return walkable.tobytes()
+
+
+def astar(game_map, start, end, entities=None, occupancy=None, max_expansions=None):
     """
     Returns a list of tuples as a path from the given start to the given end in the given game_map.
     :param game_map: The GameMap object.
     :param start: A tuple (x, y) representing the start coordinates.
     :param end: A tuple (x, y) representing the end coordinates.
     :param entities: A list of entities to consider as obstacles (e.g., other monsters).
+    :param occupancy: A prebuilt occupancy grid (see build_occupancy), used instead of entities.
+    :param max_expansions: Stop and return None after expanding this many nodes (None, the default, for no limit).
     :return: A list of (x, y) tuples representing the path, or None if no path found.
     """
-    # Create start and end node
-    start_node = Node(None, start)
-    end_node = Node(None, end)
-
-    # Initialize open and closed lists
-    open_list = [] # Priority queue (heap)
-    closed_list = set()
-
-    # Add the start node
-    heapq.heappush(open_list, start_node)
-
-    # Loop until the open list is empty
-    while open_list:
-        # Get the current node (node with the lowest f-cost)
-        current_node = heapq.heappop(open_list)
-        closed_list.add(current_node.position)
+    width = game_map.width
+    height = game_map.height
+    if occupancy is None and entities:
+        occupancy = build_occupancy(game_map, entities)
+    passable = _passable_grid(game_map)
+
+    start_x, start_y = start
+    end_x, end_y = end
+    start_index = start_y * width + start_x
+    end_index = end_y * width + end_x
+
+    # Best known cost to each cell, and where we came from. Heap entries that no longer
+    # match best_g are stale and skipped when popped (lazy deletion).
+    best_g = {start_index: 0.0}
+    came_from = {start_index: None}
+    closed = set()
+    open_heap = [(octile_distance(start_x, start_y, end_x, end_y), 0.0, start_index)]
+    expansions = 0
+
+    while open_heap:
+        f, g, current = heapq.heappop(open_heap)
+        if current in closed or g > best_g[current]:
+            continue
 
         # Found the goal
-        if current_node.position == end_node.position:
+        if current == end_index:
             path = []
-            current = current_node
             while current is not None:
-                path.append(current.position)
-                current = current.parent
+                path.append((current % width, current // width))
+                current = came_from[current]
             return path[::-1] # Return reversed path
 
-        # Generate children
-        # Adjacent squares (8 directions)
-        for new_position in [(0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (-1, 1), (1, -1), (1, 1)]:
-            node_position = (current_node.position[0] + new_position[0], current_node.position[1] + new_position[1])
-
-            # Make sure within map bounds
-            if not (0 <= node_position[0] < game_map.width and 0 <= node_position[1] < game_map.height):
+        closed.add(current)
+        expansions += 1
+        if max_expansions is not None and expansions > max_expansions:
+            log.debug("A* from %s to %s gave up after %d expansions.", start, end, max_expansions)
+            return None
+
+        x = current % width
+        y = current // width
+        for dx, dy, step_cost in MOVES:
+            nx = x + dx
+            ny = y + dy
+            if not (0 <= nx < width and 0 <= ny < height):
                 continue
-
-            # Make sure walkable terrain
-            if not game_map.is_walkable(node_position[0], node_position[1]):
+            neighbor = ny * width + nx
+            if neighbor in closed:
                 continue
 
-            # Make sure not blocked by another entity (excluding the current entity and the target)
-            if entities:
-                is_blocked_by_entity = False
-                for entity in entities:
-                    # Don't block if the entity is the start or end of the path
-                    if entity.x == node_position[0] and entity.y == node_position[1] and \
-                       (node_position != start) and (node_position != end):
-                        is_blocked_by_entity = True
-                        break
-                if is_blocked_by_entity:
+            # Make sure walkable terrain
+            if passable is not None:
+                if not passable[neighbor]:
                     continue
+            elif not game_map.is_walkable(nx, ny):
+                continue
 
-            # Create new node
-            new_node = Node(current_node, node_position)
-
-            # Check if already in the closed list
-            if new_node.position in closed_list:
+            # Entities block everything except the start and end of the path
+            if occupancy is not None and occupancy[neighbor] and neighbor != end_index and neighbor != start_index:
                 continue
 
-            # Calculate f, g, and h values
-            new_node.g = current_node.g + 1 # Cost to move to adjacent square
-            # Heuristic: Manhattan distance (can use Euclidean for more accurate but slower)
-            new_node.h = abs(new_node.position[0] - end_node.position[0]) + abs(new_node.position[1] - end_node.position[1])
-            new_node.f = new_node.g + new_node.h
-
-            # Check if node is already in open list with a lower f-cost
-            # This part is crucial for efficiency with heapq
-            found_in_open = False
-            for open_node in open_list:
-                if new_node == open_node and new_node.g >= open_node.g:
-                    found_in_open = True
-                    break
-            
-            if not found_in_open:
-                heapq.heappush(open_list, new_node)
+            new_g = g + step_cost
+            if new_g < best_g.get(neighbor, float('inf')):
+                best_g[neighbor] = new_g
+                came_from[neighbor] = current
+                heapq.heappush(open_heap, (new_g + octile_distance(nx, ny, end_x, end_y), new_g, neighbor))
 
     return None # No path found
+
+
+class DistanceMap:
+    """
+    Dijkstra map: steps (8-way, one per move) from every walkable cell to the nearest goal.
+    Built once with a BFS and shared by every entity heading for (or away from) the same goals,
+    each of which then only needs an 8-neighbour lookup per move.
+    """
+    UNREACHABLE = -1
+
+    def __init__(self, game_map, goals, max_distance=None):
+        self.width = game_map.width
+        self.height = game_map.height
+        self.goals = tuple(goals)
+        self.distances = self._flood(game_map, max_distance)
+
+    def _flood(self, game_map, max_distance):
+        width = self.width
+        height = self.height
+        passable = _passable_grid(game_map)
+        distances = [self.UNREACHABLE] * (width * height)
+
+        frontier = []
+        for goal_x, goal_y in self.goals:
+            if 0 <= goal_x < width and 0 <= goal_y < height:
+                distances[goal_y * width + goal_x] = 0
+                frontier.append((goal_x, goal_y))
+
+        distance = 0
+        while frontier and (max_distance is None or distance < max_distance):
+            distance += 1
+            next_frontier = []
+            for x, y in frontier:
+                for dx, dy, _ in MOVES:
+                    nx = x + dx
+                    ny = y + dy
+                    if not (0 <= nx < width and 0 <= ny < height):
+                        continue
+                    index = ny * width + nx
+                    if distances[index] != self.UNREACHABLE:
+                        continue
+                    if passable is not None:
+                        if not passable[index]:
+                            continue
+                    elif not game_map.is_walkable(nx, ny):
+                        continue
+                    distances[index] = distance
+                    next_frontier.append((nx, ny))
+            frontier = next_frontier
+        return distances
+
+    def distance_at(self, x, y):
+        """Steps from (x, y) to the nearest goal, or None if it can't be reached."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        distance = self.distances[y * self.width + x]
+        return None if distance == self.UNREACHABLE else distance
+
+    def step_towards(self, x, y, is_blocked=None):
+        """Returns the free neighbour of (x, y) closest to a goal, or None if no neighbour is closer."""
+        return self._best_step(x, y, is_blocked, towards=True)
+
+    def step_away(self, x, y, is_blocked=None):
+        """Returns the free neighbour of (x, y) furthest from every goal (for fleeing), or None."""
+        return self._best_step(x, y, is_blocked, towards=False)
+
+    def _best_step(self, x, y, is_blocked, towards):
+        current = self.distance_at(x, y)
+        if current is None:
+            return None
+        best_step = None
+        best_distance = current
+        for dx, dy, _ in MOVES:
+            nx = x + dx
+            ny = y + dy
+            distance = self.distance_at(nx, ny)
+            if distance is None:
+                continue
+            if (distance < best_distance) if towards else (distance > best_distance):
+                if is_blocked is not None and is_blocked(nx, ny):
+                    continue
+                best_step = (nx, ny)
+                best_distance = distance
+        return best_step
@@ -0,0 +1,121 @@
+# MultipleFiles/profiler.py
+import csv
+import json
+import time
+from collections import deque
+
+# Percentiles shown in the overlay and written by the exporters
+PERCENTILES = (50, 95, 99)
+
+
+class Profiler:
+    """
+    Phase timings for frames and turns, with rolling percentiles.
+
+    Game keeps `self.profiler = None` while profiling is off, and every instrumented
+    spot is guarded with `if profiler:`, so a disabled profiler costs one attribute
+    check per phase. Usage inside a section:
+
+        profiler.begin('frame')
+        ...                         # work
+        profiler.mark('frame', 'map') # time since begin/last mark goes to 'map'
+        ...
+        profiler.end('frame')       # records every phase plus the section total
+
+    Sections ('frame', 'update', 'turn', 'monster') are independent, so they may nest.
+    """
+    def __init__(self, window=300):
+        """
+        Args:
+            window (int): How many recent samples each phase keeps for its percentiles.
+        """
+        self.window = window
+        self.samples = {} # (section, phase) -> deque of seconds
+        self._open = {}   # section -> [last mark time, {phase: seconds}]
+
+    def begin(self, section):
+        self._open[section] = [time.perf_counter(), {}]
+
+    def is_open(self, section):
+        return section in self._open
+
+    def mark(self, section, phase):
+        """Charges the time since the last begin()/mark() of the section to phase."""
+        record = self._open.get(section)
+        if record is None:
+            return
+        now = time.perf_counter()
+        phases = record[1]
+        phases[phase] = phases.get(phase, 0.0) + now - record[0]
+        record[0] = now
+
+    def skip(self, section):
+        """Restarts the section's clock without charging the time to any phase."""
+        record = self._open.get(section)
+        if record is not None:
+            record[0] = time.perf_counter()
+
+    def end(self, section):
+        record = self._open.pop(section, None)
+        if record is None:
+            return
+        phases = record[1]
+        for phase, seconds in phases.items():
+            self._add(section, phase, seconds)
+        self._add(section, 'total', sum(phases.values()))
+
+    def _add(self, section, phase, seconds):
+        key = (section, phase)
+        samples = self.samples.get(key)
+        if samples is None:
+            samples = self.samples[key] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def reset(self):
+        self.samples.clear()
+        self._open.clear()
+
+    # --- Reporting ---
+    def stats(self):
+        """Returns {(section, phase): {'count', 'mean_ms', 'max_ms', 'p50_ms', 'p95_ms', 'p99_ms'}}."""
+        result = {}
+        for key, samples in self.samples.items():
+            ordered = sorted(samples)
+            count = len(ordered)
+            entry = {
+                'count': count,
+                'mean_ms': sum(ordered) / count * 1000,
+                'max_ms': ordered[-1] * 1000,
+            }
+            for percentile in PERCENTILES:
+                index = min(count - 1, int(round(percentile / 100 * (count - 1))))
+                entry[f'p{percentile}_ms'] = ordered[index] * 1000
+            result[key] = entry
+        return result
+
+    def report_lines(self, sections=('frame', 'update', 'turn', 'monster')):
+        """Text lines for the overlay, one per phase, totals first and slowest p95 next."""
+        stats = self.stats()
+        lines = []
+        for section in sections:
+            phases = [(phase, entry) for (entry_section, phase), entry in stats.items() if entry_section == section]
+            if not phases:
+                continue
+            phases.sort(key=lambda item: (item[0] != 'total', -item[1]['p95_ms']))
+            lines.append(f"{section:<22}{'p50':>7}{'p95':>7}{'p99':>7}")
+            for phase, entry in phases:
+                lines.append(f"  {phase[:20]:<20}{entry['p50_ms']:>7.2f}{entry['p95_ms']:>7.2f}{entry['p99_ms']:>7.2f}")
+        return lines
+
+    def export_json(self, path):
+        rows = [dict(section=section, phase=phase, **entry) for (section, phase), entry in sorted(self.stats().items())]
+        with open(path, 'w') as f:
+            json.dump({'window': self.window, 'phases': rows}, f, indent=2)
+
+    def export_csv(self, path):
+        columns = ['section', 'phase', 'count', 'mean_ms', 'max_ms'] + [f'p{p}_ms' for p in PERCENTILES]
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            for (section, phase), entry in sorted(self.stats().items()):
+                writer.writerow(dict(section=section, phase=phase, **entry))
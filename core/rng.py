@@ -0,0 +1,59 @@
+# MultipleFiles/rng.py
+import hashlib
+import random
+
+# Named sub-streams. Each one is an independent random.Random, so e.g. a change to
+# combat rolls never shifts the dungeon layouts generated for the same seed.
+STREAMS = (
+    'mapgen',  # Dungeon layout, traps, decorations, monster/item/healer placement, chest contents
+    'combat',  # Attack, damage, initiative, saving throw and skill check rolls (traps included)
+    'loot',    # Drops found during play (smashed crates, shattered potions)
+    'flavor',  # Cosmetic picks: message variants, ambient lines, NPC dialogue
+)
+
+
+class GameRNG:
+    """
+    Per-run random number source. Every subsystem draws from its own named stream
+    (rng.mapgen, rng.combat, ...) instead of the global random module, so a run
+    can be replayed exactly from its seed.
+    """
+    def __init__(self, seed=None):
+        """
+        Args:
+            seed (int, optional): Run seed. If None, one is drawn from the global random
+                                  module (so random.seed() still makes runs repeatable).
+        """
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self._streams = {}
+
+    def stream(self, name):
+        """Returns the random.Random for a named stream, creating it on first use."""
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = random.Random(self._derive_seed(name))
+            self._streams[name] = stream
+        return stream
+
+    def _derive_seed(self, name):
+        # Hash rather than seed + offset, so neighbouring run seeds don't share streams
+        digest = hashlib.sha256(f"{self.seed}:{name}".encode()).digest()
+        return int.from_bytes(digest[:8], 'big')
+
+    @property
+    def mapgen(self):
+        return self.stream('mapgen')
+
+    @property
+    def combat(self):
+        return self.stream('combat')
+
+    @property
+    def loot(self):
+        return self.stream('loot')
+
+    @property
+    def flavor(self):
+        return self.stream('flavor')
@@ -0,0 +1,153 @@
+# MultipleFiles/scheduler.py
+"""
+Turn scheduler: who acts next on a dungeon level.
+
+Every actor has a time at which its next turn comes up. Taking a turn moves that
+time on by TURN_DELAY / speed, so a speed 2 monster acts twice for every turn of a
+speed 1 one. Actors whose turns come up at the same time act in initiative order
+(highest first), then in the order they were added. With every speed at 1 (the
+default, `speed` is optional on entities) this is the plain initiative order,
+round after round.
+
+The actors are kept in a heap. Adding one and ending a turn cost O(log n); removing
+one only marks its heap entry, which is thrown away when it reaches the top.
+"""
+import heapq
+
+TURN_DELAY = 100 # Time between two turns of a speed 1 actor
+
+# Heap entry fields
+_TIME, _INITIATIVE, _SEQ, _ENTITY = range(4)
+
+
+def turn_delay(entity):
+    speed = getattr(entity, 'speed', 1)
+    return max(1, round(TURN_DELAY / speed)) if speed > 0 else TURN_DELAY
+
+
+class TurnScheduler:
+    def __init__(self):
+        self._heap = []        # [time, -initiative, seq, entity]; entity is None once removed
+        self._entries = {}     # id(entity) -> its heap entry
+        self._current = None   # Entry of the actor whose turn it is (not in the heap)
+        self._next_seq = 0
+        self._removed = 0      # Removed entries still in the heap
+        self.turns = 0         # Turns ended so far
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def __contains__(self, entity):
+        return id(entity) in self._entries
+
+    def __iter__(self):
+        """The actors, the current one first and then in the order their turns come up."""
+        entries = sorted(entry for entry in self._heap if entry[_ENTITY] is not None)
+        if self._current is not None and self._current[_ENTITY] is not None:
+            entries.insert(0, self._current)
+        return iter([entry[_ENTITY] for entry in entries])
+
+    @property
+    def time(self):
+        """Time of the current turn."""
+        if self._current is not None:
+            return self._current[_TIME]
+        self._drop_removed()
+        return self._heap[0][_TIME] if self._heap else 0
+
+    def clear(self):
+        self._heap.clear()
+        self._entries.clear()
+        self._current = None
+        self._removed = 0
+
+    def reset(self, entities):
+        """Starts over with these actors (initiative already rolled); the first one in initiative order acts first."""
+        self.clear()
+        for entity in entities:
+            self._push(0, entity)
+
+    def add(self, entity):
+        """
+        Adds an actor mid-level (a revealed mimic, a summon). Like joining the initiative
+        order: it still acts this round if its initiative is below the current actor's,
+        otherwise from the next round.
+        """
+        if entity in self:
+            return
+        now = self.time
+        current = self._current
+        if current is not None and -getattr(entity, 'initiative', 0) < current[_INITIATIVE]:
+            now += turn_delay(entity)
+        self._push(now, entity)
+
+    def remove(self, entity):
+        """Takes an actor out (dead, despawned). O(1): its heap entry is skipped later."""
+        entry = self._entries.pop(id(entity), None)
+        if entry is None:
+            return
+        entry[_ENTITY] = None
+        if entry is not self._current:
+            self._removed += 1
+            if self._removed > 32 and self._removed > len(self._heap) // 2:
+                self._compact()
+
+    def current(self):
+        """The actor whose turn it is, or None if there are none."""
+        if self._current is not None and self._current[_ENTITY] is not None:
+            return self._current[_ENTITY]
+        # The current actor was removed during its turn: the next one is up
+        self._drop_removed()
+        return self._heap[0][_ENTITY] if self._heap else None
+
+    def advance(self):
+        """Ends the current actor's turn and moves on to the next one. Returns the new current actor."""
+        current = self._current
+        if current is not None and current[_ENTITY] is not None:
+            current[_TIME] += turn_delay(current[_ENTITY])
+            heapq.heappush(self._heap, current)
+        self._current = None
+        self.turns += 1
+        return self._pop_current()
+
+    # --- Internals ---
+    def _push(self, time, entity):
+        entry = [time, -getattr(entity, 'initiative', 0), self._next_seq, entity]
+        self._next_seq += 1
+        self._entries[id(entity)] = entry
+        if self._current is None and not self._heap:
+            self._current = entry # First actor: its turn starts right away
+        elif self._current is not None and entry < self._current:
+            # Goes before the current actor, which (not having acted yet) hands its turn over
+            heapq.heappush(self._heap, self._current)
+            self._current = entry
+        else:
+            heapq.heappush(self._heap, entry)
+
+    def _pop_current(self):
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            if entry[_ENTITY] is None:
+                self._removed -= 1
+                continue
+            if not getattr(entry[_ENTITY], 'alive', True):
+                # Died without being removed: it doesn't get a turn
+                self._entries.pop(id(entry[_ENTITY]), None)
+                continue
+            self._current = entry
+            return entry[_ENTITY]
+        return None
+
+    def _drop_removed(self):
+        heap = self._heap
+        while heap and heap[0][_ENTITY] is None:
+            heapq.heappop(heap)
+            self._removed -= 1
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if entry[_ENTITY] is not None]
+        heapq.heapify(self._heap)
+        self._removed = 0
@@ -2,26 +2,69 @@ import random
 
 
 class StatusEffect:
+    per_turn = False # True if apply_effect() does something every turn (e.g. damage over time)
+
     def __init__(self, name, duration, source=None):
         self.name = name
         self.duration = duration
-        self.turns_left = duration
         self.source = source # Who applied the effect (e.g., a monster)
+        self.key = None # Registry name, set by EffectType.create()
+        self.timer = None # Expiry timer on game.timers, set by start()
+        self.paused_turns = None # Turns left while the timer is stopped by pause()
+
+    def __getstate__(self):
+        # The timer belongs to the live game.timers (and holds the Game): keep only the turns left
+        state = self.__dict__.copy()
+        if self.timer is not None:
+            state['paused_turns'] = self.timer.remaining
+        state['timer'] = None
+        return state
+
+    @property
+    def turns_left(self):
+        if self.timer is not None:
+            return self.timer.remaining
+        return self.paused_turns if self.paused_turns is not None else self.duration
+
+    def start(self, target, game_instance, duration=None):
+        """
+        (Re)starts the effect on target: it ends through target.end_status_effect() when
+        its duration (or the given one, for a refresh) runs out.
+        """
+        game_instance.timers.cancel(self.timer)
+        self.timer = game_instance.timers.schedule(duration or self.duration, target.end_status_effect, self, game_instance)
+        self.paused_turns = None
+        self.on_start(target, game_instance)
+
+    def pause(self, game_instance):
+        """Stops the expiry timer, keeping the turns left (the target's level is being stored)."""
+        if self.timer is not None:
+            self.paused_turns = self.timer.remaining
+            game_instance.timers.cancel(self.timer)
+            self.timer = None
+
+    def resume(self, target, game_instance):
+        """Restarts the expiry timer stopped by pause() (the target's level is back)."""
+        if self.timer is None and self.paused_turns is not None:
+            self.timer = game_instance.timers.schedule(self.paused_turns, target.end_status_effect, self, game_instance)
+            self.paused_turns = None
+
+    def on_start(self, target, game_instance):
+        """Called when the effect is applied or refreshed."""
+        pass
 
     def apply_effect(self, target, game_instance):
-        """Applies the effect to the target each turn."""
+        """Applies the effect to the target each turn (only called if per_turn is set)."""
         pass # To be overridden by specific effects
 
-    def tick_down(self):
-        """Decrements the duration of the effect."""
-        self.turns_left -= 1
-
     def on_end(self, target, game_instance):
         """Called when the effect ends."""
         game_instance.message_log.add_message(f"{target.name} is no longer {self.name.lower()}.", (150, 150, 150))
 
 
 class Poisoned(StatusEffect):
+    per_turn = True
+
     def __init__(self, duration, source=None, damage_per_turn=2):
         super().__init__("Poisoned", duration, source)
         self.damage_per_turn = damage_per_turn
@@ -46,6 +89,8 @@ class Restrained(StatusEffect):
 
 
 class Burning(StatusEffect):
+    per_turn = True
+
     def __init__(self, duration, source=None, damage_per_turn=3):
         super().__init__("Burning", duration, source)
         self.damage_per_turn = damage_per_turn
@@ -64,6 +109,8 @@ class Burning(StatusEffect):
                         
 
 class AcidBurned(StatusEffect):
+    per_turn = True
+
     def __init__(self, duration, source=None, damage_per_turn=3):
         super().__init__("Acid Burned", duration, source)
         self.damage_per_turn = damage_per_turn
@@ -88,12 +135,10 @@ class PowerAttackBuff(StatusEffect):
         self.attack_modifier = -5 # Example: -5 to hit
         self.damage_modifier = 10 # Example: +10 to damage
 
-    def apply_effect(self, target, game_instance):
+    def on_start(self, target, game_instance):
         """This effect modifies the player's stats directly when active."""
         # The actual modification will happen in the player's attack calculation
-        # This method is mostly for logging or continuous effects.
-        if self.turns_left == self.duration: # Only log when first applied
-            game_instance.message_log.add_message(f"{target.name} is imbued with Power Attack!", (255, 165, 0))
+        game_instance.message_log.add_message(f"{target.name} is imbued with Power Attack!", (255, 165, 0))
 
     def on_end(self, target, game_instance):
         """Called when the buff expires."""
@@ -105,14 +150,14 @@ class CunningActionDashBuff(StatusEffect):
     def __init__(self, duration=1): # Lasts for 1 turn (until next movement)
         super().__init__("Cunning Action (Dash)", duration)
     
-    def apply_effect(self, target, game_instance):
+    def on_start(self, target, game_instance):
         # Message is now handled in game.py when choice is made
         target.dash_active = True # Set player flag
     
     def on_end(self, target, game_instance):
         super().on_end(target, game_instance)
         game_instance.message_log.add_message(f"{target.name}'s Dash readiness fades.", (150, 150, 150))
-        # Flag is cleared in player.process_status_effects
+        # Flag is cleared in player.end_status_effect
 
 
 class EvasionBuff(StatusEffect):
@@ -122,10 +167,133 @@ class EvasionBuff(StatusEffect):
                                # This will be added to the player's AC for attack rolls
         self.damage_reduction_multiplier = 0.5 # Take half damage if hit
    
-    def apply_effect(self, target, game_instance):
-        if self.turns_left == self.duration: # Only log when first applied
-            game_instance.message_log.add_message(f"{target.name} becomes incredibly agile, ready to evade!", (100, 255, 255))
+    def on_start(self, target, game_instance):
+        game_instance.message_log.add_message(f"{target.name} becomes incredibly agile, ready to evade!", (100, 255, 255))
    
     def on_end(self, target, game_instance):
         super().on_end(target, game_instance)
-        game_instance.message_log.add_message(f"{target.name}'s Evasion fades.", (150, 150, 150))
\ No newline at end of file
+        game_instance.message_log.add_message(f"{target.name}'s Evasion fades.", (150, 150, 150))
+
+
+# --- Registry ---
+# Stacking policies: what applying an effect the target already has does
+REFRESH = 'refresh' # Restart the existing effect with the new duration
+REPLACE = 'replace' # End the existing effect (without on_end) and start the new one
+IGNORE = 'ignore'   # Keep the existing effect as it is
+
+
+class EffectType:
+    """A registered status effect: its factory, stacking policy and bit in StatusEffectTable.mask."""
+    def __init__(self, name, effect_class, factory, stacking, bit):
+        self.name = name
+        self.effect_class = effect_class
+        self.factory = factory
+        self.stacking = stacking
+        self.bit = bit
+
+    def create(self, duration, source=None):
+        effect = self.factory(duration, source)
+        effect.key = self.name
+        return effect
+
+
+STATUS_EFFECTS = {} # name -> EffectType
+PER_TURN_EFFECTS = 0 # Bits of the effects whose apply_effect() runs every turn
+
+
+def register_status_effect(name, effect_class, stacking=REFRESH, factory=None):
+    """
+    Registers a status effect under the name used by add_status_effect(). Returns its bit.
+
+    Args:
+        factory (callable): factory(duration, source) making the effect. Defaults to effect_class.
+    """
+    global PER_TURN_EFFECTS
+    existing = STATUS_EFFECTS.get(name)
+    bit = existing.bit if existing else 1 << len(STATUS_EFFECTS)
+    STATUS_EFFECTS[name] = EffectType(name, effect_class, factory or effect_class, stacking, bit)
+    if effect_class.per_turn:
+        PER_TURN_EFFECTS |= bit
+    return bit
+
+
+def effect_bit(name):
+    return STATUS_EFFECTS[name].bit
+
+
+class StatusEffectTable:
+    """
+    An entity's active status effects, one per registered name, in the order they
+    were added. `mask` has the bit of every active effect, for quick checks:
+
+        if target.active_status_effects.mask & EVASION:
+    """
+    def __init__(self):
+        self._effects = {} # name -> effect
+        self.mask = 0
+
+    def __iter__(self):
+        return iter(list(self._effects.values()))
+
+    def __len__(self):
+        return len(self._effects)
+
+    def __bool__(self):
+        return bool(self._effects)
+
+    def __contains__(self, effect):
+        return self._effects.get(getattr(effect, 'key', None)) is effect
+
+    def get(self, name):
+        """The active effect registered as name, or None."""
+        return self._effects.get(name)
+
+    def has_per_turn(self):
+        """True if any active effect does something every turn."""
+        return bool(self.mask & PER_TURN_EFFECTS)
+
+    def apply(self, target, effect_type, duration, game_instance, source=None):
+        """
+        Applies an effect to target following its stacking policy.
+        Returns (effect, is_new): is_new is False if an existing effect was refreshed or kept.
+        """
+        existing = self._effects.get(effect_type.name)
+        if existing is not None:
+            if effect_type.stacking == IGNORE:
+                return existing, False
+            if effect_type.stacking == REFRESH:
+                existing.start(target, game_instance, duration)
+                return existing, False
+            self.remove(existing, game_instance) # REPLACE
+        effect = effect_type.create(duration, source)
+        self._effects[effect_type.name] = effect
+        self.mask |= effect_type.bit
+        effect.start(target, game_instance)
+        return effect, True
+
+    def remove(self, effect, game_instance=None):
+        """Takes an effect out (cancelling its timer if game_instance is given). Returns True if it was active."""
+        if effect not in self:
+            return False
+        del self._effects[effect.key]
+        self.mask &= ~STATUS_EFFECTS[effect.key].bit
+        if game_instance is not None:
+            game_instance.timers.cancel(effect.timer)
+        effect.timer = None
+        return True
+
+    def clear(self):
+        self._effects.clear()
+        self.mask = 0
+
+
+POISONED = register_status_effect("Poisoned", Poisoned)
+RESTRAINED = register_status_effect("Restrained", Restrained)
+BURNING = register_status_effect("Burning", Burning)
+ACID_BURNED = register_status_effect("AcidBurned", AcidBurned)
+POWER_ATTACK = register_status_effect("PowerAttackBuff", PowerAttackBuff,
+                                      factory=lambda duration, source=None: PowerAttackBuff(duration))
+CUNNING_ACTION_DASH = register_status_effect("CunningActionDashBuff", CunningActionDashBuff,
+                                             factory=lambda duration, source=None: CunningActionDashBuff(duration))
+EVASION = register_status_effect("EvasionBuff", EvasionBuff,
+                                 factory=lambda duration, source=None: EvasionBuff(duration))
@@ -0,0 +1,95 @@
+# MultipleFiles/timers.py
+"""
+Turn timers: status effect expiry, ability cooldowns and summon lifetimes.
+
+Game.timers is a hashed timer wheel counting the player's turns. Something that
+ends after a number of turns schedules a callback instead of being counted down
+every turn:
+
+    effect.timer = game.timers.schedule(effect.duration, target.end_status_effect, effect, game)
+
+Timers are kept in a ring of slots by deadline, so advancing a turn only looks at
+the timers in one slot: the cost of a turn grows with the timers that fire, not
+with the ones that are running.
+"""
+from core.log import get_logger
+
+log = get_logger('game')
+
+
+class Timer:
+    __slots__ = ('deadline', 'callback', 'args', 'wheel', 'active')
+
+    def __init__(self, deadline, callback, args, wheel):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.wheel = wheel
+        self.active = True
+
+    @property
+    def remaining(self):
+        """Turns until the timer fires (0 once it fired or was cancelled)."""
+        return self.deadline - self.wheel.now if self.active else 0
+
+
+class TimerWheel:
+    def __init__(self, slots=64):
+        self.now = 0 # Turns advanced so far
+        self._slots = [[] for _ in range(slots)]
+        self._active = 0
+
+    def __len__(self):
+        return self._active
+
+    def schedule(self, turns, callback, *args):
+        """Calls callback(*args) after `turns` turns (at least one). Returns the Timer."""
+        timer = Timer(self.now + max(1, turns), callback, args, self)
+        self._slots[timer.deadline % len(self._slots)].append(timer)
+        self._active += 1
+        return timer
+
+    def cancel(self, timer):
+        """Stops a timer from firing. Cancelled timers are dropped when their slot comes round."""
+        if timer is not None and timer.active:
+            timer.active = False
+            self._active -= 1
+
+    def reschedule(self, timer, turns):
+        """Cancels timer and schedules its callback again, `turns` from now. Returns the new Timer."""
+        self.cancel(timer)
+        return self.schedule(turns, timer.callback, *timer.args)
+
+    def advance(self):
+        """Moves on by one turn and fires the timers that are due, in the order they were scheduled."""
+        self.now += 1
+        index = self.now % len(self._slots)
+        slot = self._slots[index]
+        if not slot:
+            return 0
+        due = []
+        waiting = []
+        for timer in slot:
+            if not timer.active:
+                continue
+            (due if timer.deadline <= self.now else waiting).append(timer) # Later laps wait
+        self._slots[index] = waiting
+        fired = 0
+        for timer in due:
+            if not timer.active:
+                continue # Cancelled by an earlier callback
+            timer.active = False
+            self._active -= 1
+            fired += 1
+            timer.callback(*timer.args)
+        if fired:
+            log.debug("Turn %d: %d timer(s) fired, %d running", self.now, fired, self._active)
+        return fired
+
+    def clear(self):
+        """Drops every timer (new game) without firing them."""
+        for slot in self._slots:
+            for timer in slot:
+                timer.active = False
+            slot.clear()
+        self._active = 0
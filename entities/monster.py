@@ -1,8 +1,12 @@
 # MultipleFiles/monster.py
 import random
-from core.pathfinding import astar
-from core.status_effects import Poisoned, AcidBurned, Burning, PowerAttackBuff, EvasionBuff
-from core.floating_text import FloatingText 
+from core.pathfinding import astar, build_occupancy, MONSTER_MAX_EXPANSIONS
+from core.status_effects import STATUS_EFFECTS, EVASION, StatusEffectTable
+from core.dice import compile_dice
+from core.log import get_logger
+
+log = get_logger('ai')
+combat_log = get_logger('combat')
 
 class Monster:
     def __init__(self, x, y, char, name, color):
@@ -17,16 +21,18 @@ class Monster:
         self.hp = 10
         self.max_hp = 10
         self.attack_power = 2 # Melee attack power
+        self.damage_dice = "1d4" # Melee damage dice (plus attack_power)
         self.armor_class = 11
         self.base_xp = 10
         self.initiative = 0
         self.blocks_movement = True
-        self.active_status_effects = []
+        self.active_status_effects = StatusEffectTable()
         
         # Ranged attack specific attributes (default to 0/False)
         self.is_ranged = False
         self.ranged_attack_power = 0
         self.range = 0 # Max range for ranged attacks
+        self.ranged_damage_dice = "1d6" # Plus ranged_attack_power
 
         # Poison specific attributes
         self.can_poison = False
@@ -44,11 +50,21 @@ class Monster:
         self.can_burn = False
         self.burn_dc = 14
         self.burn_duration = 3
-        self.burn_damage_per_turn = random.randint(1,4)
+        self.burn_damage_per_turn = 3 # Not read anywhere yet; Burning uses its own damage_per_turn
+
+    @property
+    def dice(self):
+        """The compiled damage_dice (compile_dice caches it, so this doesn't parse)."""
+        return compile_dice(self.damage_dice)
+
+    @property
+    def ranged_dice(self):
+        """The compiled ranged_damage_dice."""
+        return compile_dice(self.ranged_damage_dice)
 
-    def roll_initiative(self):
+    def roll_initiative(self, rng=None):
         """Roll for turn order"""
-        self.initiative = random.randint(1, 20)
+        self.initiative = (rng or random).randint(1, 20)
 
     def distance_to(self, target_x, target_y):
         """Calculate the Chebyshev distance to another point."""
@@ -59,18 +75,18 @@ class Monster:
     def take_turn(self, player, game_map, game):
         """Handle monster's combat and movement"""
         if not self.alive:
-            print(f"DEBUG: {self.name} is dead, skipping turn.") # <--- ADD THIS
+            log.debug("%s is dead, skipping turn.", self.name)
             return
 
         # Process status effects at the start of the monster's turn
         self.process_status_effects(game)
         if not self.alive: # Check if monster died from status effect
-           print(f"DEBUG: {self.name} died from status effect, skipping turn.") # <--- ADD THIS
+           log.debug("%s died from status effect, skipping turn.", self.name)
            return
 
         # Check if adjacent to player (including diagonals)
         if self.is_adjacent_to(player):
-            print(f"DEBUG: {self.name} is adjacent to player. Calling attack().") # <--- ADD THIS
+            log.debug("%s is adjacent to player. Calling attack().", self.name)
             self.attack(player, game) # Use base melee attack
             return
 
@@ -78,34 +94,39 @@ class Monster:
         if self.is_ranged:
             distance_to_player = self.distance_to(player.x, player.y)
             if distance_to_player <= self.range and game.check_line_of_sight(self.x, self.y, player.x, player.y):
-                print(f"DEBUG: {self.name} is ranged and player in LOS. Calling ranged_attack().") # <--- ADD THIS
+                log.debug("%s is ranged and player in LOS. Calling ranged_attack().", self.name)
                 self.ranged_attack(player, game)
                 return
 
-        # Otherwise, move toward player using A* pathfinding
-        print(f"DEBUG: {self.name} is moving towards player.") # <--- ADD THIS
-        other_entities = [e for e in game.entities if e != self and e != player and e.alive and e.blocks_movement]
-
-        path = astar(game_map, (self.x, self.y), (player.x, player.y), entities=other_entities)
-
-        if path and len(path) > 1:
-            next_step = path[1]
+        # Otherwise, move toward player by walking down the shared distance map
+        log.debug("%s is moving towards player.", self.name)
+        def occupied(x, y):
+            return game_map.get_blocking_entity_at(x, y, exclude=self) is not None
+
+        distance_map = game.get_player_distance_map()
+        next_step = distance_map.step_towards(self.x, self.y, is_blocked=occupied)
+        if next_step is None and distance_map.distance_at(self.x, self.y) is not None:
+            # Every closer cell is taken by another monster: route around them with A*
+            other_entities = [e for e in game.entities if e != self and e != player and e.alive and e.blocks_movement]
+            path = astar(game_map, (self.x, self.y), (player.x, player.y),
+                         occupancy=build_occupancy(game_map, other_entities),
+                         max_expansions=MONSTER_MAX_EXPANSIONS)
+            if path and len(path) > 1:
+                next_step = path[1]
+
+        if next_step:
             new_x, new_y = next_step
 
-            is_blocked = False
-            for entity in game.entities:
-                if entity != self and entity.x == new_x and entity.y == new_y and entity.alive and entity.blocks_movement:
-                    is_blocked = True
-                    break
+            is_blocked = occupied(new_x, new_y)
 
             if not is_blocked:
-                self.x, self.y = new_x, new_y
-                print(f"DEBUG: {self.name} moved to ({self.x},{self.y}).") # <--- ADD THIS
+                game_map.move_entity(self, new_x, new_y)
+                log.debug("%s moved to (%d,%d).", self.name, self.x, self.y)
             else:
                 game.message_log.add_message(f"The {self.name} is blocked and waits.", (100, 100, 100))
-                print(f"DEBUG: {self.name} is blocked.") # <--- ADD THIS
+                log.debug("%s is blocked.", self.name)
         else:
-            print(f"DEBUG: {self.name} found no path or no next step.") # <--- ADD THIS
+            log.debug("%s found no path or no next step.", self.name)
 
 
     def is_adjacent_to(self, other):
@@ -120,8 +141,8 @@ class Monster:
             return
 
         # --- Monster Attack Roll ---
-        roll1 = random.randint(1, 20)
-        roll2 = random.randint(1, 20) 
+        roll1 = game.rng.combat.randint(1, 20)
+        roll2 = game.rng.combat.randint(1, 20) 
 
         final_d20_roll = roll1
         roll_message_part = f"a d20: {roll1}"
@@ -143,11 +164,8 @@ class Monster:
         # --- Apply EvasionBuff to target's AC if present ---
         target_ac = target.armor_class
         evasion_buff = None
-        if hasattr(target, 'active_status_effects'): # Ensure target is a Player or similar
-            for effect in target.active_status_effects:
-                if isinstance(effect, EvasionBuff):
-                    evasion_buff = effect
-                    break
+        if hasattr(target, 'active_status_effects') and target.active_status_effects.mask & EVASION: # Ensure target is a Player or similar
+            evasion_buff = target.active_status_effects.get("EvasionBuff")
 
         if evasion_buff:
             target_ac += evasion_buff.dodge_bonus
@@ -187,29 +205,23 @@ class Monster:
                 f"A claw rakes across {target.name}'s arm!",
                 f"The {self.name} connects with a brutal blow!"
             ]
-            game.message_log.add_message(random.choice(monster_hit_messages), (255, 100, 100))
+            game.message_log.add_message(game.rng.flavor.choice(monster_hit_messages), (255, 100, 100))
 
-            hit_text = FloatingText(target.x, target.y, "HIT!", (255, 255, 0))
-            game.floating_texts.append(hit_text)
-            # print(f"DEBUG: Monster added HIT! FloatingText for {target.name} at ({target.x},{target.y}). Initial frames_left: {hit_text.frames_left}. List size: {len(game.floating_texts)}") # <--- MODIFIED PRINT
+            game.floating_texts.spawn(target.x, target.y, "HIT!", (255, 255, 0))
 
 
             # --- Damage Calculation ---
-            monster_die_type = 4 # Assuming 1d4 for monsters
-            damage_rolls = []
-            total_dice_rolled = 1 # Default to 1 die
+            dice = self.dice
 
             if is_critical_hit:
-                total_dice_rolled *= 2 # Double the number of dice rolled for critical hits
-                game.message_log.add_message(f"Critical Hit! The {self.name} rolls {total_dice_rolled}d{monster_die_type} for damage!", (255, 100, 100))
+                # Double the number of dice rolled for critical hits
+                game.message_log.add_message(f"Critical Hit! The {self.name} rolls {dice.critical()} for damage!", (255, 100, 100))
 
-            for _ in range(total_dice_rolled):
-                damage_rolls.append(random.randint(1, monster_die_type))
-            
-            damage_dice_rolls_sum = sum(damage_rolls)
+            damage_rolls = dice.roll_dice(game.rng.combat, critical=is_critical_hit)
+            damage_dice_rolls_sum = dice.total(damage_rolls)
             
             # Construct the message part for dice rolls
-            damage_message_dice_part = f"{total_dice_rolled}d{monster_die_type} ({' + '.join(map(str, damage_rolls))})"
+            damage_message_dice_part = dice.describe(damage_rolls, critical=is_critical_hit)
 
             damage_modifier = self.attack_power
             damage_total = max(1, damage_dice_rolls_sum + damage_modifier)
@@ -226,9 +238,8 @@ class Monster:
                 (255, 50, 50)
             )
 
-            damage_text = FloatingText(target.x, target.y - 0.5, str(damage_dealt), (255, 0, 0))
-            game.floating_texts.append(damage_text)
-            print(f"DEBUG: Monster added DAMAGE FloatingText for {target.name} at ({target.x},{target.y}). Initial frames_left: {damage_text.frames_left}. List size: {len(game.floating_texts)}") # <--- MODIFIED PRINT
+            game.floating_texts.spawn(target.x, target.y - 0.5, str(damage_dealt), (255, 0, 0))
+            combat_log.debug("%s hits %s at (%d,%d) for %d damage.", self.name, target.name, target.x, target.y, damage_dealt)
 
             # --- Apply Poison if applicable ---
             if self.can_poison and target.alive:
@@ -273,11 +284,10 @@ class Monster:
                 f"{target.name} deftly avoids the {self.name}'s attack!",
                 f"The {self.name}'s attack whiffs past {target.name}!"
             ]
-            game.message_log.add_message(random.choice(monster_miss_messages), (200, 200, 200))
+            game.message_log.add_message(game.rng.flavor.choice(monster_miss_messages), (200, 200, 200))
 
-            miss_text = FloatingText(target.x, target.y, "MISS!", (150, 150, 150))
-            game.floating_texts.append(miss_text)
-            print(f"DEBUG: Monster added MISS! FloatingText for {target.name} at ({target.x},{target.y}). Initial frames_left: {miss_text.frames_left}. List size: {len(game.floating_texts)}") # <--- MODIFIED PRINT
+            game.floating_texts.spawn(target.x, target.y, "MISS!", (150, 150, 150))
+            combat_log.debug("%s misses %s at (%d,%d).", self.name, target.name, target.x, target.y)
 
 
     def ranged_attack(self, target, game):
@@ -288,27 +298,24 @@ class Monster:
         game.message_log.add_message(f"The {self.name} makes a ranged attack at {target.name}!", (255, 150, 0))
         
         # Simplified ranged attack roll (you can make this more complex later)
-        attack_roll = random.randint(1, 20) + 2 # Example: +2 to hit for ranged
+        attack_roll = game.rng.combat.randint(1, 20) + 2 # Example: +2 to hit for ranged
         
         if attack_roll >= target.armor_class:
-            damage = random.randint(1, 6) + self.ranged_attack_power # Example: 1d6 + ranged_attack_power
+            damage = self.ranged_dice.roll(game.rng.combat) + self.ranged_attack_power # Example: 1d6 + ranged_attack_power
             damage_dealt = target.take_damage(damage, game, damage_type='piercing')
             game.message_log.add_message(f"The projectile hits {target.name} for {damage_dealt} damage!", (255, 50, 50))
             
             # --- ADDED: Floating Text for HIT! ---
-            hit_text = FloatingText(target.x, target.y, "HIT!", (255, 255, 0))
-            game.floating_texts.append(hit_text)
+            game.floating_texts.spawn(target.x, target.y, "HIT!", (255, 255, 0))
             # --- ADDED: Floating Text for Damage Dealt ---
-            damage_text = FloatingText(target.x, target.y - 0.5, str(damage_dealt), (255, 0, 0))
-            game.floating_texts.append(damage_text)
+            game.floating_texts.spawn(target.x, target.y - 0.5, str(damage_dealt), (255, 0, 0))
             if not target.alive:
                 game.message_log.add_message(f"{target.name} has been slain by a ranged attack!", (200, 0, 0))
         else:
             game.message_log.add_message(f"The {self.name}'s projectile misses {target.name}.", (200, 200, 200))
             
             # --- ADDED: Floating Text for MISS! ---
-            miss_text = FloatingText(target.x, target.y, "MISS!", (150, 150, 150))
-            game.floating_texts.append(miss_text)
+            game.floating_texts.spawn(target.x, target.y, "MISS!", (150, 150, 150))
             
 
     def take_damage(self, amount, game_instance=None, damage_type=None): 
@@ -319,6 +326,8 @@ class Monster:
         if self.hp <= 0:
             self.hp = 0
             self.alive = False
+            if game_instance is not None:
+                game_instance.entity_died(self)
             
         return damage_taken
 
@@ -327,45 +336,43 @@ class Monster:
         return self.base_xp
 
     def add_status_effect(self, effect_name, duration, game_instance, source=None):
-        """Adds a status effect to the monster."""
-        new_effect = None
-        if effect_name == "Poisoned":
-            new_effect = Poisoned(duration, source)
-        # Add other status effects here if monsters can get them
-        elif effect_name == "AcidBurned":
-            new_effect = AcidBurned(duration, source)  
-        
-        elif effect_name == "Burning":
-            new_effect == Burning(duration, source)      
-        
-        
-        if new_effect:
-            for existing_effect in self.active_status_effects:
-                if type(existing_effect) is type(new_effect): # Check if it's the same class of effect
-                    existing_effect.turns_left = new_effect.duration
-                    game_instance.message_log.add_message(f"{self.name}'s {new_effect.name} effect is refreshed.", (200, 200, 255))
-                    return
-            
-            self.active_status_effects.append(new_effect)
-            new_effect.apply_effect(self, game_instance) # Call apply_effect immediately upon adding
+        """Adds a status effect (by its name in core.status_effects.STATUS_EFFECTS) to the monster."""
+        effect_type = STATUS_EFFECTS.get(effect_name)
+        if effect_type:
+            effect, is_new = self.active_status_effects.apply(self, effect_type, duration, game_instance, source)
+            if not is_new:
+                game_instance.message_log.add_message(f"{self.name}'s {effect.name} effect is refreshed.", (200, 200, 255))
+                return
+            if effect.per_turn:
+                effect.apply_effect(self, game_instance) # Call apply_effect immediately upon adding
         else:
             game_instance.message_log.add_message(f"Warning: Attempted to add unknown status effect to monster: {effect_name}", (255, 0, 0))
-            print(f"Warning: Attempted to add unknown status effect to monster: {effect_name}")
+            combat_log.warning("Attempted to add unknown status effect to monster: %s", effect_name)
 
 
     def process_status_effects(self, game_instance):
-        """Processes all active status effects on the monster."""
-        effects_to_remove = []
-        for effect in self.active_status_effects:
-            effect.apply_effect(self, game_instance) # Ensure apply_effect is called
-            effect.tick_down()
-            if effect.turns_left <= 0:
-                effects_to_remove.append(effect)
-        
-        for effect in effects_to_remove:
-            self.active_status_effects.remove(effect)
+        """Applies the status effects that act every turn. They end through end_status_effect()."""
+        if self.active_status_effects.has_per_turn():
+            for effect in self.active_status_effects:
+                if effect.per_turn:
+                    effect.apply_effect(self, game_instance)
+
+    def end_status_effect(self, effect, game_instance):
+        """Timer callback: the effect ran out."""
+        if not self.active_status_effects.remove(effect):
+            return
+        if self.alive:
             effect.on_end(self, game_instance)
 
+    def pause_timers(self, game_instance):
+        """The monster's level is being stored: its effects stop running out until resume_timers()."""
+        for effect in self.active_status_effects:
+            effect.pause(game_instance)
+
+    def resume_timers(self, game_instance):
+        for effect in self.active_status_effects:
+            effect.resume(self, game_instance)
+
 
 class Mimic(Monster):
     def __init__(self, x, y, disguise_char, initial_color): 
@@ -411,7 +418,7 @@ class Mimic(Monster):
     def reveal(self, game_instance):
         """Mimic fully reveals its true form."""
         if self.disguised:
-            print(f"DEBUG: Mimic at ({self.x},{self.y}) revealing. Current char (before change): {self.char}")
+            log.debug("Mimic at (%d,%d) revealing. Current char (before change): %s", self.x, self.y, self.char)
             self.disguised = False
             
             self.char = self.revealed_char 
@@ -419,27 +426,25 @@ class Mimic(Monster):
             
             game_instance.message_log.add_message("The object suddenly sprouts teeth and eyes! It's a MIMIC!", (255, 0, 0))
             game_instance.message_log.add_message("Prepare for battle!", (255, 100, 100))
-            print(f"DEBUG: Mimic at ({self.x},{self.y}) revealed. New char: {self.char}, color: {self.color}")
+            log.debug("Mimic at (%d,%d) revealed. New char: %s, color: %s", self.x, self.y, self.char, self.color)
             # Mimic immediately attacks the player if adjacent after revealing
             if self.is_adjacent_to(game_instance.player):
                 self.attack(game_instance.player, game_instance)
             
             if self not in game_instance.entities:
-                game_instance.entities.append(self)
-                print(f"DEBUG: Mimic added to game.entities.")
-            if self not in game_instance.turn_order:
-                self.roll_initiative()
-                game_instance.turn_order.append(self)
-                game_instance.turn_order = sorted(game_instance.turn_order, key=lambda e: e.initiative, reverse=True)
-                print(f"DEBUG: Mimic added to game.turn_order.")
+                game_instance.add_entity(self)
+                log.debug("Mimic added to game.entities.")
+            if self not in game_instance.scheduler:
+                self.roll_initiative(game_instance.rng.combat)
+                game_instance.scheduler.add(self)
+                log.debug("Mimic added to game.scheduler.")
             
-            if self in game_instance.game_map.items_on_ground:
-                game_instance.game_map.items_on_ground.remove(self)
-                print(f"DEBUG: Mimic removed from game_map.items_on_ground upon reveal.")
+            if game_instance.game_map.remove_item(self):
+                log.debug("Mimic removed from game_map.items_on_ground upon reveal.")
             
             from world.tile import floor # Import floor tile
-            game_instance.game_map.tiles[self.y][self.x] = floor
-            print(f"DEBUG: MimicTile at ({self.x},{self.y}) replaced with floor tile.")
+            game_instance.game_map.set_tile(self.x, self.y, floor)
+            log.debug("MimicTile at (%d,%d) replaced with floor tile.", self.x, self.y)
             
             game_instance.update_fov()
 
@@ -1,9 +1,12 @@
 import random
 from core.inventory import Inventory
 from core.abilities import SecondWind, PowerAttack, CunningAction, Evasion, FireBolt, MistyStep, SpotTrapsAbility, DisarmTrapsAbility, DetectMagic, MageHand
-from core.status_effects import StatusEffect, Poisoned, AcidBurned, PowerAttackBuff, CunningActionDashBuff, EvasionBuff, Burning
+from core.status_effects import STATUS_EFFECTS, EVASION, CunningActionDashBuff, StatusEffectTable
 from items.items import long_sword, chainmail_armor, short_sword, leather_armor, dagger, robes, lesser_healing_potion, greater_healing_potion, thieves_tools, Item
 from entities.races import Human, HillDwarf, DrowElf # Import the races you've defined
+from core.log import get_logger
+
+log = get_logger('combat')
     
 
 class Player: # This is our base class for playable characters
@@ -17,6 +20,9 @@ class Player: # This is our base class for playable characters
     }
     
     def __init__(self, x, y, char, name, color):
+        # Callbacks told about changes the sidebar shows (see notify_change); set first, the setters use it
+        self._change_listeners = []
+
         # Core Entity Attributes (common to all entities, including player)
         self.x = x
         self.y = y
@@ -85,13 +91,47 @@ class Player: # This is our base class for playable characters
         self.abilities = {} # <--- Initialized as empty dictionary
         
         # --- Status Effects ---
-        self.active_status_effects = []
+        self.active_status_effects = StatusEffectTable()
+        self.cooling_abilities = set() # Abilities on cooldown (their timers run on game.timers)
 
         self.cunning_action_ready = False
         self.dash_active = False # <--- NEW: Flag for dash status      
 
         self.current_action_state = None  
 
+    # --- Change notifications ---
+    def add_change_listener(self, callback):
+        """callback(player, what) is called when hp, xp, level, inventory, cooldowns or status effects change."""
+        self._change_listeners.append(callback)
+
+    def remove_change_listener(self, callback):
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+
+    def notify_change(self, what):
+        for callback in self._change_listeners:
+            callback(self, what)
+
+    def _notifying_attribute(name):
+        """A plain attribute that calls notify_change(name) whenever it is assigned."""
+        storage = '_' + name
+
+        def get(self):
+            return getattr(self, storage)
+
+        def set(self, value):
+            setattr(self, storage, value)
+            if self._change_listeners:
+                self.notify_change(name)
+        return property(get, set)
+
+    hp = _notifying_attribute('hp')
+    max_hp = _notifying_attribute('max_hp')
+    level = _notifying_attribute('level')
+    current_xp = _notifying_attribute('current_xp')
+    xp_to_next_level = _notifying_attribute('xp_to_next_level')
+    del _notifying_attribute
+
     def get_ability_modifier(self, score):
         return (score - 10) // 2
 
@@ -107,7 +147,7 @@ class Player: # This is our base class for playable characters
         return modifier
 
     def make_saving_throw(self, ability_name, dc, game_instance):
-        d20_roll = random.randint(1, 20)
+        d20_roll = game_instance.rng.combat.randint(1, 20)
         save_bonus = self.get_saving_throw_bonus(ability_name)
         save_total = d20_roll + save_bonus
 
@@ -171,10 +211,8 @@ class Player: # This is our base class for playable characters
             )
 
         evasion_buff = None
-        for effect in self.active_status_effects:
-            if isinstance(effect, EvasionBuff):
-                evasion_buff = effect
-                break
+        if self.active_status_effects.mask & EVASION:
+            evasion_buff = self.active_status_effects.get("EvasionBuff")
         
         if evasion_buff:
             original_damage = damage_taken # Store original damage for logging
@@ -187,6 +225,7 @@ class Player: # This is our base class for playable characters
 
         if self.hp <= 0:
             self.alive = False
+            game_instance.entity_died(self)
         return damage_taken
 
     def heal(self, amount):
@@ -244,20 +283,19 @@ class Player: # This is our base class for playable characters
         
         self.armor_class = self._calculate_ac() # Recalculate AC
 
-    def roll_initiative(self):
-        self.initiative = random.randint(1, 20) + self.get_ability_modifier(self.dexterity)
+    def roll_initiative(self, rng=None):
+        self.initiative = (rng or random).randint(1, 20) + self.get_ability_modifier(self.dexterity)
 
     def move_in_tavern(self, dx, dy, game_map, npcs):
         new_x = self.x + dx
         new_y = self.y + dy
 
-        for npc in npcs:
-            if npc.x == new_x and npc.y == new_y and npc.alive:
+        for npc in game_map.entities_at(new_x, new_y):
+            if npc in npcs and npc.alive:
                 return False
 
         if game_map.is_walkable(new_x, new_y):
-            self.x = new_x
-            self.y = new_y
+            game_map.move_entity(self, new_x, new_y)
             return True
 
         return False
@@ -266,17 +304,12 @@ class Player: # This is our base class for playable characters
         new_x = self.x + dx
         new_y = self.y + dy
 
-        target = None
-        for entity in entities:
-            if entity.x == new_x and entity.y == new_y and entity != self and entity.alive:
-                target = entity
-                break
+        target = game_map.get_blocking_entity_at(new_x, new_y, exclude=self)
 
         if target:
             return True
         elif game_map.is_walkable(new_x, new_y):
-            self.x = new_x
-            self.y = new_y
+            game_map.move_entity(self, new_x, new_y)
             return True
 
         return False
@@ -329,53 +362,47 @@ class Player: # This is our base class for playable characters
             return True
 
     def add_status_effect(self, effect_name, duration, game_instance, source=None):
-        """Adds a status effect to the player."""
-        new_effect = None
-        
-        if effect_name == "Poisoned":
-            new_effect = Poisoned(duration, source)
-        elif effect_name == "AcidBurned":
-            new_effect = AcidBurned(duration, source)
-        elif effect_name == "Burning":
-            new_effect = Burning(duration, source)   
-        elif effect_name == "PowerAttackBuff":
-            new_effect = PowerAttackBuff(duration)
-        elif effect_name == "CunningActionDashBuff":
-            new_effect = CunningActionDashBuff(duration)
-        elif effect_name == "EvasionBuff":
-            new_effect = EvasionBuff(duration)
-        if new_effect:
-            for existing_effect in self.active_status_effects:
-                if type(existing_effect) is type(new_effect):
-                    existing_effect.turns_left = new_effect.duration
-                    game_instance.message_log.add_message(f"{self.name}'s {new_effect.name} effect is refreshed.", (200, 200, 255))
-                    return
-            self.active_status_effects.append(new_effect)
+        """Adds a status effect (by its name in core.status_effects.STATUS_EFFECTS) to the player."""
+        effect_type = STATUS_EFFECTS.get(effect_name)
+        if effect_type:
+            effect, is_new = self.active_status_effects.apply(self, effect_type, duration, game_instance, source)
+            if not is_new:
+                game_instance.message_log.add_message(f"{self.name}'s {effect.name} effect is refreshed.", (200, 200, 255))
+            self.notify_change('status_effects')
         else:
             game_instance.message_log.add_message(f"Warning: Attempted to add unknown status effect: {effect_name}", (255, 0, 0))
-            print(f"Warning: Attempted to add unknown status effect: {effect_name}")
+            log.warning("Attempted to add unknown status effect: %s", effect_name)
 
 
     def process_status_effects(self, game_instance):
-        """Processes active status effects and ability cooldowns on the player."""
-        effects_to_remove = []
-        for effect in self.active_status_effects:
-            # Call apply_effect for continuous effects (like poison damage)
-            effect.apply_effect(self, game_instance) # <--- Ensure this is called
-            
-            effect.tick_down()
-            if effect.turns_left <= 0:
-                effects_to_remove.append(effect)
-        
-        for effect in effects_to_remove:
-            self.active_status_effects.remove(effect)
-            effect.on_end(self, game_instance)
-
-            if isinstance(effect, CunningActionDashBuff):
-                self.dash_active = False       
-        
-        for ability_name, ability_obj in self.abilities.items():
-            ability_obj.tick_cooldown()
+        """
+        Applies the status effects that act every turn (like poison damage). Expiry and
+        ability cooldowns run off game.timers, see end_status_effect().
+        """
+        if self.active_status_effects.has_per_turn():
+            for effect in self.active_status_effects:
+                if effect.per_turn:
+                    effect.apply_effect(self, game_instance)
+
+        # The sidebar shows the turns left
+        if self.active_status_effects:
+            self.notify_change('status_effects')
+        if self.cooling_abilities:
+            self.notify_change('cooldowns')
+
+    def end_status_effect(self, effect, game_instance):
+        """Timer callback: the effect ran out."""
+        if not self.active_status_effects.remove(effect):
+            return
+        effect.on_end(self, game_instance)
+        if isinstance(effect, CunningActionDashBuff):
+            self.dash_active = False
+        self.notify_change('status_effects')
+
+    def remove_status_effect(self, effect, game_instance):
+        """Removes an effect before it runs out (e.g. a consumed buff), without on_end."""
+        if self.active_status_effects.remove(effect, game_instance):
+            self.notify_change('status_effects')
 
     def distance_to(self, other_x, other_y):
         """Calculate the Chebyshev distance to another point."""
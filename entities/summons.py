@@ -8,7 +8,8 @@ class SummonedEntity(NPC):
         super().__init__(x, y, char, name, color)
         self.owner = owner  # The player or entity that summoned this
         self.duration = duration # How many turns the summon lasts (0 for permanent until destroyed)
-        self.turns_left = duration
+        self.expiry_timer = None # Set by start_duration()
+        self.paused_turns = None # Turns left while the level is stored (see pause_timers)
         self.blocks_movement = True # Most summons block movement
         self.alive = True # Summons start alive
         self.hp = 1 # Summons might have very low HP or be invulnerable
@@ -18,33 +19,54 @@ class SummonedEntity(NPC):
 
     def take_turn(self, player, game_map, game):
         """
-        Summoned entities might have their own AI or simply expire.
+        Summoned entities might have their own AI. They expire off game.timers (see start_duration).
         This method should be overridden by specific summons.
         """
-        self.tick_duration(game)
-        if not self.alive:
-            return
-
         # Default behavior: do nothing or move randomly
         # Specific summons (like a combat pet) would have their own logic here.
         pass
 
-    def tick_duration(self, game_instance):
-        """Decrements the summon's duration each turn."""
+    def __getstate__(self):
+        # The timer belongs to the live game.timers (and holds the Game): keep only the turns left
+        state = self.__dict__.copy()
+        if self.expiry_timer is not None:
+            state['paused_turns'] = self.expiry_timer.remaining
+        state['expiry_timer'] = None
+        return state
+
+    @property
+    def turns_left(self):
+        if self.expiry_timer is not None:
+            return self.expiry_timer.remaining
+        return self.paused_turns if self.paused_turns is not None else self.duration
+
+    def start_duration(self, game_instance):
+        """Schedules the summon's end on game.timers (nothing for permanent summons)."""
         if self.duration > 0:
-            self.turns_left -= 1
-            if self.turns_left <= 0:
-                self.die(game_instance)
+            self.expiry_timer = game_instance.timers.schedule(self.duration, self.die, game_instance)
+
+    def pause_timers(self, game_instance):
+        """The summon's level is being stored: it stops running out until resume_timers()."""
+        if self.expiry_timer is not None:
+            self.paused_turns = self.expiry_timer.remaining
+            game_instance.timers.cancel(self.expiry_timer)
+            self.expiry_timer = None
+
+    def resume_timers(self, game_instance):
+        if self.expiry_timer is None and self.paused_turns is not None:
+            self.expiry_timer = game_instance.timers.schedule(self.paused_turns, self.die, game_instance)
+            self.paused_turns = None
 
     def die(self, game_instance):
         """Handles the summon's despawn or death."""
+        if not self.alive:
+            return
         self.alive = False
+        game_instance.timers.cancel(self.expiry_timer)
         game_instance.message_log.add_message(f"The {self.name} vanishes!", self.color)
         # Remove from entities list and turn order
-        if self in game_instance.entities:
-            game_instance.entities.remove(self)
-        if self in game_instance.turn_order:
-            game_instance.turn_order.remove(self)
+        game_instance.remove_entity(self)
+        game_instance.scheduler.remove(self)
         game_instance.update_fov() # Update FOV if it was a light source or blocking sight
 
 
@@ -75,19 +97,18 @@ class MageHandEntity(SummonedEntity):
         """
         Mage Hand doesn't have an active turn in the initiative order.
         Its actions are controlled directly by the player's ability use.
-        However, its duration still ticks down.
+        Its duration runs off game.timers.
         """
-        self.tick_duration(game)
-        # No other actions for Mage Hand on its "turn"
         pass
 
     def die(self, game_instance):
         """Handles the Mage Hand vanishing."""
+        if not self.alive:
+            return
         self.alive = False
+        game_instance.timers.cancel(self.expiry_timer)
         game_instance.message_log.add_message(f"The {self.name} dissipates.", self.color)
-        if self in game_instance.entities:
-            game_instance.entities.remove(self)
-        if self in game_instance.turn_order:
-            game_instance.turn_order.remove(self)
+        game_instance.remove_entity(self)
+        game_instance.scheduler.remove(self)
         # No FOV update needed as it's not a light source and doesn't block sight.
 
@@ -14,13 +14,13 @@ class NPC:
         self.blocks_movement = True
         self.initiative = 0
 
-    def roll_initiative(self):
-        self.initiative = random.randint(1, 20)
+    def roll_initiative(self, rng=None):
+        self.initiative = (rng or random).randint(1, 20)
 
-    def get_dialogue(self):
+    def get_dialogue(self, rng=None):
         """Return random dialogue line"""
         if self.dialogue:
-            return random.choice(self.dialogue)
+            return (rng or random).choice(self.dialogue)
         return f"{self.name} nods at you."
 
     def take_turn(self, player, game_map, game):
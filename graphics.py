@@ -2,6 +2,9 @@
 
 import pygame
 import config
+from core.log import get_logger
+
+log = get_logger('render')
 
 # Global variable to hold the loaded tileset image
 TILESET_IMAGE = None
@@ -19,13 +22,32 @@ CELL_DIM = ORIGINAL_TILE_DIM + TILE_SPACING
 TILE_X_OFFSET = 0 
 TILE_Y_OFFSET = 0 
 
+# --- Tile surface cache ---
+# Ready-to-blit tile surfaces keyed on (char, tile_size). Built once in
+# setup_tile_mapping() and cleared by invalidate_tile_cache() when the tile scale changes.
+_TILE_SURFACE_CACHE = {}
+_tile_cache_size = None
+_tile_cache_hits = 0
+_tile_cache_misses = 0
+
+# --- Light levels ---
+# Tint multiplied into a tile for each FOV visibility type. None means the tile is drawn as-is.
+# Tinted variants of every mapped tile are baked once per light level (see register_light_level).
+LIGHT_LEVEL_TINTS = {
+    'player': None,
+    'torch': (128, 128, 128, 255),
+    'darkvision': (90, 90, 90, 255),
+    'explored': (60, 60, 60, 255),
+}
+_TINTED_TILE_CACHE = {}
+
 def load_tileset(filepath):
     global TILESET_IMAGE
     try:
         TILESET_IMAGE = pygame.image.load(filepath).convert_alpha()
-        print(f"Tileset loaded: {filepath}, size: {TILESET_IMAGE.get_size()}")
+        log.info("Tileset loaded: %s, size: %s", filepath, TILESET_IMAGE.get_size())
     except pygame.error as e:
-        print(f"Error loading tileset: {e}")
+        log.error("Error loading tileset: %s", e)
         pygame.quit()
         exit()
 
@@ -119,21 +141,107 @@ def setup_tile_mapping():
         '/': (4 * CELL_DIM, 6 * CELL_DIM),  # Weapon
         '[': (1 * CELL_DIM, 6 * CELL_DIM),  # Armor
     }
-    print("Tile mapping setup complete.")        
+
+    # Pre-bake every mapped tile at the current scale so the render loop only does lookups.
+    if TILESET_IMAGE is not None and _tile_cache_size != config.TILE_SIZE:
+        build_tile_cache()
+    log.info("Tile mapping setup complete.")        
+
+
+def build_tile_cache():
+    """(Re)builds the tile surface cache for every mapped char at the current config.TILE_SIZE."""
+    global _tile_cache_size
+    if TILESET_IMAGE is None:
+        raise RuntimeError("Tileset not loaded. Call load_tileset() first.")
+
+    invalidate_tile_cache()
+    for char in TILE_MAPPING:
+        _TILE_SURFACE_CACHE[(char, config.TILE_SIZE)] = _build_tile_surface(char)
+    for tint in LIGHT_LEVEL_TINTS.values():
+        if tint is not None:
+            _bake_tint(tint)
+    _tile_cache_size = config.TILE_SIZE
+
+
+def invalidate_tile_cache():
+    """Drops all cached tile surfaces (plain and tinted). Call this whenever config.TILE_SIZE changes."""
+    global _tile_cache_size
+    _TILE_SURFACE_CACHE.clear()
+    _TINTED_TILE_CACHE.clear()
+    _tile_cache_size = None
+
+
+def register_light_level(name, tint):
+    """
+    Registers (or replaces) a named light level and bakes its tinted tile variants.
+
+    Args:
+        name (str): The visibility type, as returned by FOV.get_visibility_type().
+        tint (tuple): RGBA multiplier applied to the tile, or None to draw untinted.
+    """
+    tint = tuple(tint) if tint is not None else None
+    LIGHT_LEVEL_TINTS[name] = tint
+    if tint is not None and _tile_cache_size == config.TILE_SIZE:
+        _bake_tint(tint)
+
+
+def get_light_tint(visibility_type):
+    """Returns the tint registered for a visibility type (None for full light or unknown types)."""
+    return LIGHT_LEVEL_TINTS.get(visibility_type)
+
+
+def _bake_tint(tint):
+    for char in TILE_MAPPING:
+        get_tinted_tile_surface(char, tint)
+
+
+def tile_cache_size():
+    """Returns the tile size the cache was last built for, or None if it is empty."""
+    return _tile_cache_size
+
+
+def get_tile_cache_stats():
+    """Returns hit/miss counters and the number of cached surfaces (for profiling)."""
+    return {
+        "hits": _tile_cache_hits,
+        "misses": _tile_cache_misses,
+        "size": len(_TILE_SURFACE_CACHE),
+    }
 
 
+def reset_tile_cache_stats():
+    global _tile_cache_hits, _tile_cache_misses
+    _tile_cache_hits = 0
+    _tile_cache_misses = 0
+
 
 def get_tile_surface(char):
     """
     Returns a pygame.Surface object representing the tile for the given character,
     scaled to the current config.TILE_SIZE.
+
+    Surfaces come from the tile cache and are shared, so callers must not draw on them.
     """
+    global _tile_cache_hits, _tile_cache_misses
+    surface = _TILE_SURFACE_CACHE.get((char, config.TILE_SIZE))
+    if surface is not None:
+        _tile_cache_hits += 1
+        return surface
+
+    _tile_cache_misses += 1
+    surface = _build_tile_surface(char)
+    _TILE_SURFACE_CACHE[(char, config.TILE_SIZE)] = surface
+    return surface
+
+
+def _build_tile_surface(char):
+    """Extracts (and scales, if needed) the tile for the given character from the tileset."""
     if TILESET_IMAGE is None:
         raise RuntimeError("Tileset not loaded. Call load_tileset() first.")
 
     tile_coords = TILE_MAPPING.get(char)
     if tile_coords is None:
-        print(f"Warning: No tile mapping for character '{char}'. Using default blank tile.")
+        log.warning("No tile mapping for character '%s'. Using default blank tile.", char)
         return pygame.Surface((config.TILE_SIZE, config.TILE_SIZE), pygame.SRCALPHA)
 
     x, y = tile_coords
@@ -146,7 +254,7 @@ def get_tile_surface(char):
     
     # Add a check to ensure the rect is within the tileset image bounds
     if not TILESET_IMAGE.get_rect().contains(tile_rect):
-        print(f"Error: Extracted tile rect {tile_rect} for char '{char}' is out of bounds of tileset image {TILESET_IMAGE.get_size()}.")
+        log.error("Extracted tile rect %s for char '%s' is out of bounds of tileset image %s.", tile_rect, char, TILESET_IMAGE.get_size())
         return pygame.Surface((config.TILE_SIZE, config.TILE_SIZE), pygame.SRCALPHA) # Return blank tile
 
     subsurface = TILESET_IMAGE.subsurface(tile_rect)
@@ -159,13 +267,25 @@ def get_tile_surface(char):
         return subsurface
 
 
+def get_tinted_tile_surface(char, tint):
+    """
+    Returns the tile for the given character multiplied by tint. Variants are built
+    once per (char, tint, tile_size) and shared, so callers must not draw on them.
+    """
+    key = (char, tint, config.TILE_SIZE)
+    surface = _TINTED_TILE_CACHE.get(key)
+    if surface is None:
+        surface = get_tile_surface(char).copy()
+        surface.fill(tint, special_flags=pygame.BLEND_RGBA_MULT)
+        _TINTED_TILE_CACHE[key] = surface
+    return surface
+
+
 def draw_tile(screen_surface, draw_x, draw_y, char, color_tint=None):
-    tile_surface = get_tile_surface(char)
-    
     if color_tint:
-        tinted_surface = tile_surface.copy()
-        tinted_surface.fill(color_tint, special_flags=pygame.BLEND_RGBA_MULT)
-        tile_surface = tinted_surface
+        tile_surface = get_tinted_tile_surface(char, tuple(color_tint))
+    else:
+        tile_surface = get_tile_surface(char)
     
     # --- MODIFIED: Blit directly using draw_x, draw_y ---
     screen_surface.blit(tile_surface, (draw_x, draw_y))    
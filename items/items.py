@@ -1,4 +1,5 @@
 import random
+from core.dice import compile_dice
 
 class Item:
     """Base class for all items."""
@@ -35,9 +36,7 @@ class Item:
         game_instance.message_log.add_message(f"You drop the {self.name}.", self.color)
         dropper.inventory.remove_item(self)
         # Place on map at dropper's position
-        self.x = dropper.x
-        self.y = dropper.y
-        game_instance.game_map.items_on_ground.append(self)
+        game_instance.game_map.add_item(self, dropper.x, dropper.y)
         game_instance.update_fov() # Update FOV to show dropped item
 
 
@@ -64,9 +63,15 @@ class Weapon(Item):
     def __init__(self, name, char, color, description, damage_dice, damage_modifier, attack_bonus=0):
         super().__init__(name, char, color, description)
         self.damage_dice = damage_dice # e.g., "1d6", "2d4"
+        compile_dice(damage_dice) # Fails early on a bad expression
         self.damage_modifier = damage_modifier
         self.attack_bonus = attack_bonus # Bonus to hit
 
+    @property
+    def dice(self):
+        """The compiled damage_dice (compile_dice caches it, so this doesn't parse)."""
+        return compile_dice(self.damage_dice)
+
 
 class Armor(Item):
     """An item that can be equipped for defense."""
@@ -203,15 +208,16 @@ thieves_tools = Tools(
 
 
 # Example function to create random loot for a chest
-def generate_random_loot(level_number):
+def generate_random_loot(level_number, rng=None):
+    rng = rng or random
     loot = []
     # Basic loot pool
     loot_pool = [lesser_healing_potion, greater_healing_potion, short_sword, long_sword, leather_armor, chainmail_armor]
 
     # Add 1-3 random items
-    num_items = random.randint(1, 2)
+    num_items = rng.randint(1, 2)
     for _ in range(num_items):
-        chosen_item_template = random.choice(loot_pool)
+        chosen_item_template = rng.choice(loot_pool)
         # Create a new instance of the item
         new_item = chosen_item_template.__class__(
             name=chosen_item_template.name,
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The game modules import each other from the repository root (no package install)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
@@ -0,0 +1,101 @@
+import itertools
+import random
+from fractions import Fraction
+
+import pytest
+
+from core.dice import Dice, DiceError, compile_dice, np
+
+
+def brute_force_outcomes(dice):
+    """{total: ways} by rolling every combination of faces."""
+    ways = {}
+    for rolls in itertools.product(range(1, dice.sides + 1), repeat=dice.count):
+        total = dice.total(list(rolls))
+        ways[total] = ways.get(total, 0) + 1
+    return ways
+
+
+@pytest.mark.parametrize('expression', ['1d6', '2d6+3', '3d4-1', '4d6kh3', '3d6kl1', '2d20kh1', '2d20kl1+2', '5d4kh2'])
+def test_outcomes_match_brute_force(expression):
+    dice = compile_dice(expression)
+    assert dice.outcomes() == brute_force_outcomes(dice)
+
+
+def test_distribution_sums_to_one():
+    distribution = compile_dice('4d6kh3').distribution(exact=True)
+    assert sum(distribution.values()) == 1
+    assert distribution[18] == Fraction(21, 1296)
+
+
+def test_mean_and_bounds():
+    dice = compile_dice('2d6+3')
+    assert (dice.minimum, dice.maximum, dice.mean) == (5, 15, 10)
+    keep = compile_dice('4d6kh3')
+    assert (keep.minimum, keep.maximum) == (3, 18)
+    assert keep.mean == pytest.approx(15869 / 1296)
+
+
+def test_chance_at_least():
+    dice = compile_dice('2d6')
+    assert dice.chance_at_least(12) == pytest.approx(1 / 36)
+    assert dice.chance_at_least(2) == pytest.approx(1)
+    assert dice.chance_at_least(13) == 0
+
+
+def test_critical_doubles_dice_and_keep_count_but_not_modifier():
+    assert str(compile_dice('2d6+3').critical()) == '4d6+3'
+    assert str(compile_dice('4d8kh3').critical()) == '8d8kh6'
+    assert str(compile_dice('2d20kl1-1').critical()) == '4d20kl2-1'
+
+
+def test_total_of_critical_rolls_keeps_twice_as_many():
+    dice = compile_dice('2d20kh1+1')
+    assert dice.total([1, 5, 20, 3]) == 26 # Keeps 20 and 5
+    assert dice.total([4, 9]) == 10
+
+
+def test_roll_dice_rolls_twice_as_many_on_critical():
+    dice = compile_dice('2d6')
+    assert len(dice.roll_dice(random.Random(1))) == 2
+    assert len(dice.roll_dice(random.Random(1), critical=True)) == 4
+
+
+def test_rolls_are_reproducible_from_the_seed():
+    dice = compile_dice('3d8kh2+1')
+
+    def rolls(seed):
+        rng = random.Random(seed)
+        return [dice.roll(rng) for _ in range(50)]
+
+    assert rolls(7) == rolls(7)
+    assert all(dice.minimum <= total <= dice.maximum for total in rolls(7))
+
+
+def test_roll_many_stays_in_bounds():
+    dice = compile_dice('4d6kh3')
+    rng = np.random.default_rng(3) if np is not None else random.Random(3)
+    totals = dice.roll_many(500, rng)
+    assert len(totals) == 500
+    assert min(totals) >= 3 and max(totals) <= 18
+
+
+@pytest.mark.parametrize('expression', ['0d6', '2d0', '2d6kh3', '2d6kl0', 'd', '2d', 'abc', '2d6+', '1d6x'])
+def test_compile_dice_rejects_bad_expressions(expression):
+    with pytest.raises(DiceError):
+        compile_dice(expression)
+
+
+def test_dice_error_is_a_value_error():
+    assert issubclass(DiceError, ValueError)
+
+
+def test_compile_dice_is_cached_and_lenient_about_spaces_and_case():
+    assert compile_dice('2d6+1') is compile_dice('2d6+1')
+    assert compile_dice(' 2D6 + 1 ') == compile_dice('2d6+1')
+    assert compile_dice('d20') == Dice(1, 20)
+
+
+def test_too_many_keep_outcomes():
+    with pytest.raises(DiceError):
+        compile_dice('40d20kh1').outcomes()
@@ -0,0 +1,70 @@
+import zlib
+
+import pytest
+
+from core.game import Game # Must come first (circular imports in the game modules)
+from core.level_store import LevelStore
+from entities.monster import Monster
+from entities.summons import MageHandEntity
+
+
+@pytest.fixture
+def game():
+    game = Game(None, headless=True, seed=1234)
+    game.finalize_race_selection()
+    game.finalize_character_creation()
+    game.level_store = LevelStore(hot_levels=0) # Every stored level is compressed right away
+    game.level_store.external['player'] = game.player
+    game.generate_level(1)
+    return game
+
+
+def free_spot_next_to_player(game):
+    for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]:
+        x, y = game.player.x + dx, game.player.y + dy
+        if game.game_map.is_walkable(x, y) and not game.game_map.entities_at(x, y):
+            return x, y
+    pytest.skip("No free tile next to the player for this seed")
+
+
+def messages(game):
+    return [text for text, _ in game.message_log.messages]
+
+
+def test_stored_level_keeps_effects_and_summons(game):
+    monster = next(e for e in game.entities if isinstance(e, Monster))
+    monster.add_status_effect("Poisoned", 3, game)
+    summon = MageHandEntity(*free_spot_next_to_player(game), game.player)
+    game.add_summon(summon)
+    game.timers.advance()
+    assert monster.active_status_effects.get("Poisoned").turns_left == 2
+    assert summon.turns_left == 9
+
+    game._store_current_level()
+    game.generate_level(2)
+    # The compressed level must not drag the live timers (and with them the game) along
+    data = zlib.decompress(game.level_store._cold[1])
+    assert b'TimerWheel' not in data
+    assert b'MessageBox' not in data
+
+    # Nothing on the stored level runs out while the player is elsewhere
+    for _ in range(20):
+        game.timers.advance()
+    assert not any("poison wears off" in text for text in messages(game))
+    assert not any("Mage Hand" in text for text in messages(game))
+
+    game._store_current_level()
+    game.enter_level(1)
+    monster = next(e for e in game.entities if isinstance(e, Monster) and e.active_status_effects)
+    summon = next(e for e in game.entities if isinstance(e, MageHandEntity))
+    assert monster.active_status_effects.get("Poisoned").turns_left == 2
+    assert summon.turns_left == 9
+
+    # Back on the level, the remaining turns run out as usual
+    game.timers.advance()
+    game.timers.advance()
+    assert not monster.active_status_effects
+    for _ in range(7):
+        game.timers.advance()
+    assert not summon.alive
+    assert summon not in game.entities
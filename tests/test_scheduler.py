@@ -0,0 +1,111 @@
+from core.scheduler import TURN_DELAY, TurnScheduler
+
+
+class Actor:
+    def __init__(self, name, initiative=0, speed=1):
+        self.name = name
+        self.initiative = initiative
+        self.speed = speed
+        self.alive = True
+
+    def __repr__(self):
+        return self.name
+
+
+def take_turns(scheduler, count):
+    """Names of the next `count` actors, starting with the current one."""
+    names = [scheduler.current().name]
+    for _ in range(count - 1):
+        names.append(scheduler.advance().name)
+    return names
+
+
+def test_ties_go_by_initiative_then_insertion_order():
+    scheduler = TurnScheduler()
+    scheduler.reset([Actor('a', 10), Actor('b', 15), Actor('c', 10)])
+    assert take_turns(scheduler, 6) == ['b', 'a', 'c', 'b', 'a', 'c']
+
+
+def test_iteration_starts_with_the_current_actor():
+    scheduler = TurnScheduler()
+    a, b, c = Actor('a', 10), Actor('b', 15), Actor('c', 5)
+    scheduler.reset([a, b, c])
+    scheduler.advance()
+    assert list(scheduler) == [a, c, b]
+    assert len(scheduler) == 3 and b in scheduler
+
+
+def test_add_with_lower_initiative_joins_the_current_round():
+    scheduler = TurnScheduler()
+    scheduler.reset([Actor('a', 15), Actor('b', 5)])
+    scheduler.add(Actor('late', 10))
+    assert take_turns(scheduler, 6) == ['a', 'late', 'b', 'a', 'late', 'b']
+
+
+def test_add_with_higher_initiative_waits_for_the_next_round():
+    scheduler = TurnScheduler()
+    scheduler.reset([Actor('a', 15), Actor('b', 5)])
+    scheduler.add(Actor('fast', 20))
+    assert take_turns(scheduler, 5) == ['a', 'b', 'fast', 'a', 'b']
+
+
+def test_add_twice_is_ignored():
+    scheduler = TurnScheduler()
+    a = Actor('a')
+    scheduler.reset([a])
+    scheduler.add(a)
+    assert len(scheduler) == 1
+
+
+def test_current_actor_removed_during_its_turn():
+    scheduler = TurnScheduler()
+    a, b, c = Actor('a', 15), Actor('b', 10), Actor('c', 5)
+    scheduler.reset([a, b, c])
+    scheduler.remove(a)
+    assert scheduler.current() is b
+    assert scheduler.advance() is b # The removed actor's turn just ends
+    assert take_turns(scheduler, 4) == ['b', 'c', 'b', 'c']
+    assert a not in scheduler
+
+
+def test_removed_actor_is_skipped():
+    scheduler = TurnScheduler()
+    a, b, c = Actor('a', 15), Actor('b', 10), Actor('c', 5)
+    scheduler.reset([a, b, c])
+    scheduler.remove(b)
+    assert take_turns(scheduler, 4) == ['a', 'c', 'a', 'c']
+
+
+def test_dead_actor_loses_its_turn_and_is_dropped():
+    scheduler = TurnScheduler()
+    a, b, c = Actor('a', 15), Actor('b', 10), Actor('c', 5)
+    scheduler.reset([a, b, c])
+    b.alive = False
+    assert scheduler.advance() is c
+    assert b not in scheduler
+    assert take_turns(scheduler, 3) == ['c', 'a', 'c']
+
+
+def test_many_removals_compact_the_heap():
+    scheduler = TurnScheduler()
+    actors = [Actor(str(i), initiative=-i) for i in range(100)]
+    scheduler.reset(actors)
+    for actor in actors[1:80]:
+        scheduler.remove(actor)
+    assert len(scheduler._heap) < 80
+    assert list(scheduler) == [actors[0]] + actors[80:]
+
+
+def test_speed_two_acts_twice_per_round():
+    scheduler = TurnScheduler()
+    scheduler.reset([Actor('slow', 10), Actor('fast', 0, speed=2)])
+    assert take_turns(scheduler, 6) == ['slow', 'fast', 'fast', 'slow', 'fast', 'fast']
+    assert scheduler.time == TURN_DELAY + TURN_DELAY // 2
+
+
+def test_empty_scheduler():
+    scheduler = TurnScheduler()
+    assert not scheduler
+    assert scheduler.current() is None
+    assert scheduler.advance() is None
+    assert scheduler.time == 0
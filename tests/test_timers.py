@@ -0,0 +1,119 @@
+from core.timers import TimerWheel
+
+
+def advance(wheel, turns):
+    for _ in range(turns):
+        wheel.advance()
+
+
+def test_fires_after_the_given_turns():
+    wheel = TimerWheel()
+    fired = []
+    wheel.schedule(3, fired.append, 'poison')
+    advance(wheel, 2)
+    assert fired == []
+    wheel.advance()
+    assert fired == ['poison']
+    assert len(wheel) == 0
+
+
+def test_zero_turns_fires_next_turn():
+    wheel = TimerWheel()
+    fired = []
+    timer = wheel.schedule(0, fired.append, 'now')
+    assert timer.remaining == 1
+    wheel.advance()
+    assert fired == ['now']
+
+
+def test_deadlines_past_one_lap_of_slots():
+    wheel = TimerWheel(slots=64)
+    fired = []
+    wheel.schedule(1, fired.append, 1)
+    wheel.schedule(65, fired.append, 65) # Same slot as the first, one lap later
+    wheel.schedule(200, fired.append, 200)
+    advance(wheel, 64)
+    assert fired == [1]
+    wheel.advance()
+    assert fired == [1, 65]
+    advance(wheel, 134)
+    assert fired == [1, 65]
+    wheel.advance()
+    assert fired == [1, 65, 200]
+    assert wheel.now == 200
+
+
+def test_same_turn_fires_in_schedule_order():
+    wheel = TimerWheel()
+    fired = []
+    for name in 'abc':
+        wheel.schedule(2, fired.append, name)
+    advance(wheel, 2)
+    assert fired == ['a', 'b', 'c']
+
+
+def test_cancel():
+    wheel = TimerWheel()
+    fired = []
+    timer = wheel.schedule(2, fired.append, 'x')
+    wheel.cancel(timer)
+    wheel.cancel(timer) # Twice is harmless
+    wheel.cancel(None)
+    assert len(wheel) == 0 and timer.remaining == 0
+    advance(wheel, 3)
+    assert fired == []
+
+
+def test_cancel_from_inside_a_callback():
+    wheel = TimerWheel()
+    fired = []
+    second = None
+
+    def first_callback():
+        fired.append('first')
+        wheel.cancel(second)
+
+    wheel.schedule(1, first_callback)
+    second = wheel.schedule(1, fired.append, 'second')
+    assert wheel.advance() == 1
+    assert fired == ['first']
+    assert len(wheel) == 0
+
+
+def test_callback_can_schedule_again():
+    wheel = TimerWheel()
+    fired = []
+
+    def tick():
+        fired.append(wheel.now)
+        if len(fired) < 3:
+            wheel.schedule(1, tick)
+
+    wheel.schedule(1, tick)
+    advance(wheel, 5)
+    assert fired == [1, 2, 3]
+
+
+def test_reschedule():
+    wheel = TimerWheel()
+    fired = []
+    timer = wheel.schedule(2, fired.append, 'x')
+    wheel.advance()
+    renewed = wheel.reschedule(timer, 5)
+    assert not timer.active and renewed.active
+    assert renewed.remaining == 5 and len(wheel) == 1
+    advance(wheel, 4)
+    assert fired == []
+    wheel.advance()
+    assert fired == ['x']
+
+
+def test_clear_drops_without_firing():
+    wheel = TimerWheel()
+    fired = []
+    timers = [wheel.schedule(turns, fired.append, turns) for turns in (1, 10, 100)]
+    wheel.clear()
+    assert len(wheel) == 0
+    assert not any(timer.active for timer in timers)
+    advance(wheel, 100)
+    assert fired == []
@@ -1,7 +1,9 @@
-import random
 from core.status_effects import Poisoned, Restrained, Burning # We'll add Restrained later if needed
-from core.floating_text import FloatingText
 from world.tile import TrapTile
+from core.dice import compile_dice
+from core.log import get_logger
+
+log = get_logger('traps')
 
 
 class Trap:
@@ -13,48 +15,49 @@ class Trap:
         self.detection_dc = detection_dc # DC to notice the trap
         self.disarm_dc = disarm_dc     # DC to disarm the trap
         self.damage_dice = damage_dice # e.g., "1d6"
+        compile_dice(damage_dice) # Fails early on a bad expression
         self.damage_modifier = damage_modifier
         self.damage_type = damage_type
         self.is_hidden = True # Initial state
         self.is_triggered = False
         self.is_disarmed = False
 
+    @property
+    def dice(self):
+        return compile_dice(self.damage_dice)
+
     def reveal(self, game_instance, x, y):
         """Reveals the trap to the player."""
         if self.is_hidden:
             self.is_hidden = False
             game_instance.message_log.add_message(f"You notice a {self.name} at ({x},{y})!", self.color)
             # Add floating text for "TRAP!"
-            game_instance.floating_texts.append(FloatingText(x, y, "TRAP!", (255, 100, 0)))
+            game_instance.floating_texts.spawn(x, y, "TRAP!", (255, 100, 0))
             # The tile itself will be updated in render_map_with_fov based on is_hidden state
-            print(f"DEBUG: Trap '{self.name}' at ({x},{y}) (ID: {id(self)}) revealed.") # <--- ADD THIS DEBUG PRINT
+            log.debug("Trap '%s' at (%d,%d) (ID: %d) revealed.", self.name, x, y, id(self))
             return True
         return False
 
     def trigger(self, player, game_instance, x, y):
         """Activates the trap's effect on the player."""        
         if self.is_triggered or self.is_disarmed:
-            print(f"DEBUG: Trap '{self.name}' at ({x},{y}) (ID: {id(self)}) already triggered or disarmed. Skipping.") 
+            log.debug("Trap '%s' at (%d,%d) (ID: %d) already triggered or disarmed. Skipping.", self.name, x, y, id(self))
             return False # Already triggered or disarmed
 
         self.is_triggered = True
         game_instance.message_log.add_message(f"You trigger a {self.name}!", (255, 0, 0))
-        game_instance.floating_texts.append(FloatingText(x, y, "ZAP!", (255, 0, 0))) # Generic trigger text
-        print(f"DEBUG: Trap '{self.name}' at ({x},{y}) (ID: {id(self)}) triggered.") 
+        game_instance.floating_texts.spawn(x, y, "ZAP!", (255, 0, 0)) # Generic trigger text
+        log.debug("Trap '%s' at (%d,%d) (ID: %d) triggered.", self.name, x, y, id(self))
 
-        game_instance.game_map.tiles[y][x] = TrapTile(self, self.char, self.color, x, y, self.name)
+        game_instance.game_map.set_tile(x, y, TrapTile(self, self.char, self.color, x, y, self.name))
 
         # Calculate damage
-        dice_count_str, die_type_str = self.damage_dice.split('d')
-        num_dice = int(dice_count_str)
-        die_type = int(die_type_str)
-        
-        damage_roll = sum(random.randint(1, die_type) for _ in range(num_dice))
+        damage_roll = self.dice.roll(game_instance.rng.combat)
         total_damage = max(1, damage_roll + self.damage_modifier)
 
         damage_dealt = player.take_damage(total_damage, game_instance, damage_type=self.damage_type)
         game_instance.message_log.add_message(f"The {self.name} deals {damage_dealt} {self.damage_type} damage!", (255, 50, 50))
-        game_instance.floating_texts.append(FloatingText(player.x, player.y - 0.5, str(damage_dealt), (255, 0, 0)))
+        game_instance.floating_texts.spawn(player.x, player.y - 0.5, str(damage_dealt), (255, 0, 0))
 
         if not player.alive:
             game_instance.message_log.add_message("You fall victim to the trap!", (255, 0, 0))
@@ -86,7 +89,7 @@ class Trap:
             skill_bonus = dex_modifier # No proficiency bonus for others
             skill_name = "Dexterity"
 
-        d20_roll = random.randint(1, 20)
+        d20_roll = game_instance.rng.combat.randint(1, 20)
         disarm_check_total = d20_roll + skill_bonus
 
         game_instance.message_log.add_message(
@@ -97,16 +100,16 @@ class Trap:
         if disarm_check_total >= self.disarm_dc:
             self.is_disarmed = True
             game_instance.message_log.add_message(f"You successfully disarm the {self.name}!", (0, 255, 0))
-            game_instance.floating_texts.append(FloatingText(x, y, "DISARMED!", (0, 255, 0)))
-            print(f"DEBUG: Trap '{self.name}' at ({x},{y}) (ID: {id(self)}) disarmed.") # <--- ADD THIS DEBUG PRINT
+            game_instance.floating_texts.spawn(x, y, "DISARMED!", (0, 255, 0))
+            log.debug("Trap '%s' at (%d,%d) (ID: %d) disarmed.", self.name, x, y, id(self))
             return True
         else:
             game_instance.message_log.add_message(f"You fail to disarm the {self.name}!", (255, 100, 100))
             # Optional: Trigger trap on failed disarm
-            if random.random() < 0.5: # 50% chance to trigger on failure
+            if game_instance.rng.combat.random() < 0.5: # 50% chance to trigger on failure
                 game_instance.message_log.add_message(f"The {self.name} springs!", (255, 0, 0))
                 self.trigger(player, game_instance, x, y)
-            print(f"DEBUG: Trap '{self.name}' at ({x},{y}) (ID: {id(self)}) disarm failed.") # <--- ADD THIS DEBUG PRINT
+            log.debug("Trap '%s' at (%d,%d) (ID: %d) disarm failed.", self.name, x, y, id(self))
             return False
 
 # --- Specific Trap Types ---
@@ -1,5 +1,4 @@
 import random
-from random import randint, choice
 from world import tile
 from world.tile import stairs_down, stairs_up, dungeon_door, bones, torch, crate, barrel, wall, floor, dungeon_grass, rubble, cob_web, mushroom, fresh_bones, MimicTile, TrapTile
 from items.items import Chest, generate_random_loot
@@ -35,7 +34,9 @@ def dig_tunnel_y(game_map, y1, y2, x):
     for y in range(min(y1, y2), max(y1, y2) + 1):
         game_map.tiles[y][x] = tile.floor
 
-def generate_dungeon(game_map, level_number, max_rooms=5, room_min_size=5, room_max_size=10):
+def generate_dungeon(game_map, level_number, max_rooms=5, room_min_size=5, room_max_size=10, rng=None):
+    """Carves rooms, stairs, decorations, traps and chests into game_map. rng defaults to the global random module."""
+    rng = rng or random
     rooms = []
     stairs_positions = {}
     
@@ -50,10 +51,10 @@ def generate_dungeon(game_map, level_number, max_rooms=5, room_min_size=5, room_
     
     # Attempt to generate rooms
     for _ in range(max_rooms * 2): # Try more times than max_rooms to ensure we get enough
-        w = randint(room_min_size, room_max_size)
-        h = randint(room_min_size, room_max_size)
-        x = randint(0, game_map.width - w - 1)
-        y = randint(0, game_map.height - h - 1)
+        w = rng.randint(room_min_size, room_max_size)
+        h = rng.randint(room_min_size, room_max_size)
+        x = rng.randint(0, game_map.width - w - 1)
+        y = rng.randint(0, game_map.height - h - 1)
         new_room = RectRoom(x, y, w, h)
         
         # Check for intersection with existing rooms
@@ -70,7 +71,7 @@ def generate_dungeon(game_map, level_number, max_rooms=5, room_min_size=5, room_
             if rooms:
                 prev_x, prev_y = rooms[-1].center()
                 new_x, new_y = new_room.center()
-                if randint(0, 1):
+                if rng.randint(0, 1):
                     dig_tunnel_x(game_map, prev_x, new_x, prev_y)
                     dig_tunnel_y(game_map, prev_y, new_y, new_x)
                 else:
@@ -104,7 +105,7 @@ def generate_dungeon(game_map, level_number, max_rooms=5, room_min_size=5, room_
                 stairs_positions['down'] = (sx, sy)
                 found_stairs_down_spot = True
                 # Remove any item that might have been at this spot to guarantee stairs visibility
-                game_map.items_on_ground = [item for item in game_map.items_on_ground if not (item.x == sx and item.y == sy)]
+                game_map.clear_items_at(sx, sy)
                 break
         
         if not found_stairs_down_spot:
@@ -112,7 +113,7 @@ def generate_dungeon(game_map, level_number, max_rooms=5, room_min_size=5, room_
             player_start_x, player_start_y = rooms[0].center()
             game_map.tiles[player_start_y][player_start_x] = stairs_down
             stairs_positions['down'] = (player_start_x, player_start_y)
-            game_map.items_on_ground = [item for item in game_map.items_on_ground if not (item.x == player_start_x and item.y == player_start_y)]
+            game_map.clear_items_at(player_start_x, player_start_y)
 
     # Place stairs_up in the first room generated (player's spawn room)
     if rooms:
@@ -131,17 +132,17 @@ def generate_dungeon(game_map, level_number, max_rooms=5, room_min_size=5, room_
                 game_map.tiles[sy][sx] = stairs_up
                 stairs_positions['up'] = (sx, sy)
                 found_stairs_up_spot = True
-                game_map.items_on_ground = [item for item in game_map.items_on_ground if not (item.x == sx and item.y == sy)]
+                game_map.clear_items_at(sx, sy)
                 break
         
         if not found_stairs_up_spot:
             # Emergency fallback for stairs_up (should be rare)
             game_map.tiles[stairs_x][stairs_y] = stairs_up # Try center again
             stairs_positions['up'] = (stairs_x, stairs_y)
-            game_map.items_on_ground = [item for item in game_map.items_on_ground if not (item.x == stairs_x and item.y == stairs_y)]
+            game_map.clear_items_at(stairs_x, stairs_y)
 
 
-    trap_rooms = random.sample(range(len(rooms)), k=min(2, len(rooms)))  # Randomly select 1 or 2 rooms for traps
+    trap_rooms = rng.sample(range(len(rooms)), k=min(2, len(rooms)))  # Randomly select 1 or 2 rooms for traps
 
     # --- Populate Rooms with Decorations, Torches, Chests/Mimics AND TRAPS ---
     for room_index, room in enumerate(rooms):
@@ -163,8 +164,8 @@ def generate_dungeon(game_map, level_number, max_rooms=5, room_min_size=5, room_
                 
                 if game_map.tiles[ry][rx] == floor: # Only place on floor tiles
                     # --- NEW: Trap Placement Logic ---
-                    if room_index in trap_rooms and random.random() < trap_placement_chance:
-                        chosen_trap_instance = random.choice(possible_traps)
+                    if room_index in trap_rooms and rng.random() < trap_placement_chance:
+                        chosen_trap_instance = rng.choice(possible_traps)
                         new_trap_instance = chosen_trap_instance()
 
                         # Create a TrapTile, disguised as a floor tile
@@ -172,9 +173,9 @@ def generate_dungeon(game_map, level_number, max_rooms=5, room_min_size=5, room_
                         continue
 
                     # --- Floor Decorations ---                    
-                    if random.random() < floor_decoration_chance:
-                        if random.random() < 0.1: # 15% chance for a decoration to be a Mimic
-                            mimic_type_tile_obj = random.choice([crate, barrel])
+                    if rng.random() < floor_decoration_chance:
+                        if rng.random() < 0.1: # 15% chance for a decoration to be a Mimic
+                            mimic_type_tile_obj = rng.choice([crate, barrel])
                             mimic_entity_disguise_char = 'K' if mimic_type_tile_obj == crate else 'B'
                             mimic_tile_initial_display_char = 'k' if mimic_type_tile_obj == crate else 'b'
                             
@@ -182,9 +183,9 @@ def generate_dungeon(game_map, level_number, max_rooms=5, room_min_size=5, room_
                             mimic_entity.name = f"Disguised {mimic_type_tile_obj.name} Mimic"
                             
                             game_map.tiles[ry][rx] = MimicTile(mimic_entity, mimic_tile_initial_display_char, mimic_type_tile_obj.color, mimic_type_tile_obj.name)
-                            game_map.items_on_ground.append(mimic_entity) 
+                            game_map.add_item(mimic_entity) 
                         else:
-                            chosen_decoration = random.choice(floor_decoration_tiles)
+                            chosen_decoration = rng.choice(floor_decoration_tiles)
                             game_map.tiles[ry][rx] = chosen_decoration
 
         # --- Chests (and Chest Mimics) ---
@@ -195,13 +196,9 @@ def generate_dungeon(game_map, level_number, max_rooms=5, room_min_size=5, room_
         if 'up' in stairs_positions and (chest_spawn_x, chest_spawn_y) == stairs_positions['up']:
             continue # Skip if stairs_up are at the center of this room
 
-        if random.random() < 0.6: # Increased overall chest spawn chance to 60%
+        if rng.random() < 0.6: # Increased overall chest spawn chance to 60%
             # Check if the spot is already occupied by an item (Mimic or Chest)
-            is_occupied_by_item = False
-            for existing_item in game_map.items_on_ground:
-                if existing_item.x == chest_spawn_x and existing_item.y == chest_spawn_y:
-                    is_occupied_by_item = True
-                    break
+            is_occupied_by_item = bool(game_map.items_at(chest_spawn_x, chest_spawn_y))
             
             # If the spot is already occupied by an item, skip placing another chest/mimic here.
             if is_occupied_by_item:
@@ -211,15 +208,15 @@ def generate_dungeon(game_map, level_number, max_rooms=5, room_min_size=5, room_
             # IMPORTANT: If a decorative tile (like crate/barrel) was placed here,
             # it will be overwritten by the MimicTile or remain a floor tile for the Chest.
             # This is the correct behavior.
-            if random.random() < 0.2: # 75% chance for a chest to be a mimic
+            if rng.random() < 0.2: # 75% chance for a chest to be a mimic
                 new_mimic = Mimic(chest_spawn_x, chest_spawn_y, 'C', (139, 69, 19))
                 new_mimic.name = "Disguised Chest Mimic"
                 game_map.tiles[chest_spawn_y][chest_spawn_x] = MimicTile(new_mimic, 'C', (139, 69, 19), "Chest")
-                game_map.items_on_ground.append(new_mimic) 
+                game_map.add_item(new_mimic) 
             else:
-                chest_contents = generate_random_loot(level_number)
+                chest_contents = generate_random_loot(level_number, rng)
                 new_chest = Chest(chest_spawn_x, chest_spawn_y, contents=chest_contents)
-                game_map.items_on_ground.append(new_chest)
+                game_map.add_item(new_chest)
                 # Ensure the tile under the chest is a floor tile, not a decoration.
                 game_map.tiles[chest_spawn_y][chest_spawn_x] = floor # <--- ADD THIS LINE
 
@@ -1,12 +1,37 @@
-from world.tile import wall
+from world.tile import wall, TILE_TEMPLATES
+
+try:
+    import numpy as np
+except ImportError: # numpy is only needed for ArrayGameMap
+    np = None
+
 
 class GameMap:
     def __init__(self, width, height):
         self.width = width
         self.height = height
         # Initialize with walls
-        self.tiles = [[wall for _ in range(width)] for _ in range(height)]
+        self.tiles = self._create_tiles(wall)
         self.items_on_ground = [] # <--- NEW: List to hold items dropped or generated on the map
+        # --- NEW: Spatial index, (x, y) -> occupants. Only change it through the methods below ---
+        self._items_at = {}
+        self._entities_at = {}
+        # Callables (x, y, old_tile, new_tile) told about every set_tile() change
+        self.tile_listeners = []
+        self.revision = 0 # Bumped whenever set_tile() changes walkability (invalidates distance maps)
+
+    def set_tile(self, x, y, tile):
+        """Replace the tile at (x, y) after generation, notifying tile listeners. Returns the old tile."""
+        old_tile = self.tiles[y][x]
+        self.tiles[y][x] = tile
+        if old_tile.blocked != tile.blocked:
+            self.revision += 1
+        for listener in self.tile_listeners:
+            listener(x, y, old_tile, tile)
+        return old_tile
+
+    def _create_tiles(self, fill_tile):
+        return [[fill_tile for _ in range(self.width)] for _ in range(self.height)]
 
     def is_walkable(self, x, y):
         """Check if a position is walkable"""
@@ -14,6 +39,64 @@ class GameMap:
             return not self.tiles[y][x].blocked
         return False
 
+    # --- Items on the ground ---
+    def add_item(self, item, x=None, y=None):
+        """Put an item on the ground, at (x, y) if given, else at its own position."""
+        if x is not None:
+            item.x, item.y = x, y
+        self.items_on_ground.append(item)
+        self._items_at.setdefault((item.x, item.y), []).append(item)
+
+    def remove_item(self, item):
+        """Take an item off the ground. Returns False if it wasn't there."""
+        if item not in self.items_on_ground:
+            return False
+        self.items_on_ground.remove(item)
+        self._discard((item.x, item.y), item, self._items_at)
+        return True
+
+    def clear_items_at(self, x, y):
+        for item in list(self.items_at(x, y)):
+            self.remove_item(item)
+
+    def items_at(self, x, y):
+        """Items at (x, y), oldest first. Don't mutate the returned list."""
+        return self._items_at.get((x, y), ())
+
+    # --- Entities ---
+    def add_entity(self, entity):
+        self._entities_at.setdefault((entity.x, entity.y), []).append(entity)
+
+    def remove_entity(self, entity):
+        self._discard((entity.x, entity.y), entity, self._entities_at)
+
+    def move_entity(self, entity, x, y):
+        """Move an entity to (x, y), keeping the index in sync. Use this instead of setting x/y."""
+        self._discard((entity.x, entity.y), entity, self._entities_at)
+        entity.x, entity.y = x, y
+        self._entities_at.setdefault((x, y), []).append(entity)
+
+    def entities_at(self, x, y):
+        """Entities at (x, y), dead ones included until cleanup. Don't mutate the returned list."""
+        return self._entities_at.get((x, y), ())
+
+    def get_blocking_entity_at(self, x, y, exclude=None):
+        for entity in self.entities_at(x, y):
+            if entity is not exclude and entity.alive and entity.blocks_movement:
+                return entity
+        return None
+
+    def _discard(self, position, occupant, index):
+        cell = index.get(position)
+        if cell is None:
+            return
+        for i, other in enumerate(cell):
+            if other is occupant:
+                del cell[i]
+                break
+        if not cell:
+            del index[position]
+
     def render(self, screen, tile_size, font):
         """Render the map"""
         for y in range(self.height):
@@ -23,3 +106,92 @@ class GameMap:
                 screen.blit(char_surface, (x * tile_size, y * tile_size))
 
 
+
+
+class TilePalette:
+    """Maps uint16 tile ids to Tile objects. Templates get fixed ids, unique tiles (traps, mimics) are added as placed."""
+    MAX_TILES = 65536
+
+    def __init__(self):
+        self.tiles = []
+        self._ids = {} # id(tile) -> tile id
+        for template in TILE_TEMPLATES.values():
+            self.get_id(template)
+
+    def get_id(self, tile):
+        tile_id = self._ids.get(id(tile))
+        if tile_id is None:
+            tile_id = len(self.tiles)
+            if tile_id >= self.MAX_TILES:
+                raise ValueError("Tile palette is full (more than 65536 distinct tiles on one map).")
+            self.tiles.append(tile)
+            self._ids[id(tile)] = tile_id
+        return tile_id
+
+    # _ids is keyed by id(), which doesn't survive pickling (core/level_store.py), so it is rebuilt
+    def __getstate__(self):
+        return {'tiles': self.tiles}
+
+    def __setstate__(self, state):
+        self.tiles = state['tiles']
+        self._ids = {id(tile): tile_id for tile_id, tile in enumerate(self.tiles)}
+
+
+class TileRowView:
+    """One row of an ArrayGameMap, indexable like the list rows of a plain GameMap."""
+    __slots__ = ('_game_map', '_y')
+
+    def __init__(self, game_map, y):
+        self._game_map = game_map
+        self._y = y
+
+    def __getitem__(self, x):
+        game_map = self._game_map
+        if isinstance(x, slice):
+            return [game_map.palette.tiles[tile_id] for tile_id in game_map.tile_ids[self._y, x].tolist()]
+        return game_map.palette.tiles[game_map.tile_ids[self._y, x]]
+
+    def __setitem__(self, x, tile):
+        self._game_map._store_tile(x, self._y, tile)
+
+    def __len__(self):
+        return self._game_map.width
+
+    def __iter__(self):
+        palette_tiles = self._game_map.palette.tiles
+        return (palette_tiles[tile_id] for tile_id in self._game_map.tile_ids[self._y].tolist())
+
+
+class ArrayGameMap(GameMap):
+    """
+    GameMap that stores tiles as a uint16 id array (height x width) plus boolean
+    `walkable` and `transparent` planes, so whole-map queries can be done with numpy.
+    `tiles[y][x]` still reads and writes Tile objects through row views.
+    """
+    def __init__(self, width, height):
+        if np is None:
+            raise RuntimeError("ArrayGameMap needs numpy. Install it or set config.MAP_STORAGE = 'list'.")
+        super().__init__(width, height)
+
+    def _create_tiles(self, fill_tile):
+        self.palette = TilePalette()
+        shape = (self.height, self.width)
+        self.tile_ids = np.full(shape, self.palette.get_id(fill_tile), dtype=np.uint16)
+        self.walkable = np.full(shape, not fill_tile.blocked, dtype=bool)
+        self.transparent = np.full(shape, not fill_tile.block_sight, dtype=bool)
+        return [TileRowView(self, y) for y in range(self.height)]
+
+    def _store_tile(self, x, y, tile):
+        self.tile_ids[y, x] = self.palette.get_id(tile)
+        self.walkable[y, x] = not tile.blocked
+        self.transparent[y, x] = not tile.block_sight
+
+    def is_walkable(self, x, y):
+        """Check if a position is walkable"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return bool(self.walkable[y, x])
+        return False
+
+    def tiles_where(self, template):
+        """Returns a boolean (height x width) mask of every cell holding the given tile."""
+        return self.tile_ids == self.palette.get_id(template)
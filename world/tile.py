@@ -85,3 +85,15 @@ class TrapTile(Tile):
 
 
 
+
+# Every shared tile template by name. Maps that store tile ids (world/map.py ArrayGameMap)
+# seed their palette from this, so template ids are the same on every level.
+TILE_TEMPLATES = {
+    'floor': floor, 'wall': wall, 'stairs_down': stairs_down, 'stairs_up': stairs_up,
+    'dungeon_door': dungeon_door, 'pressure_plate': pressure_plate,
+    'dungeon_grass': dungeon_grass, 'rubble': rubble, 'cob_web': cob_web, 'mushroom': mushroom,
+    'fresh_bones': fresh_bones, 'bones': bones, 'torch': torch, 'altar': altar, 'statue': statue,
+    'crate': crate, 'barrel': barrel,
+    'tavern_floor': tavern_floor, 'tavern_wall': tavern_wall, 'bar_counter': bar_counter,
+    'table': table, 'chair': chair, 'door': door, 'fireplace': fireplace,
+}